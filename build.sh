@@ -3,3 +3,8 @@ set -o errexit
 
 python manage.py collectstatic --noinput
 python manage.py migrate
+python manage.py rebuild_search_documents
+python manage.py rebuild_related_destinos
+python manage.py rebuild_search_vectors
+python manage.py rebuild_sitemap_images
+python manage.py write_sitemaps
@@ -148,6 +148,44 @@ if DATABASE_URL:
     )
 
 
+# -------------------------------------------------------------------
+# Cache
+# -------------------------------------------------------------------
+# Guarda el HTML renderizado de destinos/guías (ver pages/rendering.py).
+# LocMem es por proceso: cada worker tiene su copia. Lo que se invalida al publicar
+# (búsqueda, typeahead, CTAs, sitemaps) versiona sus keys con un contador en la
+# base (pages/versions.py), así un publish llega a todos los workers; el HTML del
+# body no lo necesita porque su key ya incluye la revisión publicada.
+# El HTML por bloque va aparte ("blocks"): son muchas entradas chicas y, mezcladas
+# con las demás, el culling de LocMem sacaría bodies enteros.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "destinos-posibles",
+        "TIMEOUT": 60 * 60 * 24,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    "blocks": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "destinos-posibles-blocks",
+        "TIMEOUT": 60 * 60 * 24,
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    },
+}
+
+# Streaming del body en guías largas sin caché (ver pages/rendering.py)
+PAGES_STREAM_BODY = os.getenv("PAGES_STREAM_BODY", "0").strip().lower() in {"1", "true", "yes", "y", "on"}
+PAGES_STREAM_MIN_BLOCKS = int(os.getenv("PAGES_STREAM_MIN_BLOCKS", "40"))
+
+# Pegados enormes en bulk_paste: convertir con `manage.py run_import_jobs` en vez de en el request
+PAGES_IMPORT_ASYNC = os.getenv("PAGES_IMPORT_ASYNC", "0").strip().lower() in {"1", "true", "yes", "y", "on"}
+PAGES_IMPORT_ASYNC_MIN_BYTES = int(os.getenv("PAGES_IMPORT_ASYNC_MIN_BYTES", "200000"))
+
+# Listados de guías: paginación por cursor después de las primeras páginas numeradas (ver pages/pagination.py)
+PAGES_KEYSET_PAGINATION = os.getenv("PAGES_KEYSET_PAGINATION", "0").strip().lower() in {"1", "true", "yes", "y", "on"}
+PAGES_KEYSET_NUMBERED_PAGES = int(os.getenv("PAGES_KEYSET_NUMBERED_PAGES", "5"))
+
+
 WAGTAILSEARCH_BACKENDS = {
     "default": {
         "BACKEND": "wagtail.search.backends.database",
@@ -155,6 +193,10 @@ WAGTAILSEARCH_BACKENDS = {
     }
 }   
 
+# Postgres: búsqueda pública sobre un tsvector ponderado propio + índice GIN (ver pages/pg_search.py).
+# En SQLite se ignora y se usa el backend de arriba.
+PAGES_SEARCH_POSTGRES = os.getenv("PAGES_SEARCH_POSTGRES", "0").strip().lower() in {"1", "true", "yes", "y", "on"}
+
 # -------------------------------------------------------------------
 # Password validation
 # -------------------------------------------------------------------
@@ -191,6 +233,12 @@ STORAGES = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Sitemaps pre-generados (ver pages/sitemaps.py): los sirve WhiteNoise desde este directorio.
+# El build los escribe (`manage.py write_sitemaps`) y cada publish reescribe el archivo
+# afectado al commitear; si el disco quedó en otra generación se sirve el XML dinámico.
+PAGES_SITEMAP_ROOT = Path(os.getenv("PAGES_SITEMAP_ROOT", BASE_DIR / "sitemaps"))
+PAGES_SITEMAP_BASE_URL = os.getenv("PAGES_SITEMAP_BASE_URL", "https://destinosposibles.com")
+
 # -------------------------------------------------------------------
 # Cloudinary (optional via ENV)
 # -------------------------------------------------------------------
@@ -2,10 +2,7 @@ from django.contrib import admin
 
 from django.urls import include, path
 from django.views.generic import TemplateView
-from pages.views import search
-
-
-from wagtail.contrib.sitemaps.views import sitemap
+from pages.views import search, search_typeahead, sitemap_index, sitemap_section
 
 
 urlpatterns = [
@@ -21,12 +18,14 @@ urlpatterns = [
         name="robots_txt",
     ),
 
-    # ✅ sitemap
-    path("sitemap.xml", sitemap),
+    # ✅ sitemap (índice por tipo de página, ver pages/sitemaps.py)
+    path("sitemap.xml", sitemap_index, name="sitemap_index"),
+    path("sitemap-<slug:section>-<int:number>.xml", sitemap_section, name="sitemap_section"),
 
     # Tus urls propias (si tenés)
    # path("", include("core.urls")),
     path("buscar/", search, name="search"),
+    path("buscar/sugerencias/", search_typeahead, name="search_typeahead"),
 
     # Wagtail pages (SIEMPRE al final)
     path("", include("wagtail.urls")),
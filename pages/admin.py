@@ -2,8 +2,18 @@ from django.contrib import admin
 from wagtail.models import Page
 from django.contrib.admin.sites import NotRegistered
 
+from .models import ImportJob
+
 # Evita que crashee si Page no está registrado
 try:
     admin.site.unregister(Page)
 except NotRegistered:
     pass
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "page", "status", "attempts", "blocks", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("page", "requested_by", "blocks", "attempts", "error", "created_at", "started_at", "finished_at")
+    exclude = ("html",)
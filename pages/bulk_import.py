@@ -0,0 +1,301 @@
+# pages/bulk_import.py
+"""
+Importación masiva de exports HTML (directorio o .zip) -> DestinoPage / ArticuloPage.
+
+El archivo de mapeo (CSV) dice qué es cada HTML y dónde va:
+
+    archivo,tipo,padre,slug,titulo,intro,tags
+    bariloche.html,destino,argentina,bariloche,Bariloche,Lagos y montaña,montaña|trekking
+    playas/top10.html,articulo,playas,top-10-playas,,,
+
+- tipo: destino (padre = slug de un PaisPage) o articulo (padre = slug de una CategoriaPage);
+  si hay dos padres con el mismo slug (en distintas ramas) las filas que lo usan fallan
+- titulo: si falta, se usa el <h1>/<title> del HTML o el nombre del archivo
+- tags: sólo destinos, separados por "|"
+
+La conversión HTML -> StreamField (pages/importer.py) corre en un pool de procesos;
+las páginas se insertan en el proceso principal en lotes, un transaction.atomic por
+lote y un savepoint por página (una página rota no tira abajo el lote).
+
+Reanudable: las filas cuyo slug ya existe bajo su padre se saltean, así que después
+de un corte (o de arreglar las filas que fallaron) se vuelve a correr el mismo comando.
+
+Los handlers de publish (relacionados, tsvector, imágenes y archivos del sitemap,
+invalidaciones de caché) no corren por página (pages/deferral.py): se recalcula
+todo una sola vez al terminar. Si una página falla, los archivos de las imágenes
+que se subieron para ella se borran del storage.
+"""
+import csv
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from html import unescape
+from pathlib import Path
+
+import django
+from django.db import connections, transaction
+from django.utils.text import slugify
+from wagtail.models import Page
+
+from .deferral import defer_publish_handlers
+from .image_ingest import attach_images, delete_image_files, parse_html_with_images
+from .models import ArticuloPage, CategoriaPage, DestinoPage, PaisPage
+from .pagination import invalidate_listing_counts
+from .pg_search import refresh_search_vectors
+from .related import rebuild_related_destinos
+from .search import invalidate_search_cache
+from .sitemap_images import refresh_sitemap_images_for
+from .sitemaps import invalidate_sitemaps, safe_write_sitemaps
+from .typeahead import invalidate_typeahead_index
+
+logger = logging.getLogger(__name__)
+
+PAGE_TYPES = {
+    "destino": (DestinoPage, PaisPage),
+    "articulo": (ArticuloPage, CategoriaPage),
+}
+
+_TITLE_RE = re.compile(r"<(h1|title)[^>]*>(.*?)</\1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+@dataclass
+class ImportRow:
+    line: int
+    archivo: str
+    tipo: str
+    padre: str
+    slug: str
+    titulo: str = ""
+    intro: str = ""
+    tags: list = field(default_factory=list)
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    created: int = 0
+    skipped: int = 0
+    failed: list = field(default_factory=list)  # (fila, archivo, error)
+    bytes_read: int = 0
+    convert_seconds: float = 0.0
+    insert_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def read_mapping(path: Path):
+    """Filas del CSV de mapeo (ver docstring del módulo)."""
+    rows = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for line, raw in enumerate(csv.DictReader(f), start=2):
+            raw = {k.strip().lower(): (v or "").strip() for k, v in raw.items() if k}
+            tipo = raw.get("tipo", "").lower()
+            rows.append(ImportRow(
+                line=line,
+                archivo=raw.get("archivo", ""),
+                tipo=tipo,
+                padre=raw.get("padre", ""),
+                slug=slugify(raw.get("slug") or Path(raw.get("archivo", "")).stem)[:255],
+                titulo=raw.get("titulo", ""),
+                intro=raw.get("intro", "")[:250],
+                tags=[t.strip() for t in raw.get("tags", "").split("|") if t.strip()],
+            ))
+    return rows
+
+
+def _title_from_html(html: str) -> str:
+    match = _TITLE_RE.search(html[:200_000])
+    return unescape(_TAG_RE.sub("", match.group(2))).strip() if match else ""
+
+
+def _init_worker():
+    django.setup()
+
+
+def convert_file(base_dir: str, row: ImportRow):
+    """
+    Corre en el pool: lee y convierte un HTML. No toca la base.
+    Devuelve (row, resultado|None, error|None, bytes, segundos).
+    """
+    t0 = time.perf_counter()
+    try:
+        path = (Path(base_dir) / row.archivo).resolve()
+        if Path(base_dir).resolve() not in path.parents:
+            raise ValueError("el archivo está fuera del directorio importado")
+        html = path.read_text(encoding="utf-8", errors="replace")
+        stream_data, image_refs, inline = parse_html_with_images(html, fill_embed_urls=True)
+        if not stream_data:
+            raise ValueError("el HTML no generó ningún bloque")
+        title = row.titulo or _title_from_html(html) or path.stem.replace("-", " ").replace("_", " ").title()
+        result = {
+            "title": title[:255],
+            "stream_data": stream_data,
+            "image_refs": image_refs,
+            "inline": inline,
+            "image_dir": str(path.parent),
+        }
+        return row, result, None, len(html), time.perf_counter() - t0
+    except Exception as exc:
+        return row, None, f"{type(exc).__name__}: {exc}", 0, time.perf_counter() - t0
+
+
+class BulkImporter:
+    def __init__(self, base_dir, rows, publish=False, user=None, batch_size=25, workers=None, progress=None):
+        self.base_dir = Path(base_dir).resolve()
+        self.rows = rows
+        self.publish = publish
+        self.user = user
+        self.batch_size = max(1, batch_size)
+        self.workers = workers or os.cpu_count() or 2
+        self.progress = progress or (lambda stats: None)
+        self.stats = ImportStats(rows=len(rows))
+
+        # padres precargados: 1 query por tipo; slugs de hijos existentes, lazy por padre.
+        # El CSV nombra al padre por slug: los slugs repetidos (en distintas ramas) son ambiguos.
+        self.parents = {}
+        self.ambiguous_parents = {}
+        for tipo, (_model, parent_model) in PAGE_TYPES.items():
+            self.parents[tipo] = {}
+            self.ambiguous_parents[tipo] = set()
+            for parent in parent_model.objects.order_by("path"):
+                if parent.slug in self.parents[tipo]:
+                    self.ambiguous_parents[tipo].add(parent.slug)
+                self.parents[tipo][parent.slug] = parent
+        self._child_slugs = {}
+        self.created_ids = {tipo: [] for tipo in PAGE_TYPES}
+
+    def existing_slugs(self, parent) -> set:
+        if parent.pk not in self._child_slugs:
+            self._child_slugs[parent.pk] = set(
+                Page.objects.filter(path__startswith=parent.path, depth=parent.depth + 1)
+                .values_list("slug", flat=True)
+            )
+        return self._child_slugs[parent.pk]
+
+    def fail(self, row, error):
+        self.stats.failed.append((row.line, row.archivo, error))
+        logger.warning("Fila %s (%s): %s", row.line, row.archivo, error)
+
+    def pending_rows(self):
+        """Valida las filas y descarta las que ya están importadas (reanudar)."""
+        pending = []
+        for row in self.rows:
+            if row.tipo not in PAGE_TYPES:
+                self.fail(row, f"tipo desconocido: {row.tipo!r} (destino|articulo)")
+            elif not row.archivo or not row.slug:
+                self.fail(row, "falta archivo o slug")
+            elif row.padre not in self.parents[row.tipo]:
+                self.fail(row, f"no existe el padre {row.padre!r} ({PAGE_TYPES[row.tipo][1].__name__})")
+            elif row.padre in self.ambiguous_parents[row.tipo]:
+                self.fail(row, f"hay varios {PAGE_TYPES[row.tipo][1].__name__} con slug {row.padre!r}")
+            elif row.slug in self.existing_slugs(self.parents[row.tipo][row.padre]):
+                self.stats.skipped += 1
+            else:
+                pending.append(row)
+        return pending
+
+    def run(self):
+        pending = self.pending_rows()
+        self.progress(self.stats)
+        if not pending:
+            return self.stats
+
+        # los hijos no usan la conexión del padre (fork): cerrarla antes de forkear
+        connections.close_all()
+
+        try:
+            with defer_publish_handlers():
+                self.convert_and_insert(pending)
+        finally:
+            self.finish()
+        return self.stats
+
+    def convert_and_insert(self, pending):
+        batch = []
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            results = pool.map(convert_file, [str(self.base_dir)] * len(pending), pending, chunksize=4)
+            for row, result, error, size, seconds in results:
+                self.stats.bytes_read += size
+                self.stats.convert_seconds += seconds
+                if error:
+                    self.fail(row, error)
+                    continue
+                batch.append((row, result))
+                if len(batch) >= self.batch_size:
+                    self.insert_batch(batch)
+                    batch = []
+        if batch:
+            self.insert_batch(batch)
+
+    def insert_batch(self, batch):
+        t0 = time.perf_counter()
+        batch_uploaded = []
+        batch_created = []
+        try:
+            with transaction.atomic():
+                for row, result in batch:
+                    uploaded = []
+                    try:
+                        with transaction.atomic():
+                            page = self.create_page(row, result, uploaded)
+                    except Exception as exc:
+                        # el savepoint deshizo las filas de las imágenes, no sus archivos;
+                        # ni el numchild que add_child sumó al padre en memoria
+                        delete_image_files(uploaded)
+                        self.parents[row.tipo][row.padre].refresh_from_db(fields=["numchild"])
+                        logger.exception("Fila %s (%s)", row.line, row.archivo)
+                        self.fail(row, f"{type(exc).__name__}: {exc}")
+                        continue
+                    batch_uploaded.extend(uploaded)
+                    batch_created.append((row.tipo, page.pk))
+        except Exception:
+            delete_image_files(batch_uploaded)
+            raise
+
+        for tipo, page_id in batch_created:
+            self.created_ids[tipo].append(page_id)
+        self.stats.created += len(batch_created)
+        self.stats.insert_seconds += time.perf_counter() - t0
+        self.progress(self.stats)
+
+    def finish(self):
+        """Lo que los handlers de publish hacen por página, una sola vez para todo el import."""
+        page_ids = [page_id for ids in self.created_ids.values() for page_id in ids]
+        if not (self.publish and page_ids):
+            return
+
+        if self.created_ids["destino"]:
+            rebuild_related_destinos()
+        refresh_search_vectors(page_ids)
+        refresh_sitemap_images_for(page_ids)
+        invalidate_search_cache()
+        invalidate_typeahead_index()
+        invalidate_listing_counts()
+        invalidate_sitemaps()
+        safe_write_sitemaps()
+
+    def create_page(self, row, result, uploaded=None):
+        page_model, _parent_model = PAGE_TYPES[row.tipo]
+        parent = self.parents[row.tipo][row.padre]
+
+        body = attach_images(
+            result["stream_data"], result["image_refs"], result["inline"],
+            base_dir=result["image_dir"], root=self.base_dir, user=self.user, uploaded=uploaded,
+        )
+        page = page_model(title=result["title"], slug=row.slug, intro=row.intro, body=body, live=False)
+        if row.tags and row.tipo == "destino":
+            page.tags.add(*row.tags)  # ClusterTaggableManager: se guardan con la página
+        parent.add_child(instance=page)
+
+        revision = page.save_revision(user=self.user, log_action=True)
+        if self.publish:
+            revision.publish(user=self.user)
+        self.existing_slugs(parent).add(row.slug)
+        return page
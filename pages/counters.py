@@ -0,0 +1,70 @@
+# pages/counters.py
+"""
+Contadores compartidos entre workers (hits/misses de las cachés), en la tabla CacheVersion.
+
+La caché es LocMem (una por proceso), así que un contador ahí sólo ve su propio
+worker. Cada proceso suma en memoria y vuelca a la base como mucho cada
+FLUSH_INTERVAL segundos (un UPDATE ... + n por contador): contar un hit no
+agrega queries al request. Los comandos de stats leen la base, o sea el tráfico
+de todos los workers menos lo que cada uno todavía no volcó.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+FLUSH_INTERVAL = 10
+
+_pending = {}  # name -> cantidad todavía no volcada
+_last_flush = time.monotonic()
+_lock = threading.Lock()
+
+
+def incr(name: str, amount: int = 1):
+    with _lock:
+        _pending[name] = _pending.get(name, 0) + amount
+        due = time.monotonic() - _last_flush >= FLUSH_INTERVAL
+    if due:
+        flush()
+
+
+def _add(name: str, amount: int):
+    CacheVersion = apps.get_model("pages", "CacheVersion")
+    with transaction.atomic():
+        if CacheVersion.objects.filter(name=name).update(version=F("version") + amount):
+            return
+        try:
+            with transaction.atomic():
+                CacheVersion.objects.create(name=name, version=amount)
+        except IntegrityError:  # otro proceso la creó recién
+            CacheVersion.objects.filter(name=name).update(version=F("version") + amount)
+
+
+def flush():
+    """Vuelca a la base lo contado en este proceso."""
+    global _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    for name, amount in pending.items():
+        if amount:
+            _add(name, amount)
+
+
+def read(*names) -> dict:
+    """{name: total de todos los workers} (incluye lo pendiente de este proceso)."""
+    flush()
+    CacheVersion = apps.get_model("pages", "CacheVersion")
+    totals = dict(CacheVersion.objects.filter(name__in=names).values_list("name", "version"))
+    return {name: totals.get(name, 0) for name in names}
+
+
+def reset(*names):
+    with _lock:
+        for name in names:
+            _pending.pop(name, None)
+    CacheVersion = apps.get_model("pages", "CacheVersion")
+    CacheVersion.objects.filter(name__in=names).delete()
@@ -0,0 +1,76 @@
+# pages/ctas.py
+"""
+CTAs automáticos de destinos a partir de reglas editables (snippet CTARule).
+
+Las reglas se compilan en un índice tag → CTAs por proceso. Editar/borrar una
+regla (signals) sube la versión compartida "ctas" (pages/versions.py) y cada
+worker rearma su copia en cuanto la ve cambiada.
+"""
+from django.apps import apps
+
+from .versions import bump_version, get_version
+
+MAX_CTAS = 3
+CTA_VERSION = "ctas"
+
+_index = None
+
+
+class CTAIndex:
+    def __init__(self, rules, version=0):
+        self.by_tag = {}
+        self.defaults = []
+        self.version = version
+
+        for rule in rules:
+            cta = {
+                "title": rule.title,
+                "url": rule.url,
+                "button_text": rule.button_text,
+                "note": rule.note,
+                "priority": (rule.priority, rule.pk),
+            }
+            tag = rule.tag.strip().lower()
+            if tag:
+                self.by_tag.setdefault(tag, []).append(cta)
+            else:
+                self.defaults.append(cta)
+
+
+def get_cta_index():
+    global _index
+    version = get_version(CTA_VERSION)
+    if _index is None or _index.version != version:
+        CTARule = apps.get_model("pages", "CTARule")
+        _index = CTAIndex(CTARule.objects.order_by("priority", "id"), version)
+    return _index
+
+
+def invalidate_cta_index(*args, **kwargs):
+    global _index
+    _index = None
+    bump_version(CTA_VERSION)
+
+
+def resolve_ctas(tag_names, limit=MAX_CTAS):
+    """CTAs para un destino según sus tags (sin queries si el índice ya está armado)."""
+    index = get_cta_index()
+
+    matched = []
+    for name in {n.strip().lower() for n in tag_names}:
+        matched.extend(index.by_tag.get(name, ()))
+    matched.sort(key=lambda cta: cta["priority"])
+
+    seen = set()
+    unique_ctas = []
+    for cta in matched:
+        key = (cta["url"], cta["button_text"])
+        if key in seen:
+            continue
+        seen.add(key)
+        unique_ctas.append(cta)
+
+    if not unique_ctas:
+        unique_ctas = index.defaults
+
+    return unique_ctas[:limit]
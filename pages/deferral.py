@@ -0,0 +1,36 @@
+# pages/deferral.py
+"""
+Handlers de publish diferibles, para imports masivos.
+
+Dentro de defer_publish_handlers() los handlers de page_published /
+page_unpublished marcados con @unless_deferred (relacionados, tsvector,
+imágenes y archivos del sitemap, caché del body, invalidaciones) no hacen nada
+por página: quien difiere recalcula todo una sola vez al terminar (ver
+BulkImporter.finish en pages/bulk_import.py).
+"""
+from contextlib import contextmanager
+from functools import wraps
+
+_deferred = False
+
+
+def publish_handlers_deferred() -> bool:
+    return _deferred
+
+
+@contextmanager
+def defer_publish_handlers():
+    global _deferred
+    previous, _deferred = _deferred, True
+    try:
+        yield
+    finally:
+        _deferred = previous
+
+
+def unless_deferred(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not _deferred:
+            return handler(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,75 @@
+# pages/headings.py
+"""
+Indexador de headings (<h2>/<h3>) para el HTML de rich_text, en una sola pasada.
+
+En vez de un re.sub por heading sobre todo el texto, se recorren una vez los
+tags de apertura/cierre de h2/h3 y el HTML de salida se arma con slices del
+original: el contenido anidado (<b>, <a>, ...) y los atributos del heading se
+conservan tal cual; sólo se agrega (o reemplaza) el id.
+"""
+import re
+from html import unescape
+
+HEADING_LEVELS = (2, 3)
+
+_HEADING_TAG_RE = re.compile(r"<(/?)(h[23])(\s[^>]*)?>", re.IGNORECASE)
+_ID_ATTR_RE = re.compile(r"""\s+id\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+)""", re.IGNORECASE)
+_ANY_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def heading_text(inner_html: str) -> str:
+    """Texto plano de un heading (sin tags ni entidades)."""
+    text = inner_html or ""
+    if "<" in text:
+        text = _ANY_TAG_RE.sub("", text)
+    if "&" in text:
+        text = unescape(text)
+    return text.strip()
+
+
+def _start_tag_with_id(match, anchor: str) -> str:
+    attrs = _ID_ATTR_RE.sub("", match.group(3) or "").rstrip("/ ").rstrip()
+    return f'<{match.group(2)} id="{anchor}"{attrs}>'
+
+
+def index_headings(html: str, anchor_for, levels=HEADING_LEVELS, rewrite: bool = True):
+    """
+    Busca los headings de `levels` en una pasada. Por cada heading con texto llama
+    a anchor_for(title, level) y (si rewrite) le pone ese id.
+
+    Devuelve (html, headings) con headings = [{"title", "anchor", "level"}] en orden.
+    """
+    html = html or ""
+    headings = []
+    out = []
+    pos = 0
+    open_match = None
+
+    for match in _HEADING_TAG_RE.finditer(html):
+        tag = match.group(2).lower()
+
+        if not match.group(1):
+            # apertura: si había otro heading abierto sin cerrar, se descarta
+            open_match = match
+            continue
+
+        if open_match is None or open_match.group(2).lower() != tag:
+            continue
+
+        level = int(tag[1])
+        title = heading_text(html[open_match.end():match.start()]) if level in levels else ""
+        if title:
+            anchor = anchor_for(title, level)
+            headings.append({"title": title, "anchor": anchor, "level": level})
+            if rewrite:
+                out.append(html[pos:open_match.start()])
+                out.append(_start_tag_with_id(open_match, anchor))
+                pos = open_match.end()
+
+        open_match = None
+
+    if not rewrite:
+        return html, headings
+
+    out.append(html[pos:])
+    return "".join(out), headings
@@ -0,0 +1,301 @@
+# pages/image_ingest.py
+"""
+Imágenes de los pegados (Docs/Word) -> biblioteca de imágenes de Wagtail.
+
+1) Antes de parsear, los data: URI (base64, a veces de varios MB) se sacan del HTML
+   y se reemplazan por una referencia corta: el parser nunca ve el base64.
+2) Cada imagen se decodifica en bloques a un archivo temporal, calculando el SHA-1
+   (el mismo file_hash que guarda Wagtail) sin tenerla entera en memoria.
+3) Las que ya existen en la biblioteca (mismo hash) se reusan; las nuevas se suben
+   al storage en un pool de threads y se crean con un solo bulk_create.
+4) Los placeholders de quick_section.image / image se completan con el id, y las
+   corridas de 2+ imágenes sueltas seguidas se agrupan en un bloque gallery.
+
+Soporta data: URIs y archivos locales (sólo si se pasa base_dir, ej. imports por
+directorio). Las URLs remotas quedan como placeholder, igual que antes.
+"""
+import base64
+import hashlib
+import logging
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from PIL import Image as PILImage
+from wagtail.images import get_image_model
+from wagtail.search.index import insert_or_update_object
+
+from .importer import html_to_stream_data
+
+logger = logging.getLogger(__name__)
+
+INLINE_PREFIX = "dp-inline:"
+MAX_IMAGE_BYTES = 25 * 1024 * 1024
+IMAGE_WORKERS = 4
+_B64_CHUNK = 64 * 1024  # múltiplo de 4
+
+_DATA_URI_RE = re.compile(r"data:image/([a-zA-Z0-9.+-]+);base64,", re.IGNORECASE)
+# el payload termina en la comilla/espacio/">" que cierra el atributo
+_PAYLOAD_RE = re.compile(r"[^\"' >)]*")
+_EXTENSIONS = {"jpeg": "jpg", "svg+xml": "svg", "x-icon": "ico"}
+
+
+def extract_data_uris(html: str):
+    """
+    Reemplaza cada data:image/...;base64,... por "dp-inline:N".
+    Devuelve (html_sin_base64, inline) con inline[N] = (ext, html_original, inicio, fin):
+    el payload no se copia, se decodifica después directo desde el string original.
+    """
+    if "data:image" not in html:
+        return html, []
+
+    out = []
+    inline = []
+    pos = 0
+    for match in _DATA_URI_RE.finditer(html):
+        start = match.end()
+        end = _PAYLOAD_RE.match(html, start).end()
+        ext = match.group(1).lower()
+        out.append(html[pos:match.start()])
+        out.append(f"{INLINE_PREFIX}{len(inline)}")
+        inline.append((_EXTENSIONS.get(ext, ext), html, start, end))
+        pos = end
+    out.append(html[pos:])
+    return "".join(out), inline
+
+
+class _Decoded:
+    def __init__(self, ref_src, tmp, sha1, size, ext, title):
+        self.ref_src = ref_src
+        self.tmp = tmp
+        self.sha1 = sha1
+        self.size = size
+        self.ext = ext
+        self.title = title
+        self.width = None
+        self.height = None
+
+
+def _decode_inline(item):
+    ext, html, start, end = item
+    tmp = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    sha1 = hashlib.sha1()
+    size = 0
+    pending = ""
+    carry = ""
+    for i in range(start, end, _B64_CHUNK):
+        raw = carry + html[i:min(i + _B64_CHUNK, end)]
+        # un %2B / %2F cortado entre dos bloques se completa con el siguiente
+        cut = raw.find("%", len(raw) - 2)
+        if cut != -1 and i + _B64_CHUNK < end:
+            raw, carry = raw[:cut], raw[cut:]
+        else:
+            carry = ""
+        chunk = pending + re.sub(r"\s+", "", unquote(raw))
+        cut = len(chunk) - (len(chunk) % 4)
+        chunk, pending = chunk[:cut], chunk[cut:]
+        data = base64.b64decode(chunk)
+        size += len(data)
+        if size > MAX_IMAGE_BYTES:
+            raise ValueError("imagen demasiado grande")
+        sha1.update(data)
+        tmp.write(data)
+    if pending:
+        data = base64.b64decode(pending + "=" * (-len(pending) % 4))
+        size += len(data)
+        sha1.update(data)
+        tmp.write(data)
+    return tmp, sha1.hexdigest(), size, ext
+
+
+def _read_local(src: str, base_dir: Path, root: Path):
+    path = unquote(urlparse(src).path if src.startswith("file:") else src)
+    full = (base_dir / path.lstrip("/")).resolve()
+    if root not in full.parents or not full.is_file():
+        raise ValueError(f"imagen local fuera del directorio o inexistente: {src}")
+    if full.stat().st_size > MAX_IMAGE_BYTES:
+        raise ValueError("imagen demasiado grande")
+
+    tmp = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    sha1 = hashlib.sha1()
+    size = 0
+    with full.open("rb") as f:
+        for data in iter(lambda: f.read(_B64_CHUNK), b""):
+            sha1.update(data)
+            tmp.write(data)
+            size += len(data)
+    return tmp, sha1.hexdigest(), size, full.suffix.lstrip(".").lower() or "jpg"
+
+
+def _decode(ref, inline, base_dir, root):
+    src = ref["src"]
+    if src.startswith(INLINE_PREFIX):
+        tmp, sha1, size, ext = _decode_inline(inline[int(src[len(INLINE_PREFIX):])])
+    elif base_dir is not None and src and not urlparse(src).scheme.startswith("http"):
+        tmp, sha1, size, ext = _read_local(src, base_dir, root)
+    else:
+        return None  # remota: queda el placeholder
+
+    decoded = _Decoded(src, tmp, sha1, size, ext, (ref["alt"] or "").strip()[:255])
+    tmp.seek(0)
+    with PILImage.open(tmp) as img:
+        decoded.width, decoded.height = img.size
+    tmp.seek(0)
+    return decoded
+
+
+def _safe_decode(ref, inline, base_dir, root):
+    try:
+        return _decode(ref, inline, base_dir, root)
+    except Exception as exc:
+        logger.warning("No se pudo importar la imagen %s: %s", ref["src"][:80], exc)
+        return None
+
+
+def ingest_images(image_refs, inline=(), base_dir=None, user=None, root=None, uploaded=None):
+    """
+    Completa los placeholders de image_refs con ids de imágenes (reusando por hash).
+    Las rutas locales se resuelven desde base_dir y no pueden salir de root (default: base_dir).
+    Si se pasa la lista uploaded, se le agregan las imágenes creadas: si la transacción
+    de quien llama se revierte, puede borrar sus archivos con delete_image_files().
+    """
+    if not image_refs:
+        return 0
+
+    Image = get_image_model()
+    base_dir = Path(base_dir).resolve() if base_dir else None
+    root = Path(root).resolve() if root else base_dir
+
+    # mismo src => se decodifica una sola vez
+    unique_refs = {}
+    for ref in image_refs:
+        if ref["src"]:
+            unique_refs.setdefault(ref["src"], ref)
+
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as pool:
+        decoded = [
+            d for d in pool.map(lambda ref: _safe_decode(ref, inline, base_dir, root), unique_refs.values()) if d
+        ]
+
+        by_hash = {}
+        for d in decoded:
+            by_hash.setdefault(d.sha1, d)
+
+        image_ids = dict(
+            Image.objects.filter(file_hash__in=list(by_hash)).values_list("file_hash", "id")
+        )
+        new = [d for sha1, d in by_hash.items() if sha1 not in image_ids]
+
+        def upload(d):
+            image = Image(
+                title=d.title or f"Imagen importada {d.sha1[:8]}",
+                width=d.width,
+                height=d.height,
+                file_size=d.size,
+                file_hash=d.sha1,
+                uploaded_by_user=user if getattr(user, "pk", None) else None,
+            )
+            name = image.file.field.generate_filename(image, f"import-{d.sha1[:12]}.{d.ext}")
+            image.file.name = image.file.field.storage.save(name, File(d.tmp, name=name))
+            return image
+
+        # se esperan todas las subidas aunque alguna falle: las que sí subieron se borran abajo
+        futures = [pool.submit(upload, d) for d in new]
+        images = []
+        errors = []
+        for future in futures:
+            try:
+                images.append(future.result())
+            except Exception as exc:
+                errors.append(exc)
+
+    for d in decoded:
+        d.tmp.close()
+
+    try:
+        if errors:
+            raise errors[0]
+        with transaction.atomic():
+            created = Image.objects.bulk_create(images)
+    except Exception as exc:
+        logger.exception("Falló la subida de imágenes importadas")
+        delete_image_files(images)
+        raise ValidationError(f"No se pudieron guardar las imágenes pegadas: {exc}") from exc
+
+    for image in created:
+        image_ids[image.file_hash] = image.pk
+        insert_or_update_object(image)
+    if uploaded is not None:
+        uploaded.extend(created)
+
+    id_by_src = {d.ref_src: image_ids.get(d.sha1) for d in decoded}
+    filled = 0
+    for ref in image_refs:
+        image_id = id_by_src.get(ref["src"])
+        if image_id:
+            ref["target"]["image"] = image_id
+            filled += 1
+
+    logger.info("Imágenes importadas: %s nuevas, %s reusadas", len(created), len(decoded) - len(new))
+    return filled
+
+
+def delete_image_files(images):
+    """Borra del storage los archivos de imágenes subidas que no llegaron a quedar en la base."""
+    for image in images:
+        try:
+            image.file.storage.delete(image.file.name)
+        except Exception:
+            logger.warning("No se pudo borrar %s del storage", image.file.name, exc_info=True)
+
+
+def group_galleries(stream_data):
+    """Corridas de 2+ bloques image con imagen y sin caption => 1 bloque gallery."""
+    out = []
+    run = []
+
+    def flush():
+        if len(run) >= 2:
+            out.append({"type": "gallery", "value": {"title": "", "images": [b["value"]["image"] for b in run]}})
+        else:
+            out.extend(run)
+        run.clear()
+
+    for block in stream_data:
+        value = block.get("value") or {}
+        if block["type"] == "image" and value.get("image") and not value.get("caption"):
+            run.append(block)
+            continue
+        flush()
+        out.append(block)
+    flush()
+    return out
+
+
+def parse_html_with_images(html: str, fill_embed_urls: bool = True, parser=None):
+    """
+    Sólo la parte de CPU (sin base ni storage): devuelve (stream_data, image_refs, inline).
+    Los targets de image_refs apuntan a dicts dentro de stream_data; como se devuelven
+    juntos, siguen compartidos aunque la tupla viaje pickleada desde otro proceso.
+    """
+    html, inline = extract_data_uris(html or "")
+    image_refs = []
+    stream_data = html_to_stream_data(html, fill_embed_urls=fill_embed_urls, parser=parser, image_refs=image_refs)
+    return stream_data, image_refs, inline
+
+
+def attach_images(stream_data, image_refs, inline=(), base_dir=None, user=None, root=None, uploaded=None):
+    if ingest_images(image_refs, inline, base_dir=base_dir, user=user, root=root, uploaded=uploaded):
+        stream_data = group_galleries(stream_data)
+    return stream_data
+
+
+def html_to_stream_data_with_images(html: str, fill_embed_urls: bool = True, base_dir=None, user=None, parser=None):
+    """html_to_stream_data + ingesta de imágenes embebidas/locales."""
+    stream_data, image_refs, inline = parse_html_with_images(html, fill_embed_urls=fill_embed_urls, parser=parser)
+    return attach_images(stream_data, image_refs, inline, base_dir=base_dir, user=user)
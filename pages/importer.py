@@ -0,0 +1,195 @@
+# pages/importer.py
+"""
+Importador HTML (Docs/Word) -> StreamField, compartido por DestinoPage y ArticuloPage.
+
+- Cada <h2> => 1 quick_section
+- <p>, <h3>, tablas, listas, citas y <hr> => HTML dentro de quick_section.body
+- primer <img> por sección => quick_section.image (placeholder None)
+- imgs extra => bloque image (placeholder), después de su sección
+  (si se pasa image_refs, se anotan src/alt de cada placeholder para que
+  pages/image_ingest.py los reemplace por imágenes de la biblioteca)
+- iframes => bloque youtube/map (o un link "Embed pendiente")
+- contenido antes del primer <h2> => rich_text suelto
+- antes de recorrer, el árbol pasa por el normalizador (basura de Word/Docs afuera)
+
+El árbol se recorre una sola vez: cuando un nodo se consume entero (una tabla,
+una lista, un <p>), no se baja a sus hijos. Así un <p> dentro de una tabla no se
+emite dos veces y el costo es lineal en el tamaño del documento.
+"""
+from importlib.util import find_spec
+
+from bs4 import BeautifulSoup
+
+from .normalize import normalize_tree
+
+# lxml (requirements.txt) es bastante más rápido que html.parser en pegados grandes;
+# html.parser queda sólo de respaldo para entornos sin lxml
+PARSER = "lxml" if find_spec("lxml") else "html.parser"
+
+KEEP_AS_HTML = {"table", "ul", "ol", "blockquote", "hr"}
+CONSUMED = KEEP_AS_HTML | {"p", "h2", "h3", "img", "iframe"}
+SKIPPED = {"head", "script", "style", "template", "noscript"}
+
+
+def looks_like_youtube(url: str) -> bool:
+    u = (url or "").lower()
+    return ("youtube.com" in u) or ("youtu.be" in u)
+
+
+def looks_like_maps(url: str) -> bool:
+    u = (url or "").lower()
+    return ("google.com/maps" in u) or ("/maps" in u)
+
+
+def clean_html_fragment(html: str) -> str:
+    return (html or "").strip()
+
+
+def iter_content_nodes(root):
+    """
+    Nodos de contenido en orden de documento, sin bajar a los que se consumen enteros.
+    Iterativo (pila de iteradores) para no depender del límite de recursión.
+    """
+    stack = [iter(root.children)]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+
+        name = getattr(node, "name", None)
+        if not name:
+            continue  # texto suelto / comentarios
+
+        tag = name.lower()
+        if tag in CONSUMED:
+            yield tag, node
+        elif tag not in SKIPPED:
+            # contenedores (div, span, section, font, ...): bajar
+            stack.append(iter(node.children))
+
+
+def _empty_section(title: str) -> dict:
+    return {
+        "title": title,
+        "subtitle": "",
+        "body": "",
+        "image": None,  # placeholder: elegir imagen luego
+        "caption": "",
+        "cta_text": "",
+        "cta_url": "",
+        "cta_note": "",
+    }
+
+
+def html_to_stream_data(html: str, fill_embed_urls: bool = True, parser: str = None, image_refs: list = None):
+    soup = BeautifulSoup(html or "", parser or PARSER)
+    root = soup.body or soup
+    normalize_tree(root)  # estilos mso-*, spans vacíos, etc. (ver pages/normalize.py)
+
+    stream_data = []
+    current = None
+    section_chunks = []
+    section_extras = []  # bloques que van después de la sección actual (imgs extra, embeds)
+    section_has_image = False
+
+    def flush_current_section():
+        nonlocal current, section_chunks, section_extras, section_has_image
+        if not current:
+            return
+        current["body"] = clean_html_fragment("".join(section_chunks))
+        stream_data.append({"type": "quick_section", "value": current})
+        stream_data.extend(section_extras)
+        current = None
+        section_chunks = []
+        section_extras = []
+        section_has_image = False
+
+    def flush_intro_as_rich_text():
+        nonlocal section_chunks
+        if section_chunks:
+            combined = clean_html_fragment("".join(section_chunks))
+            if combined:
+                stream_data.append({"type": "rich_text", "value": combined})
+            section_chunks = []
+
+    def add_block(block):
+        if current is None:
+            # antes del primer h2: respetar el orden intro -> bloque
+            flush_intro_as_rich_text()
+            stream_data.append(block)
+        else:
+            section_extras.append(block)
+
+    def add_image(node):
+        nonlocal section_has_image
+        if current is not None and not section_has_image:
+            section_has_image = True
+            current["image"] = None
+            current["caption"] = ""
+            target = current
+        else:
+            target = {"image": None, "caption": ""}
+            add_block({"type": "image", "value": target})
+
+        if image_refs is not None:
+            image_refs.append({"target": target, "src": (node.get("src") or "").strip(), "alt": node.get("alt") or ""})
+
+    def add_iframe(node):
+        src = (node.get("src") or "").strip()
+        if looks_like_youtube(src):
+            add_block({"type": "youtube", "value": {"title": "", "video": (src if fill_embed_urls else "")}})
+        elif looks_like_maps(src):
+            add_block({"type": "map", "value": {"title": "", "map_url": (src if fill_embed_urls else "")}})
+        else:
+            safe = src.replace('"', "&quot;")
+            section_chunks.append(
+                f"<p>📌 Embed pendiente: <a href=\"{safe}\" target=\"_blank\" rel=\"noopener\">{safe}</a></p>"
+            )
+
+    for tag, node in iter_content_nodes(root):
+        if tag == "h2":
+            flush_current_section()
+            flush_intro_as_rich_text()
+
+            title = node.get_text(" ", strip=True)
+            if title:
+                current = _empty_section(title)
+            continue
+
+        if tag == "p":
+            # imgs/iframes dentro del párrafo (típico de Docs) salen como bloques propios
+            media = node.find_all(("img", "iframe"))
+            for m in media:
+                m.extract()
+
+            inner = node.decode_contents().strip()
+            if inner and node.get_text(" ", strip=True):
+                section_chunks.append(f"<p>{inner}</p>")
+
+            for m in media:
+                if m.name == "img":
+                    add_image(m)
+                else:
+                    add_iframe(m)
+
+        elif tag == "h3":
+            text = node.get_text(" ", strip=True)
+            if text:
+                section_chunks.append(f"<h3>{text}</h3>")
+
+        elif tag in KEEP_AS_HTML:
+            section_chunks.append(str(node))
+
+        elif tag == "img":
+            add_image(node)
+
+        elif tag == "iframe":
+            add_iframe(node)
+
+    if current:
+        flush_current_section()
+    else:
+        flush_intro_as_rich_text()
+
+    return stream_data
@@ -0,0 +1,180 @@
+# pages/indexing.py
+"""
+Reindexado de páginas para el buscador (lo usa `manage.py reindex_pages`).
+
+- incremental: sólo las páginas con last_published_at posterior al cursor de la
+  corrida anterior (lo típico después de un import masivo).
+- completo: todo el árbol, partido en tandas de ids que se indexan en paralelo
+  en un pool de procesos.
+
+En los dos modos las tandas se recorren en orden (last_published_at, id) o
+(id) y el cursor (SearchIndexRun) se guarda después de cada tanda terminada en
+orden: si se corta el comando, la próxima corrida sigue desde ahí.
+
+Con SQLite se indexa en el proceso principal: un solo escritor por base, los
+workers en paralelo sólo se bloquearían entre sí.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import django
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils import timezone
+from wagtail.models import Page
+from wagtail.search.backends import get_search_backends
+
+from .models import SearchIndexRun
+
+INDEX_CHUNK_SIZE = 200
+
+
+@dataclass
+class IndexStats:
+    total: int = 0
+    indexed: int = 0
+    chunks: int = 0
+    worker_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.indexed / self.elapsed if self.elapsed else 0.0
+
+
+def _init_worker():
+    django.setup()
+
+
+def index_pages(page_ids):
+    """Indexa una tanda (specific() = 1 query por tipo) en todos los backends. Corre en el pool."""
+    t0 = time.perf_counter()
+    by_model = {}
+    for page in Page.objects.filter(id__in=page_ids).specific():
+        by_model.setdefault(type(page), []).append(page)
+
+    for backend in get_search_backends():
+        for model, pages in by_model.items():
+            backend.add_bulk(model, pages)
+    return len(page_ids), time.perf_counter() - t0
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _workers(requested=None) -> int:
+    if connection.vendor == "sqlite":
+        return 1
+    return max(1, requested or os.cpu_count() or 2)
+
+
+def _run_chunks(chunks, workers, on_chunk):
+    """Indexa las tandas (en orden) y llama on_chunk(tanda, indexadas, segundos) por cada una."""
+    if workers == 1:
+        for chunk in chunks:
+            on_chunk(chunk, *index_pages([pk for pk, _published in chunk]))
+        return
+
+    # los hijos abren sus propias conexiones
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        ids = [[pk for pk, _published in chunk] for chunk in chunks]
+        # map() devuelve en orden: el cursor sólo avanza sobre tandas contiguas terminadas
+        for chunk, (count, seconds) in zip(chunks, pool.map(index_pages, ids)):
+            on_chunk(chunk, count, seconds)
+
+
+def _get_run(mode):
+    run, _created = SearchIndexRun.objects.get_or_create(mode=mode)
+    return run
+
+
+def reindex_incremental(chunk_size=INDEX_CHUNK_SIZE, workers=None, progress=None):
+    """Páginas publicadas desde la última corrida (o desde el último completo)."""
+    run = _get_run(SearchIndexRun.INCREMENTAL)
+    qs = Page.objects.filter(last_published_at__isnull=False)
+    if run.cursor_published_at:
+        qs = qs.filter(
+            Q(last_published_at__gt=run.cursor_published_at)
+            | Q(last_published_at=run.cursor_published_at, id__gt=run.cursor_id)
+        )
+    rows = list(qs.order_by("last_published_at", "id").values_list("id", "last_published_at"))
+
+    run.in_progress = True
+    run.started_at = timezone.now()
+    run.indexed = 0
+    run.save()
+
+    stats = IndexStats(total=len(rows))
+
+    def on_chunk(chunk, count, seconds):
+        stats.indexed += count
+        stats.chunks += 1
+        stats.worker_seconds += seconds
+        run.cursor_id, run.cursor_published_at = chunk[-1]
+        run.indexed = stats.indexed
+        run.save(update_fields=["cursor_id", "cursor_published_at", "indexed"])
+        if progress:
+            progress(stats)
+
+    _run_chunks(list(_chunks(rows, chunk_size)), _workers(workers), on_chunk)
+
+    run.in_progress = False
+    run.finished_at = timezone.now()
+    run.save(update_fields=["in_progress", "finished_at"])
+    return stats
+
+
+def reindex_full(chunk_size=INDEX_CHUNK_SIZE, workers=None, progress=None, restart=False):
+    """Todo el árbol por tandas de ids; retoma una corrida cortada salvo restart=True."""
+    run = _get_run(SearchIndexRun.FULL)
+    if restart or not run.in_progress:
+        run.cursor_id = 0
+        run.indexed = 0
+        run.started_at = timezone.now()
+        # lo publicado hasta acá queda cubierto: el incremental sigue desde este punto
+        run.cursor_published_at = (
+            Page.objects.filter(last_published_at__isnull=False)
+            .order_by("-last_published_at").values_list("last_published_at", flat=True).first()
+        )
+    run.in_progress = True
+    run.save()
+
+    rows = list(
+        Page.objects.filter(depth__gt=1, id__gt=run.cursor_id)
+        .order_by("id").values_list("id", "last_published_at")
+    )
+    stats = IndexStats(total=len(rows))
+
+    def on_chunk(chunk, count, seconds):
+        stats.indexed += count
+        stats.chunks += 1
+        stats.worker_seconds += seconds
+        run.cursor_id = chunk[-1][0]
+        run.indexed += count
+        run.save(update_fields=["cursor_id", "indexed"])
+        if progress:
+            progress(stats)
+
+    _run_chunks(list(_chunks(rows, chunk_size)), _workers(workers), on_chunk)
+
+    run.in_progress = False
+    run.finished_at = timezone.now()
+    run.save(update_fields=["in_progress", "finished_at"])
+
+    incremental = _get_run(SearchIndexRun.INCREMENTAL)
+    if run.cursor_published_at and (
+        incremental.cursor_published_at is None or incremental.cursor_published_at < run.cursor_published_at
+    ):
+        incremental.cursor_published_at = run.cursor_published_at
+        incremental.cursor_id = 0
+        incremental.save(update_fields=["cursor_published_at", "cursor_id"])
+    return stats
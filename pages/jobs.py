@@ -0,0 +1,103 @@
+# pages/jobs.py
+"""
+Cola de importaciones en la base de datos (sin broker externo).
+
+El admin encola un ImportJob cuando el pegado es muy grande (ver
+BulkPasteMixin.should_import_in_background) y `manage.py run_import_jobs`
+lo convierte, crea la revisión (y la publica si el editor había publicado).
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .image_ingest import html_to_stream_data_with_images
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+# un job "running" más viejo que esto se considera de un worker caído y se reintenta
+STALE_AFTER = timedelta(minutes=30)
+
+
+def enqueue_import_job(page, user=None, publish=False):
+    """Encola (o actualiza, si ya había uno en cola) la importación del bulk_paste de la página."""
+    with transaction.atomic():
+        job = ImportJob.objects.filter(page_id=page.pk, status=ImportJob.PENDING).first()
+        if job is None:
+            job = ImportJob(page_id=page.pk)
+        job.html = page.bulk_paste
+        job.publish = publish
+        job.requested_by = user if getattr(user, "pk", None) else None
+        job.save()
+    return job
+
+
+def latest_import_job(page):
+    return ImportJob.objects.filter(page_id=page.pk).order_by("-created_at", "-id").first()
+
+
+def fail_stale_jobs():
+    """Jobs "running" colgados que ya agotaron los reintentos: quedan como fallidos."""
+    now = timezone.now()
+    return ImportJob.objects.filter(
+        status=ImportJob.RUNNING,
+        started_at__lt=now - STALE_AFTER,
+        attempts__gte=MAX_ATTEMPTS,
+    ).update(
+        status=ImportJob.FAILED,
+        error=f"El worker no terminó después de {MAX_ATTEMPTS} intentos (¿se cayó o se quedó sin memoria?)",
+        finished_at=now,
+    )
+
+
+def claim_next_job():
+    """Toma el próximo job con un UPDATE condicional (seguro con varios workers, también en SQLite)."""
+    fail_stale_jobs()
+    stale = timezone.now() - STALE_AFTER
+    candidates = (
+        ImportJob.objects.filter(status=ImportJob.PENDING)
+        | ImportJob.objects.filter(status=ImportJob.RUNNING, started_at__lt=stale, attempts__lt=MAX_ATTEMPTS)
+    ).order_by("created_at", "id").values_list("id", "status", "attempts")[:10]
+
+    for job_id, status, attempts in candidates:
+        claimed = ImportJob.objects.filter(id=job_id, status=status, attempts=attempts).update(
+            status=ImportJob.RUNNING,
+            started_at=timezone.now(),
+            attempts=attempts + 1,
+        )
+        if claimed:
+            return ImportJob.objects.select_related("page").get(id=job_id)
+    return None
+
+
+def run_import_job(job):
+    """Convierte el HTML, guarda la revisión y deja el estado/error en el job."""
+    try:
+        page = job.page.specific.get_latest_revision_as_object()
+
+        data = html_to_stream_data_with_images(job.html, fill_embed_urls=True, user=job.requested_by)
+        if not data:
+            raise ValueError("El HTML pegado no generó ningún bloque")
+
+        page.body = data
+        page.bulk_paste = ""
+        revision = page.save_revision(user=job.requested_by, log_action=True)
+        if job.publish:
+            revision.publish(user=job.requested_by)
+
+        job.status = ImportJob.DONE
+        job.blocks = len(data)
+        job.error = ""
+        job.html = ""  # ya está en la revisión; no guardar dos veces MBs de HTML
+    except Exception:
+        logger.exception("Falló la importación #%s", job.pk)
+        job.status = ImportJob.FAILED
+        job.error = traceback.format_exc()
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "blocks", "error", "html", "finished_at"])
+    return job
@@ -0,0 +1,90 @@
+import random
+import re
+import time
+import unicodedata
+
+from django.core.management.base import BaseCommand
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+
+from pages.headings import index_headings
+
+
+def _legacy_unique_anchor(title: str, used: dict) -> str:
+    title = (title or "").strip()
+    norm = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("ascii")
+    base = slugify(norm) or "seccion"
+    used[base] = used.get(base, 0) + 1
+    return base if used[base] == 1 else f"{base}-{used[base]}"
+
+
+def legacy_regex_path(html: str):
+    """Copia del camino viejo de pages/utils.build_toc_and_body_html (re.sub por <h2>)."""
+    toc = []
+    used = {}
+
+    def repl(match):
+        inner = match.group(1)
+        title = strip_tags(inner).strip()
+        if not title:
+            return match.group(0)
+        anchor = _legacy_unique_anchor(title, used)
+        toc.append({"title": title, "anchor": anchor})
+        return f'<h2 id="{anchor}">{inner}</h2>'
+
+    html = re.sub(r"<h2[^>]*>(.*?)</h2>", repl, html, flags=re.IGNORECASE | re.DOTALL)
+    return html, toc
+
+
+def build_corpus(target_bytes: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    words = "playa montaña ciudad hotel excursión río lago museo mercado plaza ruta vuelo tren".split()
+    chunks = []
+    size = 0
+    n = 0
+    while size < target_bytes:
+        n += 1
+        title = " ".join(rnd.choice(words) for _ in range(3)).capitalize()
+        chunk = [f'<h2 class="sec" data-n="{n}">{title} <em>#{n % 40}</em></h2>']
+        for _ in range(rnd.randint(3, 8)):
+            text = " ".join(rnd.choice(words) for _ in range(rnd.randint(30, 80)))
+            chunk.append(f"<p>{text} <b>{rnd.choice(words)}</b> <a href=\"/x/{n}/\">{rnd.choice(words)}</a></p>")
+        if n % 3 == 0:
+            chunk.append(f"<h3>Dato útil {n}</h3><ul><li>{rnd.choice(words)}</li></ul>")
+        html = "".join(chunk)
+        chunks.append(html)
+        size += len(html.encode("utf-8"))
+    return "".join(chunks)
+
+
+class Command(BaseCommand):
+    help = "Benchmark del indexador de headings en una pasada vs el re.sub viejo sobre un rich_text grande."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kb", type=int, default=500, help="Tamaño del rich_text en KB (default: 500)")
+        parser.add_argument("--runs", type=int, default=5, help="Repeticiones (default: 5)")
+
+    def handle(self, *args, **opts):
+        html = build_corpus(opts["kb"] * 1024)
+        runs: int = max(1, opts["runs"])
+        self.stdout.write(f"rich_text: {len(html.encode('utf-8')) / 1024:.0f} KB")
+
+        def run_indexer():
+            used = {}
+            return index_headings(html, lambda title, level: _legacy_unique_anchor(title, used))
+
+        results = {}
+        for label, fn in (("regex (viejo)", lambda: legacy_regex_path(html)), ("una pasada", run_indexer)):
+            best = None
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                out = fn()
+                elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = out
+            self.stdout.write(f"  {label:<14} {best * 1000:8.1f} ms")
+
+        legacy_h2 = [item["anchor"] for item in results["regex (viejo)"][1]]
+        new_h2 = [item["anchor"] for item in results["una pasada"][1] if item["level"] == 2]
+        same = "sí" if legacy_h2 == new_h2[: len(legacy_h2)] and len(legacy_h2) == len(new_h2) else "NO"
+        self.stdout.write(f"  h2 indexados: {len(legacy_h2)} (mismos títulos/orden: {same})")
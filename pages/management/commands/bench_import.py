@@ -0,0 +1,78 @@
+import random
+import time
+import tracemalloc
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from pages.importer import html_to_stream_data
+
+WORDS = (
+    "playa montaña ciudad hotel excursión río lago museo mercado plaza ruta vuelo tren "
+    "temporada clima presupuesto reserva traslado barrio atardecer mirador"
+).split()
+
+
+def _text(rnd, n):
+    return " ".join(rnd.choice(WORDS) for _ in range(n))
+
+
+def build_paste(target_bytes: int, seed: int = 11) -> str:
+    """Pegado tipo Google Docs / Word: spans con estilos, tablas, listas, imágenes en <p>."""
+    rnd = random.Random(seed)
+    span = '<span style="font-size:11pt;font-family:Arial;color:#000000;background-color:transparent;font-weight:400;mso-bidi-font-family:Calibri">{}</span>'
+    out = ['<html><head><meta charset="utf-8"><style>p{margin:0}</style></head><body><div dir="ltr">']
+    size = len(out[0])
+    n = 0
+    while size < target_bytes:
+        n += 1
+        chunk = [f'<h2 dir="ltr" style="line-height:1.38"><span style="font-size:16pt">{_text(rnd, 4).capitalize()}</span></h2>']
+        for _ in range(rnd.randint(3, 7)):
+            chunk.append(f'<p dir="ltr" style="line-height:1.38;margin-top:0pt">{span.format(_text(rnd, rnd.randint(20, 60)))}</p>')
+        if n % 2 == 0:
+            rows = "".join(
+                f"<tr><td><p>{span.format(_text(rnd, 3))}</p></td><td><p>{span.format(_text(rnd, 5))}</p></td></tr>"
+                for _ in range(rnd.randint(3, 8))
+            )
+            chunk.append(f'<div align="left"><table style="border:none"><tbody>{rows}</tbody></table></div>')
+        if n % 3 == 0:
+            items = "".join(f"<li><p>{span.format(_text(rnd, 6))}</p></li>" for _ in range(4))
+            chunk.append(f"<ul>{items}</ul>")
+        if n % 4 == 0:
+            chunk.append(f'<p><span><img src="https://lh7-us.googleusercontent.com/{n}.png" width="602" height="339"></span></p>')
+        html = "".join(chunk)
+        out.append(html)
+        size += len(html.encode("utf-8"))
+    out.append("</div></body></html>")
+    return "".join(out)
+
+
+class Command(BaseCommand):
+    help = "Benchmark del importador HTML -> StreamField: tiempo y memoria pico sobre pegados de 1–5 MB."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=str, default="1,2,5", help="Tamaños en MB del corpus generado (default: 1,2,5)")
+        parser.add_argument("--file", action="append", default=[], help="HTML real a medir (se puede repetir)")
+
+    def handle(self, *args, **opts):
+        corpus = [(f"generado {mb} MB", build_paste(int(float(mb) * 1024 * 1024))) for mb in opts["sizes"].split(",") if mb]
+        corpus += [(Path(f).name, Path(f).read_text(encoding="utf-8", errors="replace")) for f in opts["file"]]
+
+        parsers = ["html.parser"] + (["lxml"] if find_spec("lxml") else [])
+
+        for label, html in corpus:
+            self.stdout.write(f"{label} ({len(html.encode('utf-8')) / 1024 / 1024:.1f} MB)")
+            for parser in parsers:
+                t0 = time.perf_counter()
+                data = html_to_stream_data(html, parser=parser)
+                elapsed = time.perf_counter() - t0
+
+                tracemalloc.start()
+                html_to_stream_data(html, parser=parser)
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f"  {parser:<12} {elapsed:7.2f} s   pico {peak / 1024 / 1024:7.1f} MB   bloques={len(data)}"
+                )
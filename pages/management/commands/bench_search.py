@@ -0,0 +1,108 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from pages.pg_search import search_config
+
+WORDS = (
+    "playa montaña lago glaciar ciudad pueblo vino bodega trekking cascada desierto selva río isla "
+    "bariloche mendoza córdoba salta ushuaia iguazú tulum cusco cartagena florianópolis valparaíso "
+    "hotel hostel cabaña camping excursión tour museo mercado gastronomía asado empanadas mariscos "
+    "invierno verano otoño primavera temporada presupuesto barato lujo familia pareja mochilero "
+    "vuelo bus auto ruta mapa itinerario días semana fin consejos guía recomendaciones seguridad"
+).split()
+QUERIES = ["playa", "bariloche invierno", "vino mendoza", "trekking glaciar", "empanadas salta", "hotel familia"]
+
+
+def _text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark (sólo Postgres) del tsvector ponderado guardado + GIN vs to_tsvector en cada consulta, "
+        "sobre tablas temporales con documentos sintéticos (ver pages/pg_search.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000", help="Cantidades de páginas (default: 10000,100000)")
+        parser.add_argument("--runs", type=int, default=20, help="Repeticiones por query (default: 20)")
+        parser.add_argument("--words", type=int, default=400, help="Palabras de texto por página (default: 400)")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "postgresql":
+            raise CommandError("bench_search necesita Postgres (DATABASE_URL); en SQLite no hay tsvector/GIN.")
+
+        sizes = [int(s) for s in opts["sizes"].split(",") if s.strip()]
+        for size in sizes:
+            with transaction.atomic():
+                self.bench_size(size, opts["runs"], opts["words"])
+                transaction.set_rollback(True)  # no deja nada en la base
+
+    def bench_size(self, size, runs, words):
+        rng = random.Random(size)
+        config = search_config()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE bench_docs (id int PRIMARY KEY, title text, intro text, sections text, body text, vector tsvector)"
+            )
+            t0 = time.perf_counter()
+            rows = [
+                (i, _text(rng, 3), _text(rng, 25), _text(rng, 15), _text(rng, words))
+                for i in range(1, size + 1)
+            ]
+            cursor.executemany("INSERT INTO bench_docs (id, title, intro, sections, body) VALUES (%s, %s, %s, %s, %s)", rows)
+            insert_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            cursor.execute(
+                """
+                UPDATE bench_docs SET vector =
+                    setweight(to_tsvector(%(c)s::regconfig, title), 'A')
+                    || setweight(to_tsvector(%(c)s::regconfig, intro), 'B')
+                    || setweight(to_tsvector(%(c)s::regconfig, sections), 'B')
+                    || setweight(to_tsvector(%(c)s::regconfig, body), 'C')
+                """,
+                {"c": config},
+            )
+            cursor.execute("CREATE INDEX bench_docs_gin ON bench_docs USING gin (vector)")
+            cursor.execute("ANALYZE bench_docs")
+            build_s = time.perf_counter() - t0
+
+            cursor.execute("SELECT pg_size_pretty(pg_total_relation_size('bench_docs'))")
+            table_size = cursor.fetchone()[0]
+
+            stored_sql = """
+                SELECT id, ts_rank(vector, q) AS rank
+                FROM bench_docs, websearch_to_tsquery(%(c)s::regconfig, %(q)s) q
+                WHERE vector @@ q ORDER BY rank DESC, id DESC LIMIT 12
+            """
+            on_the_fly_sql = """
+                SELECT id, ts_rank(v, q) AS rank
+                FROM (
+                    SELECT id, to_tsvector(%(c)s::regconfig, concat_ws(' ', title, intro, sections, body)) AS v
+                    FROM bench_docs
+                ) d, websearch_to_tsquery(%(c)s::regconfig, %(q)s) q
+                WHERE v @@ q ORDER BY rank DESC, id DESC LIMIT 12
+            """
+
+            self.stdout.write(self.style.SUCCESS(
+                f"\n{size} páginas: insert {insert_s:.1f}s, tsvector + GIN {build_s:.1f}s, tabla {table_size}"
+            ))
+            for label, sql, n in (("tsvector + GIN", stored_sql, runs), ("to_tsvector por consulta", on_the_fly_sql, max(1, runs // 10))):
+                timings = []
+                for query in QUERIES:
+                    for _ in range(n):
+                        t0 = time.perf_counter()
+                        cursor.execute(sql, {"c": config, "q": query})
+                        cursor.fetchall()
+                        timings.append((time.perf_counter() - t0) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f"  {label:<26} p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms   ({len(timings)} consultas)"
+                )
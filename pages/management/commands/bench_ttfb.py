@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from wagtail.models import Page
+
+
+class Command(BaseCommand):
+    help = "Mide TTFB y tiempo total de una guía/destino con y sin streaming del body (caché fría)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("page_id", type=int, help="ID de la DestinoPage/ArticuloPage")
+        parser.add_argument("--runs", type=int, default=5, help="Repeticiones por modo (default: 5)")
+        parser.add_argument("--host", type=str, default="", help="Host del request (default: primer ALLOWED_HOSTS)")
+
+    def handle(self, *args, **opts):
+        page = Page.objects.filter(pk=opts["page_id"]).first()
+        if page is None:
+            raise CommandError(f"No existe la página {opts['page_id']}")
+        page = page.specific
+        if not hasattr(page, "get_body_context"):
+            raise CommandError(f"{page.specific_class.__name__} no tiene body con TOC")
+
+        host = opts["host"] or (settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost")
+        runs: int = max(1, opts["runs"])
+
+        self.stdout.write(f"{page.title} ({len(page.body.raw_data)} bloques), {runs} corridas por modo")
+
+        for label, streaming in (("normal", False), ("streaming", True)):
+            ttfbs, totals = [], []
+            with override_settings(PAGES_STREAM_BODY=streaming, PAGES_STREAM_MIN_BLOCKS=0):
+                for _ in range(runs):
+                    cache.clear()  # caché fría: medimos el render real
+                    request = RequestFactory().get(page.url_path, HTTP_HOST=host)
+                    request.user = AnonymousUser()
+
+                    t0 = time.perf_counter()
+                    response = page.serve(request)
+                    if response.streaming:
+                        chunks = iter(response.streaming_content)
+                        next(chunks)
+                        ttfbs.append(time.perf_counter() - t0)
+                        for _chunk in chunks:
+                            pass
+                    else:
+                        response.render()
+                        ttfbs.append(time.perf_counter() - t0)
+                    totals.append(time.perf_counter() - t0)
+
+            self.stdout.write(
+                f"  {label:<10} TTFB={min(ttfbs) * 1000:8.1f} ms   total={min(totals) * 1000:8.1f} ms"
+            )
@@ -0,0 +1,82 @@
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.bulk_import import BulkImporter, read_mapping
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa un directorio (o .zip) de exports HTML como DestinoPage/ArticuloPage "
+        "según un CSV de mapeo (ver pages/bulk_import.py). Reanudable: saltea slugs ya creados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Directorio o .zip con los HTML")
+        parser.add_argument("--mapping", help="CSV de mapeo (default: mapping.csv dentro de source)")
+        parser.add_argument("--publish", action="store_true", help="Publicar las páginas (si no, quedan como borrador)")
+        parser.add_argument("--workers", type=int, default=None, help="Procesos de conversión (default: CPUs)")
+        parser.add_argument("--batch", type=int, default=25, help="Páginas por transacción (default: 25)")
+        parser.add_argument("--user", help="Username que figura como autor de las revisiones")
+
+    def handle(self, *args, **opts):
+        source = Path(opts["source"])
+        if not source.exists():
+            raise CommandError(f"No existe {source}")
+
+        user = None
+        if opts["user"]:
+            user = get_user_model().objects.filter(username=opts["user"]).first()
+            if user is None:
+                raise CommandError(f"No existe el usuario {opts['user']}")
+
+        if zipfile.is_zipfile(source):
+            with tempfile.TemporaryDirectory(prefix="dp-import-") as tmp:
+                # extractall ya descarta rutas absolutas y ".."
+                with zipfile.ZipFile(source) as zf:
+                    zf.extractall(tmp)
+                self.run_import(Path(tmp), opts, user)
+        elif source.is_dir():
+            self.run_import(source, opts, user)
+        else:
+            raise CommandError("source tiene que ser un directorio o un .zip")
+
+    def run_import(self, base_dir: Path, opts, user):
+        mapping = Path(opts["mapping"]) if opts["mapping"] else base_dir / "mapping.csv"
+        if not mapping.is_file():
+            raise CommandError(f"No se encontró el mapeo {mapping}")
+
+        rows = read_mapping(mapping)
+        importer = BulkImporter(
+            base_dir,
+            rows,
+            publish=opts["publish"],
+            user=user,
+            batch_size=opts["batch"],
+            workers=opts["workers"],
+            progress=self.report_progress,
+        )
+        self.stdout.write(f"📦 {len(rows)} filas, {importer.workers} procesos, lotes de {importer.batch_size}")
+        stats = importer.run()
+
+        elapsed = stats.elapsed or 1e-9
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats.created} creadas, {stats.skipped} ya existían, {len(stats.failed)} con error "
+            f"en {elapsed:.1f}s ({stats.created / elapsed:.1f} páginas/s, "
+            f"{stats.bytes_read / 1024 / 1024 / elapsed:.2f} MB/s de HTML)"
+        ))
+        self.stdout.write(
+            f"   conversión: {stats.convert_seconds:.1f}s de CPU en el pool · inserción: {stats.insert_seconds:.1f}s"
+        )
+        for line, archivo, error in sorted(stats.failed):
+            self.stdout.write(self.style.ERROR(f"❌ fila {line} ({archivo}): {error}"))
+        if stats.failed:
+            self.stdout.write("Corregí esas filas y volvé a correr el comando: lo ya importado se saltea.")
+
+    def report_progress(self, stats):
+        done = stats.created + stats.skipped + len(stats.failed)
+        elapsed = stats.elapsed or 1e-9
+        self.stdout.write(f"   {done}/{stats.rows} · {stats.created / elapsed:.1f} páginas/s")
@@ -0,0 +1,86 @@
+import json
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from wagtail.models import Revision
+
+from pages.models import ArticuloPage, DestinoPage
+from pages.normalize import normalize_stream_data
+
+CHUNK = 200
+
+
+def _size(raw_data) -> int:
+    return len(json.dumps(raw_data, ensure_ascii=False).encode("utf-8"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Normaliza el HTML de quick_section.body (estilos mso-*, spans vacíos, ...) en las páginas "
+        "y sus revisiones, sin cambiar lo que se ve (ver pages/normalize.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Sólo calcula cuánto se ahorraría")
+        parser.add_argument("--no-revisions", action="store_true", help="No tocar el historial de revisiones")
+        parser.add_argument("--page", type=int, action="append", help="Limitar a estas páginas (repetible)")
+
+    def handle(self, *args, **opts):
+        dry_run: bool = opts["dry_run"]
+        page_ids = opts["page"]
+        saved = defaultdict(lambda: [0, 0])  # page_id -> [bytes body, bytes revisiones]
+
+        for model in (DestinoPage, ArticuloPage):
+            qs = model.objects.only("id", "title", "body").order_by("id")
+            if page_ids:
+                qs = qs.filter(id__in=page_ids)
+            for page in qs.iterator(chunk_size=CHUNK):
+                raw = [dict(b) for b in page.body.raw_data]
+                before = _size(raw)
+                if not normalize_stream_data(raw):
+                    continue
+                saved[page.pk][0] += before - _size(raw)
+                if not dry_run:
+                    page.body = raw
+                    # update() y no save(): no dispara bulk_paste / revisiones / señales
+                    model.objects.filter(pk=page.pk).update(body=page.body)
+
+        if not opts["no_revisions"]:
+            content_types = ContentType.objects.get_for_models(DestinoPage, ArticuloPage).values()
+            revisions = Revision.objects.filter(content_type__in=content_types).order_by("id")
+            if page_ids:
+                revisions = revisions.filter(object_id__in=[str(pk) for pk in page_ids])
+
+            pending = []
+            for revision in revisions.iterator(chunk_size=CHUNK):
+                body = revision.content.get("body")
+                if not body:
+                    continue
+                raw = json.loads(body) if isinstance(body, str) else body
+                before = _size(raw)
+                if not normalize_stream_data(raw):
+                    continue
+                saved[int(revision.object_id)][1] += before - _size(raw)
+                revision.content["body"] = json.dumps(raw) if isinstance(body, str) else raw
+                pending.append(revision)
+                if len(pending) >= CHUNK:
+                    if not dry_run:
+                        self.save_revisions(pending)
+                    pending = []
+            if pending and not dry_run:
+                self.save_revisions(pending)
+
+        for page_id, (body_bytes, revision_bytes) in sorted(saved.items()):
+            self.stdout.write(
+                f"página {page_id}: -{body_bytes / 1024:.1f} KB en el body, -{revision_bytes / 1024:.1f} KB en revisiones"
+            )
+
+        total = sum(b + r for b, r in saved.values())
+        prefix = "🔎 (dry-run) se ahorrarían" if dry_run else "✅ Ahorrados"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {total / 1024:.1f} KB en {len(saved)} páginas"))
+
+    def save_revisions(self, revisions):
+        with transaction.atomic():
+            Revision.objects.bulk_update(revisions, ["content"])
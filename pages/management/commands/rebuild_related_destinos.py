@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.related import rebuild_related_destinos
+
+
+class Command(BaseCommand):
+    help = "Recalcula toda la tabla de destinos relacionados (RelatedDestino)."
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        pages, rows = rebuild_related_destinos()
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Relacionados recalculados: {pages} destinos, {rows} filas en {elapsed:.2f}s"
+        ))
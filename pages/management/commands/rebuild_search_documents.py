@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.models import ArticuloPage, DestinoPage
+from pages.search_text import build_search_document
+
+CHUNK_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa search_sections / search_text (ver pages/search_text.py) de destinos y guías que no los tienen; "
+        "--all los recalcula todos (después de cambiar build_search_document)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recalcular también los que ya tienen documento")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        total = 0
+        for model in (DestinoPage, ArticuloPage):
+            streams = model.search_document_streams
+            qs = model.objects.only("id", *streams)
+            if not opts["all"]:
+                qs = qs.filter(search_sections="", search_text="")
+            for page in qs.iterator(chunk_size=CHUNK_SIZE):
+                sections, text = build_search_document(*(getattr(page, name).raw_data for name in streams))
+                model.objects.filter(pk=page.pk).update(search_sections=sections, search_text=text)
+                total += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total} documentos de búsqueda recalculados en {time.perf_counter() - t0:.1f}s"
+        ))
+        if total:
+            self.stdout.write("   El índice del buscador se actualiza con `manage.py reindex_pages --full`.")
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.models import PageSearchVector
+from pages.pg_search import postgres_search_enabled, refresh_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recalcula los tsvector de destinos/guías publicados (PAGES_SEARCH_POSTGRES, ver pages/pg_search.py)."
+
+    def handle(self, *args, **opts):
+        if not postgres_search_enabled():
+            self.stdout.write("PAGES_SEARCH_POSTGRES apagado o base no Postgres: nada que hacer.")
+            return
+
+        t0 = time.perf_counter()
+        # despublicadas/borradas: fuera (las live se reescriben abajo)
+        stale = PageSearchVector.objects.filter(page__live=False).delete()[0]
+        count = refresh_search_vectors()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {count} vectores recalculados, {stale} obsoletos borrados en {time.perf_counter() - t0:.1f}s"
+        ))
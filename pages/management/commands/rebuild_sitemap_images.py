@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.sitemap_images import rebuild_sitemap_images
+
+
+class Command(BaseCommand):
+    help = "Recalcula las URLs de imágenes del sitemap (SitemapImage) de todas las páginas publicadas."
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        pages, rows = rebuild_sitemap_images()
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imágenes del sitemap recalculadas: {pages} páginas, {rows} imágenes en {elapsed:.2f}s"
+        ))
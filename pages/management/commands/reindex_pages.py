@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from pages.indexing import INDEX_CHUNK_SIZE, reindex_full, reindex_incremental
+
+
+class Command(BaseCommand):
+    help = (
+        "Reindexa páginas en el buscador. Por defecto incremental (publicadas desde la última corrida); "
+        "--full recorre todo el árbol en paralelo. Se puede cortar y volver a correr: retoma (ver pages/indexing.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Reindexar todo el árbol")
+        parser.add_argument("--restart", action="store_true", help="Con --full: empezar de cero aunque haya una corrida cortada")
+        parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (default: CPUs; SQLite: 1)")
+        parser.add_argument("--chunk", type=int, default=INDEX_CHUNK_SIZE, help=f"Páginas por tanda (default: {INDEX_CHUNK_SIZE})")
+
+    def handle(self, *args, **opts):
+        kwargs = {"chunk_size": max(1, opts["chunk"]), "workers": opts["workers"], "progress": self.report_progress}
+        if opts["full"]:
+            stats = reindex_full(restart=opts["restart"], **kwargs)
+        else:
+            stats = reindex_incremental(**kwargs)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats.indexed} páginas en {stats.chunks} tandas, {stats.elapsed:.1f}s "
+            f"({stats.rate:.0f} páginas/s; {stats.worker_seconds:.1f}s de trabajo en los workers)"
+        ))
+
+    def report_progress(self, stats):
+        self.stdout.write(f"   {stats.indexed}/{stats.total} · {stats.rate:.0f} páginas/s")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from pages.rendering import block_cache_stats, reset_block_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Hits/misses de la caché por bloque del tráfico real: contadores de todos los workers "
+        "en la base (pages/counters.py; cada worker vuelca cada ~10s)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Pone los contadores en cero")
+
+    def handle(self, *args, **opts):
+        if opts["reset"]:
+            reset_block_cache_stats()
+            self.stdout.write("Contadores en cero.")
+            return
+
+        stats = block_cache_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Bloques: hits={stats['hits']} misses={stats['misses']} ratio={stats['ratio']:.1%}"
+        ))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.jobs import claim_next_job, run_import_job
+from pages.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = "Worker de importaciones bulk_paste en segundo plano (cola en la base, sin broker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Procesa lo que haya en cola y termina")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Segundos entre consultas a la cola (default: 2)")
+
+    def handle(self, *args, **opts):
+        once: bool = opts["once"]
+        sleep: float = opts["sleep"]
+
+        self.stdout.write("Worker de importaciones iniciado" + (" (--once)" if once else ""))
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if once:
+                        break
+                    time.sleep(sleep)
+                    continue
+
+                t0 = time.perf_counter()
+                job = run_import_job(job)
+                elapsed = time.perf_counter() - t0
+
+                if job.status == ImportJob.DONE:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"✅ #{job.pk} página {job.page_id}: {job.blocks} bloques en {elapsed:.1f}s"
+                    ))
+                else:
+                    self.stdout.write(self.style.ERROR(
+                        f"❌ #{job.pk} página {job.page_id}: {job.error.strip().splitlines()[-1]}"
+                    ))
+        except KeyboardInterrupt:
+            self.stdout.write("Worker detenido")
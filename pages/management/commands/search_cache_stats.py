@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from pages.search import reset_search_cache_stats, search_cache_stats, search_pages
+
+
+class Command(BaseCommand):
+    help = (
+        "Hits/misses de la caché de búsqueda: contadores de todos los workers en la base "
+        "(pages/counters.py; cada worker vuelca cada ~10s). Con --query la calienta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Pone los contadores en cero")
+        parser.add_argument("--query", action="append", default=[], help="Busca (y cachea) esta query; repetible")
+
+    def handle(self, *args, **opts):
+        if opts["reset"]:
+            reset_search_cache_stats()
+
+        for query in opts["query"]:
+            page_obj, _hits, cache_hit = search_pages(query)
+            self.stdout.write(f"  {query!r}: {page_obj.paginator.count} resultados ({'hit' if cache_hit else 'miss'})")
+
+        stats = search_cache_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Búsqueda: hits={stats['hits']} misses={stats['misses']} ratio={stats['ratio']:.1%}"
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.sitemaps import ALL_SECTIONS, sitemap_root, write_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        "Escribe en disco el sitemap index y sus archivos (+ .gz/.br) que sirve WhiteNoise (ver pages/sitemaps.py). "
+        "Corre en el build; después cada publish reescribe sólo el archivo afectado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--section", action="append", choices=ALL_SECTIONS, help="Sólo estas secciones (repetible)")
+        parser.add_argument("--base-url", help="Dominio de las URLs (default: PAGES_SITEMAP_BASE_URL)")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        stats = write_sitemaps(opts["section"], base_url=opts["base_url"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {sitemap_root()}: {stats['written']} escritos, {stats['unchanged']} sin cambios, "
+            f"{stats['removed']} borrados en {time.perf_counter() - t0:.1f}s"
+        ))
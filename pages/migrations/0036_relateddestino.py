@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0035_articulopage_cover_image_articulopage_intro_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedDestino',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0, help_text='Tags compartidos (0 = hermano de relleno)')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_index', to='pages.destinopage')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pages.destinopage')),
+            ],
+            options={
+                'ordering': ['source', 'position'],
+                'indexes': [models.Index(fields=['source', 'position'], name='related_destino_source_pos')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'target'), name='unique_related_destino')],
+            },
+        ),
+    ]
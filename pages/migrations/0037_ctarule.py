@@ -0,0 +1,59 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+# Las reglas que antes estaban hardcodeadas en DestinoPage.get_context
+INITIAL_RULES = [
+    ("playa", "Alojamientos cerca de la playa", "https://www.booking.com/", "Ver alojamientos", "Compará precios y disponibilidad"),
+    ("playa", "Snorkel y paseos en barco", "https://www.getyourguide.com/", "Ver actividades", "Experiencias típicas de playa"),
+    ("montaña", "Excursiones y trekking guiado", "https://www.getyourguide.com/", "Ver excursiones", "Opciones según dificultad y tiempo"),
+    ("montaña", "Seguro de viaje", "https://www.assistcard.com/", "Cotizar seguro", "Recomendado para actividades al aire libre"),
+    ("trekking", "Excursiones y trekking guiado", "https://www.getyourguide.com/", "Ver excursiones", "Opciones según dificultad y tiempo"),
+    ("trekking", "Seguro de viaje", "https://www.assistcard.com/", "Cotizar seguro", "Recomendado para actividades al aire libre"),
+    ("ciudad", "Tours y experiencias en la ciudad", "https://www.getyourguide.com/", "Ver tours", "Walking tours, museos y gastronomía"),
+    ("ciudad", "Alojamiento bien ubicado", "https://www.booking.com/", "Buscar hotel", "Mejor ubicación = menos traslados"),
+    ("familia", "Alojamientos ideales para familias", "https://www.booking.com/", "Ver opciones", "Filtrá por cocina, pileta y espacio"),
+    ("pareja", "Experiencias para parejas", "https://www.getyourguide.com/", "Ver experiencias", "Atardeceres, paseos y actividades románticas"),
+    ("presupuesto", "Opciones económicas", "https://www.booking.com/", "Ver ofertas", "Ordená por precio y mirá reviews"),
+    ("barato", "Opciones económicas", "https://www.booking.com/", "Ver ofertas", "Ordená por precio y mirá reviews"),
+    # sin tag = por defecto
+    ("", "Buscar alojamientos", "https://www.booking.com/", "Ver alojamientos", "Compará opciones"),
+    ("", "Seguro de viaje", "https://www.assistcard.com/", "Cotizar seguro", ""),
+]
+
+
+def seed_rules(apps, schema_editor):
+    CTARule = apps.get_model("pages", "CTARule")
+    CTARule.objects.bulk_create([
+        CTARule(tag=tag, title=title, url=url, button_text=button_text, note=note, priority=(i + 1) * 10)
+        for i, (tag, title, url, button_text, note) in enumerate(INITIAL_RULES)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0036_relateddestino'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CTARule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(blank=True, help_text='Tag del destino (sin distinguir mayúsculas). Vacío = CTA por defecto.', max_length=100)),
+                ('title', models.CharField(max_length=120)),
+                ('url', models.URLField()),
+                ('button_text', models.CharField(default='Ver opciones', max_length=40)),
+                ('note', models.CharField(blank=True, max_length=120)),
+                ('priority', models.PositiveSmallIntegerField(default=100, help_text='Menor = aparece primero')),
+            ],
+            options={
+                'verbose_name': 'Regla de CTA',
+                'verbose_name_plural': 'Reglas de CTA',
+                'ordering': ['priority', 'id'],
+            },
+        ),
+        migrations.RunPython(seed_rules, migrations.RunPython.noop),
+    ]
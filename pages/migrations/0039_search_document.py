@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:28
+
+from django.db import migrations, models
+
+# Los documentos de las páginas existentes los completa `manage.py rebuild_search_documents`
+# (build.sh): la migración no importa código de pages/ que puede cambiar después.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0038_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulopage',
+            name='search_sections',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='articulopage',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='destinopage',
+            name='search_sections',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='destinopage',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
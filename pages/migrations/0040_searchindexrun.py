@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0039_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('full', 'Completo'), ('incremental', 'Incremental')], max_length=12, unique=True)),
+                ('cursor_published_at', models.DateTimeField(blank=True, null=True)),
+                ('cursor_id', models.PositiveIntegerField(default=0)),
+                ('in_progress', models.BooleanField(default=False)),
+                ('indexed', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Indexado de búsqueda',
+                'verbose_name_plural': 'Indexados de búsqueda',
+            },
+        ),
+    ]
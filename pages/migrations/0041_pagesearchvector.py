@@ -0,0 +1,59 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:33
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SEARCH_CONFIG_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'spanish_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION spanish_unaccent (COPY = spanish);
+        ALTER TEXT SEARCH CONFIGURATION spanish_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+END
+$$;
+"""
+
+
+def create_gin_index(apps, schema_editor):
+    # GIN + config de texto sólo existen en Postgres; en SQLite la tabla queda sin uso
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    schema_editor.execute(SEARCH_CONFIG_SQL)
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS pages_pagesearchvector_gin ON pages_pagesearchvector USING gin (vector)"
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS pages_pagesearchvector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0040_searchindexrun'),
+        ('wagtailcore', '0096_referenceindex_referenceindex_source_object_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageSearchVector',
+            fields=[
+                ('page', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_vector', serialize=False, to='wagtailcore.page')),
+                ('vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Vector de búsqueda',
+                'verbose_name_plural': 'Vectores de búsqueda',
+            },
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-17 19:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0041_pagesearchvector'),
+        ('wagtailcore', '0096_referenceindex_referenceindex_source_object_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('url', models.CharField(max_length=500)),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sitemap_images', to='wagtailcore.page')),
+            ],
+            options={
+                'verbose_name': 'Imagen del sitemap',
+                'verbose_name_plural': 'Imágenes del sitemap',
+                'ordering': ['page', 'position'],
+                'indexes': [models.Index(fields=['page', 'position'], name='sitemap_image_page_pos')],
+            },
+        ),
+    ]
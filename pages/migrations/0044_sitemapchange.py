@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0043_cacheversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20)),
+                ('path', models.CharField(blank=True, help_text='Path de la página; vacío = toda la sección', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Cambio de sitemap',
+                'verbose_name_plural': 'Cambios de sitemap',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:43
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0044_sitemapchange'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='SitemapChange',
+        ),
+    ]
@@ -1,10 +1,13 @@
 from django.apps import apps
-from django.core.paginator import Paginator
-from django.db import models
-from django.db.models import Count
-from django.utils.html import format_html, strip_tags
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
 from django.utils.safestring import mark_safe
-from django.utils.text import slugify
+import hashlib
 import json
 
 from modelcluster.fields import ParentalKey
@@ -16,8 +19,8 @@ from wagtail.admin.panels import FieldPanel, InlinePanel, MultiFieldPanel, PageC
 from wagtail.fields import RichTextField, StreamField
 from wagtail.models import Orderable, Page
 from wagtail.rich_text import RichText
-from bs4 import BeautifulSoup
 from wagtail.search import index
+from wagtail.snippets.models import register_snippet
 
 from .blocks import (
     CTAButtonBlock,
@@ -33,101 +36,180 @@ from .blocks import (
     YouTubeBlock,
 )
 from .blocks import QuickSectionsBlock, QuickSectionBlock
+from .ctas import resolve_ctas
+from .pagination import paginate_listing
+from .image_ingest import attach_images, delete_image_files, parse_html_with_images
+from .search_text import build_search_document
+from .rendering import (
+    BODY_STREAM_MARKER,
+    extract_toc,
+    get_toc_and_body_html,
+    lookup_body_cache,
+    should_stream_body,
+    stream_page_html,
+)
 
 
 # ============================================================
 # Helpers
 # ============================================================
 
-def build_toc_and_body_html(stream):
-    used = {}
-    toc = []
-    parts = []
+# Cantidad de títulos en el "En esta guía" de las cards
+TOC_PREVIEW_ITEMS = 4
 
-    def unique_anchor(title: str) -> str:
-        base = slugify(title) or "seccion"
-        used[base] = used.get(base, 0) + 1
-        return base if used[base] == 1 else f"{base}-{used[base]}"
+def get_filtered_breadcrumb_ancestors(page: Page):
+    """
+    Breadcrumbs filtrados (sin Welcome/Home) usando depth>=4 como ya venías haciendo.
+    """
+    return [
+        a.specific
+        for a in page.get_ancestors().live().public()
+        if a.depth >= 4
+    ]
 
-    def add_heading(title: str, subtitle: str = ""):
-        anchor = unique_anchor(title)
-        toc.append({"title": title, "anchor": anchor, "level": 2})
 
-        title = strip_tags(title)
-        subtitle = strip_tags(subtitle)
+# El parseo de bulk_paste (antes de subir imágenes) se guarda por hash del HTML:
+# la preview parsea y el publish, que arma otra instancia desde la revisión, reusa
+BULK_PASTE_CACHE_TIMEOUT = 60 * 60
 
-        if subtitle:
-            parts.append(
-                format_html(
-                    '<section class="block block-title"><h2 id="{}">{}</h2><p class="muted">{}</p></section>',
-                    anchor, title, subtitle
-                )
-            )
-        else:
-            parts.append(
-                format_html(
-                    '<section class="block block-title"><h2 id="{}">{}</h2></section>',
-                    anchor, title
-                )
-            )
 
-    if not stream:
-        return [], mark_safe("")
+class BulkPasteMixin:
+    """
+    Import HTML (Docs/Word) -> StreamField del campo bulk_paste (ver pages/importer.py).
 
-    for block in stream:
-        if block.block_type == "section_title":
-            title = (block.value.get("title") or "").strip()
-            if not title:
-                continue
-            subtitle = (block.value.get("subtitle") or "").strip()
-            add_heading(title, subtitle)
-            continue
-
-        if block.block_type == "quick_section":
-            title = (block.value.get("title") or "").strip()
-            subtitle = (block.value.get("subtitle") or "").strip()
-
-            if title:
-                add_heading(title, subtitle)
-                parts.append(
-                    format_html(
-                        '<div class="qs__rendered qs__rendered--no-title">{}</div>',
-                        mark_safe(block.render(context={"hide_title": True})),
-                    )
-                )
-            else:
-                parts.append(mark_safe(block.render(context={"hide_title": False})))
-            continue
-
-        if block.block_type == "quick_sections":
-            sections = block.value.get("sections") or []
-            for s in sections:
-                # dict-like
-                title = (getattr(s, "get", lambda *_: None)("title") or "").strip()
-                if not title:
-                    continue
-                subtitle = (getattr(s, "get", lambda *_: None)("subtitle") or "").strip()
-                add_heading(title, subtitle)
+    clean() (preview/validación) sólo parsea: las imágenes quedan como placeholder y
+    no se sube nada, así una preview o un formulario inválido no dejan archivos
+    huérfanos. save() (guardar/publicar) reusa ese parseo (caché por hash + memo en
+    la instancia) y sólo corre la subida de imágenes.
+    """
 
-            # render contenedor una sola vez, ocultando títulos dentro
-            parts.append(mark_safe(block.render(context={"hide_title": True})))
-            continue
+    def _bulk_paste_digest(self, html: str) -> str:
+        return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _parse_bulk_paste(self, html: str, digest: str):
+        """(stream_data, image_refs, inline) sin tocar la biblioteca de imágenes."""
+        memo = getattr(self, "_bulk_paste_memo", None)
+        if memo and memo[0] == digest:
+            return memo[1]
+
+        # los targets de image_refs apuntan adentro de stream_data: la tupla se cachea
+        # entera y cada get devuelve una copia propia (LocMem guarda el valor serializado)
+        key = f"pages:bulk_paste:parsed:{digest}"
+        parsed = cache.get(key)
+        if parsed is None:
+            parsed = parse_html_with_images(html, fill_embed_urls=True)
+            cache.set(key, parsed, BULK_PASTE_CACHE_TIMEOUT)
+        self._bulk_paste_memo = (digest, parsed)
+        return parsed
+
+    def get_bulk_paste_stream_data(self, ingest: bool = True, uploaded=None):
+        html = self.bulk_paste or ""
+        if not html.strip():
+            return None
+
+        stream_data, image_refs, inline = self._parse_bulk_paste(html, self._bulk_paste_digest(html))
+        if not ingest:
+            return stream_data
+
+        # las imágenes embebidas (data: URI) se suben a la biblioteca (pages/image_ingest.py)
+        return attach_images(stream_data, image_refs, inline, uploaded=uploaded)
+
+    def should_import_in_background(self) -> bool:
+        """Pegados enormes se convierten en un ImportJob (ver pages/jobs.py), no en el request."""
+        if not getattr(settings, "PAGES_IMPORT_ASYNC", False):
+            return False
+        return len(self.bulk_paste or "") >= getattr(settings, "PAGES_IMPORT_ASYNC_MIN_BYTES", 200_000)
+
+    def apply_bulk_paste(self, clear: bool = False, ingest: bool = True, uploaded=None):
+        if self.should_import_in_background():
+            return  # lo convierte el worker y crea la revisión
+
+        data = self.get_bulk_paste_stream_data(ingest=ingest, uploaded=uploaded)
+        if data:
+            self.body = data
+            if clear:
+                self.bulk_paste = ""
 
-        # otros bloques: render normal
-        parts.append(mark_safe(block.render()))
+    def clean(self):
+        super().clean()
+        self.apply_bulk_paste(ingest=False)
 
-    return toc, mark_safe("".join(parts))
+    def save(self, *args, **kwargs):
+        # Backup: por si clean no corrió en algún flujo (shell, scripts). Los save()
+        # de sólo campos de control (save_revision) no tocan el body.
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"body", "bulk_paste"} & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        uploaded = []  # imágenes subidas por este save
+        try:
+            with transaction.atomic():
+                self.apply_bulk_paste(clear=True, uploaded=uploaded)
+                return super().save(*args, **kwargs)
+        except Exception:
+            # el savepoint deshizo las filas de las imágenes, no sus archivos
+            delete_image_files(uploaded)
+            raise
+
+
+class StreamingBodyMixin:
+    """
+    Para DestinoPage/ArticuloPage: body con TOC cacheado y, en guías muy largas
+    sin caché, streaming del body (TTFB = head + hero + TOC, no el render completo).
+    """
 
+    def get_body_context(self, request):
+        if getattr(request, "stream_body", False):
+            # TOC desde el JSON crudo; el body lo manda serve() por streaming
+            return {"toc": extract_toc(self.body.raw_data), "body_html": mark_safe(BODY_STREAM_MARKER)}
 
-def get_filtered_breadcrumb_ancestors(page: Page):
+        toc, body_html = get_toc_and_body_html(self, request)
+        return {"toc": toc, "body_html": body_html}
+
+    def serve(self, request, *args, **kwargs):
+        if not should_stream_body(self, request):
+            return super().serve(request, *args, **kwargs)
+
+        request.is_preview = False
+        request.stream_body = True
+        html = render_to_string(
+            self.get_template(request, *args, **kwargs),
+            self.get_context(request, *args, **kwargs),
+            request=request,
+        )
+        head, marker, tail = html.partition(BODY_STREAM_MARKER)
+        if not marker:
+            # el template no imprimió body_html: render normal
+            request.stream_body = False
+            return super().serve(request, *args, **kwargs)
+
+        return StreamingHttpResponse(
+            stream_page_html(self, head, tail, key=lookup_body_cache(self, request)[0]),
+            content_type="text/html; charset=utf-8",
+        )
+
+
+class SearchDocumentMixin:
     """
-    Breadcrumbs filtrados (sin Welcome/Home) usando depth>=4 como ya venías haciendo.
+    Mantiene search_sections / search_text (texto plano, ver pages/search_text.py)
+    en sincronía con los StreamFields de search_document_streams. Se indexan esos
+    campos y no el StreamField: índice más chico y update_index más rápido.
     """
-    return [
-        a.specific
-        for a in page.get_ancestors().live().public()
-        if a.depth >= 4
-    ]
+
+    search_document_streams = ("body",)
+
+    def update_search_document(self):
+        raw_streams = [getattr(self, name).raw_data for name in self.search_document_streams]
+        self.search_sections, self.search_text = build_search_document(*raw_streams)
+
+    def save(self, *args, **kwargs):
+        # save_revision() guarda sólo campos de control: ahí no hace falta recalcular
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(self.search_document_streams):
+            self.update_search_document()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"search_sections", "search_text"}
+        super().save(*args, **kwargs)
 
 
 # ============================================================
@@ -194,6 +276,27 @@ class SimplePage(Page):
 # GUÍAS
 # ============================================================
 
+def tree_range_q(page):
+    """
+    Descendientes de page como rango sobre path (P < path < path del hermano siguiente)
+    en vez de LIKE 'P%': usa el índice único de wagtailcore_page.path en cualquier base.
+
+    El límite se arma con el alfabeto de treebeard y acarreo ("0009" -> "000A",
+    "00ZZ" -> "0100"), nunca con chr() + 1: "9" + 1 = ":" y "Z" + 1 = "[" no se
+    ordenan igual en las collations ICU/glibc de Postgres.
+    """
+    alphabet = page.alphabet
+    upper = list(page.path)
+    for i in range(len(upper) - 1, -1, -1):
+        position = alphabet.index(upper[i]) + 1
+        if position < len(alphabet):
+            upper[i] = alphabet[position]
+            return models.Q(path__gt=page.path, path__lt="".join(upper))
+        upper[i] = alphabet[0]
+    # último path posible ("ZZZZ..."): todo lo que sigue es descendiente
+    return models.Q(path__gt=page.path)
+
+
 class GuiasIndexPage(Page):
     """Índice editorial de guías. Listado + filtros por categoría + paginación."""
 
@@ -214,29 +317,34 @@ class GuiasIndexPage(Page):
         )
         context["categorias"] = categorias
 
+        # filtro por categoría via ?cat=slug: se resuelve a la CategoriaPage (ya está en
+        # `categorias`) y los artículos salen de su rango de path, como sin filtro
+        cat_slug = request.GET.get("cat")
+        scope = self
+        if cat_slug:
+            scope = next((c for c in categorias if c.slug == cat_slug), None)
+
         ArticuloPageModel = apps.get_model("pages", "ArticuloPage")
         qs = (
-            self.get_descendants()
+            (Page.objects.filter(tree_range_q(scope)) if scope else Page.objects.none())
             .type(ArticuloPageModel)
             .live()
             .public()
             .order_by("-first_published_at")
+            .specific()  # las cards usan campos de ArticuloPage (toc_preview)
         )
 
-        # filtro por categoría via ?cat=slug
-        cat_slug = request.GET.get("cat")
-        if cat_slug:
-            # Articulo vive debajo de Categoria, así que filtramos por url_path
-            qs = qs.filter(url_path__contains=f"/{cat_slug}/")
-
         context["cat_activa"] = cat_slug
 
-        paginator = Paginator(qs, 12)
-        page_obj = paginator.get_page(request.GET.get("page"))
+        # numerada como siempre; con PAGES_KEYSET_PAGINATION, cursor después de las primeras páginas.
+        # El total se cachea por la página resuelta (nunca por el slug que vino en la URL)
+        page_obj, keyset = paginate_listing(request, qs, 12, count_key=f"guias:{scope.pk}" if scope else None)
         context["page_obj"] = page_obj
+        context["keyset"] = keyset
 
         params = request.GET.copy()
-        params.pop("page", None)
+        for name in ("page", "after", "before"):
+            params.pop(name, None)
         context["querystring"] = params.urlencode()
 
         return context
@@ -359,7 +467,7 @@ class DestinoPageTag(TaggedItemBase):
 
 
 
-class DestinoPage(Page):
+class DestinoPage(BulkPasteMixin, SearchDocumentMixin, StreamingBodyMixin, Page):
     template = "pages/destino_page.html"
 
     seo_description = models.CharField(max_length=160, blank=True)
@@ -383,14 +491,6 @@ class DestinoPage(Page):
     )
 
 
-    search_fields = Page.search_fields + [
-        index.SearchField("title"),
-        index.SearchField("search_description"),
-        index.SearchField("seo_description"),
-        index.SearchField("intro"),
-        index.SearchField("body"),
-    ]
-
     body = StreamField(
         [
             ("quick_sections", QuickSectionsBlock()),
@@ -412,6 +512,8 @@ class DestinoPage(Page):
     cta_manual = StreamField([("cta", CTAButtonBlock())], use_json_field=True, blank=True)
     faq = StreamField([("faq", FAQBlock())], use_json_field=True, blank=True)
 
+    search_document_streams = ("body", "faq")
+
     content_panels = Page.content_panels + [
         FieldPanel("intro"),
         FieldPanel("hero_image"),
@@ -426,9 +528,17 @@ class DestinoPage(Page):
         MultiFieldPanel([FieldPanel("seo_description")], heading="SEO"),
     ]
 
+    # Documento de búsqueda en texto plano (SearchDocumentMixin): no editable, se
+    # recalcula al guardar el body. Page.search_fields ya indexa title con boost 2.
+    search_sections = models.TextField(blank=True, default="", editable=False)
+    search_text = models.TextField(blank=True, default="", editable=False)
+
     search_fields = Page.search_fields + [
-        index.SearchField("intro"),
-        index.SearchField("body"),
+        index.SearchField("search_description"),
+        index.SearchField("seo_description"),
+        index.SearchField("intro", boost=1.5),
+        index.SearchField("search_sections", boost=1.5),
+        index.SearchField("search_text"),
     ]
 
     parent_page_types = ["pages.PaisPage"]
@@ -485,173 +595,6 @@ class DestinoPage(Page):
         }
         return mark_safe(json.dumps(data, ensure_ascii=False))
 
-    # -------------------------
-    # Import HTML -> StreamField
-    # -------------------------
-    def _looks_like_youtube(self, url: str) -> bool:
-        u = (url or "").lower()
-        return ("youtube.com" in u) or ("youtu.be" in u)
-
-    def _looks_like_maps(self, url: str) -> bool:
-        u = (url or "").lower()
-        return ("google.com/maps" in u) or ("/maps" in u)
-
-    def _clean_html_fragment(self, html: str) -> str:
-        return (html or "").strip()
-
-    def _html_to_stream_data(self, html: str, fill_embed_urls: bool = True):
-        """
-        Importa HTML:
-        - Cada <h2> => 1 quick_section
-        - <p> + <h3> => body (HTML) dentro de quick_section.body
-        - primer <img> por sección => quick_section.image placeholder (None)
-        - imgs extra => bloque image placeholder
-        - iframes => bloque youtube/map (con src si fill_embed_urls=True o vacío si False)
-        - contenido antes del primer <h2> => rich_text suelto
-        """
-        soup = BeautifulSoup(html or "", "html.parser")
-        root = soup.body or soup
-
-        stream_data = []
-
-        current = None
-        section_chunks = []
-        section_has_image = False
-
-        def flush_current_section():
-            nonlocal current, section_chunks, section_has_image
-            if not current:
-                return
-
-            body_html = self._clean_html_fragment("".join(section_chunks))
-            current["body"] = body_html
-
-            stream_data.append({"type": "quick_section", "value": current})
-
-            current = None
-            section_chunks = []
-            section_has_image = False
-
-        def flush_intro_as_rich_text():
-            nonlocal section_chunks
-            if section_chunks:
-                combined = self._clean_html_fragment("".join(section_chunks))
-                if combined:
-                    stream_data.append({"type": "rich_text", "value": combined})
-                section_chunks = []
-
-        for node in root.descendants:
-            if not getattr(node, "name", None):
-                continue
-
-            tag = node.name.lower()
-            if tag in ("html", "head", "body", "div", "span"):
-                continue
-
-            if tag == "h2":
-                flush_current_section()
-                flush_intro_as_rich_text()
-
-                title = node.get_text(" ", strip=True)
-                if not title:
-                    continue
-
-                current = {
-                    "title": title,
-                    "subtitle": "",
-                    "body": "",
-                    "image": None,  # placeholder: elegir imagen luego
-                    "caption": "",
-                    "cta_text": "",
-                    "cta_url": "",
-                    "cta_note": "",
-                }
-                continue
-
-            # Antes del primer H2 => intro
-            # Antes del primer H2 => intro
-            if current is None:
-                if tag == "p":
-                    inner = node.decode_contents().strip()
-                    if inner and node.get_text(" ", strip=True):
-                        section_chunks.append(f"<p>{inner}</p>")
-
-                elif tag == "h3":
-                    text = node.get_text(" ", strip=True)
-                    if text:
-                        section_chunks.append(f"<h3>{text}</h3>")
-
-                elif tag in ("table", "ul", "ol", "blockquote", "hr"):
-                    section_chunks.append(str(node))
-
-                continue
-
-            # Dentro de sección
-            if tag == "p":
-                inner = node.decode_contents().strip()
-                if not inner or node.get_text(" ", strip=True) == "":
-                    continue
-                section_chunks.append(f"<p>{inner}</p>")
-
-            elif tag == "h3":
-                text = node.get_text(" ", strip=True)
-                if text:
-                    section_chunks.append(f"<h3>{text}</h3>")
-
-            elif tag in ("table", "ul", "ol", "blockquote", "hr"):
-                    section_chunks.append(str(node))
-
-            elif tag == "img":
-                if not section_has_image:
-                    current["image"] = None
-                    current["caption"] = ""
-                    section_has_image = True
-                else:
-                    stream_data.append({"type": "image", "value": {"image": None, "caption": ""}})
-
-            elif tag == "iframe":
-                src = node.get("src", "") or ""
-                if self._looks_like_youtube(src):
-                    stream_data.append(
-                        {
-                            "type": "youtube",
-                            "value": {"title": "", "video": (src if fill_embed_urls else "")},
-                        }
-                    )
-                elif self._looks_like_maps(src):
-                    stream_data.append(
-                        {
-                            "type": "map",
-                            "value": {"title": "", "map_url": (src if fill_embed_urls else "")},
-                        }
-                    )
-                else:
-                    safe = src.replace('"', "&quot;")
-                    section_chunks.append(
-                        f"<p>📌 Embed pendiente: <a href=\"{safe}\" target=\"_blank\" rel=\"noopener\">{safe}</a></p>"
-                    )
-
-        if current:
-            flush_current_section()
-        else:
-            flush_intro_as_rich_text()
-
-        return stream_data
-
-    def clean(self):
-        super().clean()
-        
-
-
-    def save(self, *args, **kwargs):
-        # Backup: por si clean no corrió en algún flujo
-        if self.bulk_paste and self.bulk_paste.strip():
-            data = self._html_to_stream_data(self.bulk_paste, fill_embed_urls=True)
-            if data:
-                self.body = data
-                self.bulk_paste = ""
-        super().save(*args, **kwargs)
-
     # -------------------------
     # Context (sin cambios)
     # -------------------------
@@ -661,83 +604,32 @@ class DestinoPage(Page):
 
         context["breadcrumb_ancestors"] = get_filtered_breadcrumb_ancestors(self)
 
-        related = DestinoPage.objects.none()
-        if self.tags.exists():
-            tag_ids = list(self.tags.all().values_list("id", flat=True))
-            related = (
-                DestinoPage.objects.live().public()
-                .exclude(id=self.id)
-                .filter(tagged_items__tag_id__in=tag_ids)
-                .annotate(shared=Count("tagged_items__tag_id"))
-                .order_by("-shared", "-first_published_at")
-                .distinct()
-            )[:desired]
-
-        related_list = list(related)
-        if len(related_list) < desired:
-            siblings = self.get_siblings().live().public().exclude(id=self.id).specific()
-            existing_ids = {p.id for p in related_list}
-            for s in siblings:
-                if s.id not in existing_ids:
-                    related_list.append(s)
-                    existing_ids.add(s.id)
-                if len(related_list) >= desired:
-                    break
-
-        context["related_destinos"] = related_list
+        # precalculado en RelatedDestino (ver pages/related.py): 1 lectura indexada.
+        # public() también acá: una restricción de acceso nueva no recalcula el índice
+        context["related_destinos"] = [
+            rel.target
+            for rel in (
+                RelatedDestino.objects.filter(
+                    source=self, target__live=True, target__in=DestinoPage.objects.public().values("pk")
+                )
+                .select_related("target", "target__hero_image")
+                .order_by("position")[:desired]
+            )
+        ]
+
+        # tags: una sola query por request (CTAs + template)
+        tags = list(self.tags.all())
+        context["tags"] = tags
 
         if self.cta_manual and len(self.cta_manual):
             context["ctas"] = self.cta_manual
             context["ctas_source"] = "manual"
         else:
-            tag_names = set(t.name.lower() for t in self.tags.all())
-            ctas_auto = []
-
-            def add_cta(title, url, button_text="Ver opciones", note=""):
-                ctas_auto.append({"title": title, "url": url, "button_text": button_text, "note": note})
-
-            if "playa" in tag_names:
-                add_cta("Alojamientos cerca de la playa", "https://www.booking.com/", "Ver alojamientos", "Compará precios y disponibilidad")
-                add_cta("Snorkel y paseos en barco", "https://www.getyourguide.com/", "Ver actividades", "Experiencias típicas de playa")
-
-            if "montaña" in tag_names or "trekking" in tag_names:
-                add_cta("Excursiones y trekking guiado", "https://www.getyourguide.com/", "Ver excursiones", "Opciones según dificultad y tiempo")
-                add_cta("Seguro de viaje", "https://www.assistcard.com/", "Cotizar seguro", "Recomendado para actividades al aire libre")
-
-            if "ciudad" in tag_names:
-                add_cta("Tours y experiencias en la ciudad", "https://www.getyourguide.com/", "Ver tours", "Walking tours, museos y gastronomía")
-                add_cta("Alojamiento bien ubicado", "https://www.booking.com/", "Buscar hotel", "Mejor ubicación = menos traslados")
-
-            if "familia" in tag_names:
-                add_cta("Alojamientos ideales para familias", "https://www.booking.com/", "Ver opciones", "Filtrá por cocina, pileta y espacio")
-
-            if "pareja" in tag_names:
-                add_cta("Experiencias para parejas", "https://www.getyourguide.com/", "Ver experiencias", "Atardeceres, paseos y actividades románticas")
-
-            if "presupuesto" in tag_names or "barato" in tag_names:
-                add_cta("Opciones económicas", "https://www.booking.com/", "Ver ofertas", "Ordená por precio y mirá reviews")
-
-            seen = set()
-            unique_ctas = []
-            for cta in ctas_auto:
-                key = (cta["url"], cta["button_text"])
-                if key in seen:
-                    continue
-                seen.add(key)
-                unique_ctas.append(cta)
-
-            if not unique_ctas:
-                unique_ctas = [
-                    {"title": "Buscar alojamientos", "url": "https://www.booking.com/", "button_text": "Ver alojamientos", "note": "Compará opciones"},
-                    {"title": "Seguro de viaje", "url": "https://www.assistcard.com/", "button_text": "Cotizar seguro", "note": ""},
-                ]
-
-            context["ctas"] = unique_ctas[:3]
+            # reglas editables (CTARule) compiladas en un índice en memoria: sin queries extra
+            context["ctas"] = resolve_ctas(t.name for t in tags)
             context["ctas_source"] = "auto"
 
-        toc, body_html = build_toc_and_body_html(self.body)
-        context["toc"] = toc
-        context["body_html"] = body_html
+        context.update(self.get_body_context(request))
         return context
 
     class Meta:
@@ -752,7 +644,7 @@ class DestinoPage(Page):
 
 
 
-class ArticuloPage(Page):
+class ArticuloPage(BulkPasteMixin, SearchDocumentMixin, StreamingBodyMixin, Page):
     template = "pages/articulo_page.html"
 
     seo_description = models.CharField(max_length=160, blank=True)
@@ -773,14 +665,6 @@ class ArticuloPage(Page):
     )
 
 
-    search_fields = Page.search_fields + [
-        index.SearchField("title"),
-        index.SearchField("search_description"),
-        index.SearchField("seo_description"),
-        index.SearchField("intro"),
-        index.SearchField("body"),
-    ]
-
     body = StreamField(
         [
             ("section_title", SectionTitleBlock()),
@@ -810,172 +694,101 @@ class ArticuloPage(Page):
         MultiFieldPanel([FieldPanel("seo_description")], heading="SEO"),
     ]
 
+    # Documento de búsqueda en texto plano (SearchDocumentMixin): no editable, se
+    # recalcula al guardar el body. Page.search_fields ya indexa title con boost 2.
+    search_sections = models.TextField(blank=True, default="", editable=False)
+    search_text = models.TextField(blank=True, default="", editable=False)
+
     search_fields = Page.search_fields + [
-        index.SearchField("intro"),
-        index.SearchField("body"),
+        index.SearchField("search_description"),
+        index.SearchField("seo_description"),
+        index.SearchField("intro", boost=1.5),
+        index.SearchField("search_sections", boost=1.5),
+        index.SearchField("search_text"),
     ]
 
     parent_page_types = ["pages.CategoriaPage"]
     subpage_types = []
 
-    # -------------------------
-    # Import helpers
-    # -------------------------
-    def _looks_like_youtube(self, url: str) -> bool:
-        u = (url or "").lower()
-        return ("youtube.com" in u) or ("youtu.be" in u)
-
-    def _looks_like_maps(self, url: str) -> bool:
-        u = (url or "").lower()
-        return ("google.com/maps" in u) or ("/maps" in u)
-
-    def _clean_html_fragment(self, html: str) -> str:
-        return (html or "").strip()
-
-    def _html_to_stream_data(self, html: str, fill_embed_urls: bool = True):
-        soup = BeautifulSoup(html or "", "html.parser")
-        root = soup.body or soup
-
-        stream_data = []
-        current = None
-        section_chunks = []
-        section_has_image = False
-
-        KEEP_AS_HTML = {"table", "ul", "ol", "blockquote", "hr"}
-
-        def flush_current_section():
-            nonlocal current, section_chunks, section_has_image
-            if not current:
-                return
-            body_html = self._clean_html_fragment("".join(section_chunks))
-            current["body"] = body_html
-            stream_data.append({"type": "quick_section", "value": current})
-            current = None
-            section_chunks = []
-            section_has_image = False
-
-        def flush_intro_as_rich_text():
-            nonlocal section_chunks
-            if section_chunks:
-                combined = self._clean_html_fragment("".join(section_chunks))
-                if combined:
-                    stream_data.append({"type": "rich_text", "value": combined})
-                section_chunks = []
-
-        for node in root.descendants:
-            if not getattr(node, "name", None):
-                continue
+    @property
+    def toc_preview(self):
+        """TOC corto para el "En esta guía" de las cards (del JSON crudo, sin renderizar)."""
+        toc = [item for item in extract_toc(self.body.raw_data) if item["level"] == 2]
+        return toc[:TOC_PREVIEW_ITEMS]
 
-            tag = node.name.lower()
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request, *args, **kwargs)
+        context["breadcrumb_ancestors"] = get_filtered_breadcrumb_ancestors(self)
 
-            if tag in ("html", "head", "body", "div", "span"):
-                continue
+        context.update(self.get_body_context(request))
+        return context
 
-            if tag == "h2":
-                flush_current_section()
-                flush_intro_as_rich_text()
 
-                title = node.get_text(" ", strip=True)
-                if not title:
-                    continue
 
-                current = {
-                    "title": title,
-                    "subtitle": "",
-                    "body": "",
-                    "image": None,
-                    "caption": "",
-                    "cta_text": "",
-                    "cta_url": "",
-                    "cta_note": "",
-                }
-                continue
 
-            # Antes del primer H2
-            if current is None:
-                if tag == "p":
-                    inner = node.decode_contents().strip()
-                    if inner and node.get_text(" ", strip=True):
-                        section_chunks.append(f"<p>{inner}</p>")
-                elif tag == "h3":
-                    text = node.get_text(" ", strip=True)
-                    if text:
-                        section_chunks.append(f"<h3>{text}</h3>")
-                elif tag in KEEP_AS_HTML:
-                    section_chunks.append(str(node))
-                elif tag == "img":
-                    stream_data.append({"type": "image", "value": {"image": None, "caption": ""}})
-                elif tag == "iframe":
-                    src = (node.get("src") or "").strip()
-                    if self._looks_like_youtube(src):
-                        stream_data.append({"type": "youtube", "value": {"title": "", "video": (src if fill_embed_urls else "")}})
-                    elif self._looks_like_maps(src):
-                        stream_data.append({"type": "map", "value": {"title": "", "map_url": (src if fill_embed_urls else "")}})
-                    else:
-                        safe = src.replace('"', "&quot;")
-                        stream_data.append({"type": "rich_text", "value": f"<p>📌 Embed pendiente: <a href=\"{safe}\" target=\"_blank\" rel=\"noopener\">{safe}</a></p>"})
-                continue
+@register_snippet
+class CTARule(models.Model):
+    """
+    Regla de CTA automático para destinos: si el destino tiene el tag, se muestra el CTA.
+    Sin tag = CTA por defecto (cuando ningún tag matchea). Ver pages/ctas.py.
+    """
 
-            # Dentro de sección
-            if tag == "p":
-                inner = node.decode_contents().strip()
-                if inner and node.get_text(" ", strip=True):
-                    section_chunks.append(f"<p>{inner}</p>")
-            elif tag == "h3":
-                text = node.get_text(" ", strip=True)
-                if text:
-                    section_chunks.append(f"<h3>{text}</h3>")
-            elif tag in KEEP_AS_HTML:
-                section_chunks.append(str(node))
-            elif tag == "img":
-                if not section_has_image:
-                    current["image"] = None
-                    current["caption"] = ""
-                    section_has_image = True
-                else:
-                    stream_data.append({"type": "image", "value": {"image": None, "caption": ""}})
-            elif tag == "iframe":
-                src = (node.get("src") or "").strip()
-                if self._looks_like_youtube(src):
-                    stream_data.append({"type": "youtube", "value": {"title": "", "video": (src if fill_embed_urls else "")}})
-                elif self._looks_like_maps(src):
-                    stream_data.append({"type": "map", "value": {"title": "", "map_url": (src if fill_embed_urls else "")}})
-                else:
-                    safe = src.replace('"', "&quot;")
-                    section_chunks.append(f"<p>📌 Embed pendiente: <a href=\"{safe}\" target=\"_blank\" rel=\"noopener\">{safe}</a></p>")
-
-        if current:
-            flush_current_section()
-        else:
-            flush_intro_as_rich_text()
+    tag = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Tag del destino (sin distinguir mayúsculas). Vacío = CTA por defecto.",
+    )
+    title = models.CharField(max_length=120)
+    url = models.URLField()
+    button_text = models.CharField(max_length=40, default="Ver opciones")
+    note = models.CharField(max_length=120, blank=True)
+    priority = models.PositiveSmallIntegerField(default=100, help_text="Menor = aparece primero")
 
-        return stream_data
+    panels = [
+        FieldPanel("tag"),
+        FieldPanel("title"),
+        FieldPanel("url"),
+        FieldPanel("button_text"),
+        FieldPanel("note"),
+        FieldPanel("priority"),
+    ]
 
-    def clean(self):
-        super().clean()
-        if self.bulk_paste and self.bulk_paste.strip():
-            data = self._html_to_stream_data(self.bulk_paste, fill_embed_urls=True)
-            if data:
-                self.body = data
+    class Meta:
+        ordering = ["priority", "id"]
+        verbose_name = "Regla de CTA"
+        verbose_name_plural = "Reglas de CTA"
 
-    def save(self, *args, **kwargs):
-        if self.bulk_paste and self.bulk_paste.strip():
-            data = self._html_to_stream_data(self.bulk_paste, fill_embed_urls=True)
-            if data:
-                self.body = data
-                self.bulk_paste = ""
-        super().save(*args, **kwargs)
+    def __str__(self):
+        return f"{self.tag or '(por defecto)'} → {self.title}"
 
-    def get_context(self, request, *args, **kwargs):
-        context = super().get_context(request, *args, **kwargs)
-        context["breadcrumb_ancestors"] = get_filtered_breadcrumb_ancestors(self)
 
-        toc, body_html = build_toc_and_body_html(self.body)
-        context["toc"] = toc
-        context["body_html"] = body_html
-        return context
+class RelatedDestino(models.Model):
+    """
+    Destinos relacionados precalculados (tags compartidos + hermanos de relleno).
+    Se recalcula al publicar/despublicar, mover o borrar un destino; ver pages/related.py.
+    """
 
+    source = models.ForeignKey(
+        "pages.DestinoPage",
+        on_delete=models.CASCADE,
+        related_name="related_index",
+    )
+    target = models.ForeignKey(
+        "pages.DestinoPage",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    score = models.PositiveIntegerField(default=0, help_text="Tags compartidos (0 = hermano de relleno)")
+    position = models.PositiveSmallIntegerField(default=0)
 
+    class Meta:
+        ordering = ["source", "position"]
+        indexes = [
+            models.Index(fields=["source", "position"], name="related_destino_source_pos"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["source", "target"], name="unique_related_destino"),
+        ]
 
 
 class ArticuloDestinoRelation(Orderable):
@@ -1001,3 +814,143 @@ class ArticuloDestinoRelation(Orderable):
                 name="unique_articulo_destino_relation_v4",
             )
         ]
+
+
+class ImportJob(models.Model):
+    """
+    Conversión bulk_paste -> StreamField en segundo plano.
+    Cola en la base (sin broker): la procesa `manage.py run_import_jobs`.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "En cola"),
+        (RUNNING, "Procesando"),
+        (DONE, "Listo"),
+        (FAILED, "Error"),
+    ]
+
+    page = models.ForeignKey("wagtailcore.Page", on_delete=models.CASCADE, related_name="import_jobs")
+    html = models.TextField()
+    publish = models.BooleanField(default=False, help_text="Publicar la revisión al terminar")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    blocks = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        verbose_name = "Importación"
+        verbose_name_plural = "Importaciones"
+
+    def __str__(self):
+        return f"Importación #{self.pk} ({self.get_status_display()}) – página {self.page_id}"
+
+
+
+class SearchIndexRun(models.Model):
+    """
+    Estado de `manage.py reindex_pages` (ver pages/indexing.py): una fila por modo.
+    El cursor avanza después de cada tanda indexada, así un corte se retoma ahí.
+    """
+
+    FULL = "full"
+    INCREMENTAL = "incremental"
+    MODE_CHOICES = [
+        (FULL, "Completo"),
+        (INCREMENTAL, "Incremental"),
+    ]
+
+    mode = models.CharField(max_length=12, choices=MODE_CHOICES, unique=True)
+    cursor_published_at = models.DateTimeField(null=True, blank=True)
+    cursor_id = models.PositiveIntegerField(default=0)
+    in_progress = models.BooleanField(default=False)
+    indexed = models.PositiveIntegerField(default=0)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Indexado de búsqueda"
+        verbose_name_plural = "Indexados de búsqueda"
+
+    def __str__(self):
+        return f"{self.get_mode_display()} ({'en curso' if self.in_progress else 'terminado'})"
+
+
+class PageSearchVector(models.Model):
+    """
+    tsvector ponderado (título A, intro/descripciones/secciones B, texto C) de cada
+    destino/guía publicado. Sólo se usa en Postgres con PAGES_SEARCH_POSTGRES
+    (ver pages/pg_search.py); el índice GIN lo crea la migración sólo en Postgres.
+    """
+
+    page = models.OneToOneField(
+        "wagtailcore.Page",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_vector",
+    )
+    vector = SearchVectorField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Vector de búsqueda"
+        verbose_name_plural = "Vectores de búsqueda"
+
+
+class SitemapImage(models.Model):
+    """
+    URL (rendition, o el original si todavía no hay) de una imagen de una página
+    publicada para el sitemap de imágenes: hero/cover + galerías. Se recalcula al
+    publicar; ver pages/sitemap_images.py.
+    """
+
+    page = models.ForeignKey(
+        "wagtailcore.Page",
+        on_delete=models.CASCADE,
+        related_name="sitemap_images",
+    )
+    position = models.PositiveSmallIntegerField(default=0)
+    url = models.CharField(max_length=500)
+
+    class Meta:
+        ordering = ["page", "position"]
+        indexes = [
+            models.Index(fields=["page", "position"], name="sitemap_image_page_pos"),
+        ]
+        verbose_name = "Imagen del sitemap"
+        verbose_name_plural = "Imágenes del sitemap"
+
+
+class CacheVersion(models.Model):
+    """
+    Versión compartida entre workers de una caché por proceso (búsqueda, typeahead,
+    CTAs, sitemaps). Invalidar = sumar 1; ver pages/versions.py. También guarda
+    los contadores de hits/misses de las cachés (pages/counters.py).
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Versión de caché"
+        verbose_name_plural = "Versiones de caché"
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,169 @@
+# pages/normalize.py
+"""
+Normalizador del HTML pegado (Word / Google Docs) para quick_section.body.
+Corre en el importador (pages/importer.py) y en `manage.py normalize_bodies`
+para lo que ya está guardado en páginas y revisiones.
+
+Sólo quita cosas que el navegador ya ignora, así el resultado se ve igual:
+- comentarios (incluidos los condicionales de Word <!--[if gte mso 9]>...)
+- declaraciones mso-* dentro de style (no son CSS válido), clases Mso*,
+  ids docs-internal-guid-*, dir="ltr" (el default de la página)
+- <span>/<font>/<o:p> sin atributos: se desenvuelven (el texto queda)
+- inline vacíos (<span></span>, <b> </b> sin texto ni hijos) se borran
+- espacios repetidos en texto -> uno solo, salvo dentro de <pre>/<textarea>/<code>
+  y de elementos con style white-space: pre* / break-spaces (Google Docs pega
+  style="white-space:pre-wrap"): ahí los espacios se ven y se dejan tal cual
+
+Atributos que sí pueden cambiar el render (lang, style no-mso, class propias,
+data-*, etc.) se dejan. normalize_html además compara el texto visible y la
+estructura antes/después y, si difieren, devuelve el HTML original.
+"""
+import re
+
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+UNWRAP_TAGS = {"span", "font", "o:p"}
+DROP_WHEN_EMPTY = {"span", "font", "o:p", "b", "strong", "i", "em", "u", "s", "sub", "sup", "small"}
+PRESERVE_WHITESPACE = {"pre", "textarea", "code", "script", "style"}
+
+_MSO_CLASS_RE = re.compile(r"^Mso", re.IGNORECASE)
+_WS_RE = re.compile(r"[ \t\r\n\f]+")
+_PRE_STYLE_RE = re.compile(r"white-space\s*:\s*(pre|break-spaces)", re.IGNORECASE)
+
+
+def _preserves_whitespace(tag) -> bool:
+    return tag.name.lower() in PRESERVE_WHITESPACE or bool(_PRE_STYLE_RE.search(tag.get("style") or ""))
+
+
+def _clean_style(style: str) -> str:
+    kept = []
+    for decl in style.split(";"):
+        prop = decl.split(":", 1)[0].strip().lower()
+        if decl.strip() and not prop.startswith("mso-"):
+            kept.append(decl.strip())
+    return ";".join(kept)
+
+
+def _clean_attrs(tag):
+    attrs = tag.attrs
+    if "style" in attrs:
+        style = _clean_style(attrs["style"])
+        if style:
+            attrs["style"] = style
+        else:
+            del attrs["style"]
+
+    if "class" in attrs:
+        classes = [c for c in attrs["class"] if not _MSO_CLASS_RE.match(c)]
+        if classes:
+            attrs["class"] = classes
+        else:
+            del attrs["class"]
+
+    if str(attrs.get("id", "")).startswith("docs-internal-guid"):
+        del attrs["id"]
+    if str(attrs.get("dir", "")).lower() == "ltr":
+        del attrs["dir"]
+    for name in [a for a in attrs if a.startswith("xmlns")]:
+        del attrs[name]
+
+
+def normalize_tree(root):
+    """Normaliza en el lugar un árbol de BeautifulSoup (lo usa también el importador)."""
+    for comment in root.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.extract()
+    root.smooth()  # une los textos que quedaron separados por comentarios
+
+    # de abajo hacia arriba: al llegar a un padre, sus hijos ya están limpios
+    for tag in reversed(root.find_all(True)):
+        _clean_attrs(tag)
+        name = tag.name.lower()
+        if name in DROP_WHEN_EMPTY and not tag.attrs and not tag.contents:
+            tag.decompose()
+        elif name in DROP_WHEN_EMPTY and not tag.attrs and not tag.find(True) and not tag.get_text().strip():
+            # <b> </b>: el espacio sí se ve, la negrita no
+            tag.unwrap()
+        elif name in UNWRAP_TAGS and not tag.attrs:
+            tag.unwrap()
+
+    for text in root.find_all(string=True):
+        if isinstance(text, Comment) or text.find_parent(_preserves_whitespace):
+            continue
+        collapsed = _WS_RE.sub(" ", text)
+        if collapsed != text:
+            text.replace_with(NavigableString(collapsed))
+    return root
+
+
+def _is_inert(tag) -> bool:
+    """Tags que el normalizador puede sacar sin cambiar lo que se ve."""
+    name = tag.name.lower()
+    if name in UNWRAP_TAGS:
+        return True
+    return name in DROP_WHEN_EMPTY and not tag.find(True) and not tag.get_text().strip()
+
+
+def _fingerprint(soup):
+    """
+    (texto visible, secuencia de tags que importan). Los espacios se colapsan,
+    salvo dentro de los elementos que los preservan: ahí cuentan tal cual.
+    """
+    runs = [[False, ""]]  # tramos de texto seguidos: [preservado, texto]
+    tags = []
+    for node in soup.descendants:
+        if isinstance(node, Comment):
+            continue
+        if isinstance(node, NavigableString):
+            preserved = node.find_parent(_preserves_whitespace) is not None
+            if runs[-1][0] != preserved:
+                runs.append([preserved, ""])
+            runs[-1][1] += str(node)
+        elif not _is_inert(node):
+            tags.append(node.name.lower())
+    text = "".join(text if preserved else _WS_RE.sub(" ", text) for preserved, text in runs)
+    return text.strip(), tags
+
+
+def normalize_html(html: str) -> str:
+    if not html or not html.strip():
+        return html or ""
+
+    soup = BeautifulSoup(html, "html.parser")
+    before = _fingerprint(soup)
+    normalize_tree(soup)
+    # se re-parsea la salida (no el árbol en memoria) para comparar lo que realmente se guarda
+    result = str(soup).strip()
+    after = _fingerprint(BeautifulSoup(result, "html.parser"))
+    if after != before:
+        return html
+    return result if len(result.encode("utf-8")) < len(html.encode("utf-8")) else html
+
+
+def _normalize_section(value: dict) -> bool:
+    body = value.get("body") or ""
+    normalized = normalize_html(body)
+    if normalized != body:
+        value["body"] = normalized
+        return True
+    return False
+
+
+def normalize_stream_data(raw_data) -> bool:
+    """
+    Normaliza en el lugar los body de quick_section / quick_sections de un
+    StreamField crudo (lista de dicts). Devuelve True si cambió algo.
+    """
+    changed = False
+    for block in raw_data or []:
+        value = block.get("value")
+        if not isinstance(value, dict):
+            continue
+        if block.get("type") == "quick_section":
+            changed |= _normalize_section(value)
+        elif block.get("type") == "quick_sections":
+            for item in value.get("sections") or []:
+                # ListBlock: {"type": "item", "value": {...}} o el dict directo
+                section = item.get("value") if item.get("type") == "item" else item
+                if isinstance(section, dict):
+                    changed |= _normalize_section(section)
+    return changed
@@ -0,0 +1,203 @@
+# pages/pagination.py
+"""
+Paginación keyset para listados largos (PAGES_KEYSET_PAGINATION=1).
+
+Con Paginator + OFFSET cada ?page=N profundo recorre y descarta N * per_page
+filas, más un COUNT(*) por request; los crawlers recorren justo esas páginas.
+En modo keyset:
+- las primeras PAGES_KEYSET_NUMBERED_PAGES páginas siguen numeradas
+  (partials/_pagination.html), con el total cacheado en vez de un COUNT por
+  request (un publish/unpublish/move de una guía lo invalida en todos los
+  workers; igual cada página trae per_page + 1 filas y "Siguiente" sale de
+  ahí, no del total); un ?page= más allá es 404 (no se sirve con OFFSET);
+- desde la última numerada se sigue con un cursor (?after= / ?before=) sobre
+  (first_published_at, id) descendente: cada página es un WHERE sobre el índice
+  de first_published_at + LIMIT, igual de rápida en la página 3 que en la 3000.
+
+Las páginas sin first_published_at (nunca publicadas con revisión) no entran en
+el modo keyset. Sin el setting se usa el Paginator común, como siempre.
+"""
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from .deferral import unless_deferred
+from .versions import bump_version, get_version
+
+KEYSET_COUNT_TIMEOUT = 60 * 10
+LISTING_VERSION = "listings"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def keyset_enabled() -> bool:
+    return getattr(settings, "PAGES_KEYSET_PAGINATION", False)
+
+
+def encode_cursor(page) -> str:
+    """Cursor "<microsegundos desde epoch>.<id>" de una fila del listado."""
+    return f"{(page.first_published_at - _EPOCH) // _ONE_MICROSECOND}.{page.pk}"
+
+
+def decode_cursor(value):
+    """(first_published_at, id) o None si el cursor falta o es inválido."""
+    try:
+        micros, pk = value.split(".")
+        return _EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def cached_count(qs, key: str) -> int:
+    """Total: se recalcula cada KEYSET_COUNT_TIMEOUT o al cambiar el listado, no en cada request."""
+    cache_key = f"pages:listing-count:{get_version(LISTING_VERSION)}:{key}"
+    count = cache.get(cache_key)
+    if count is None:
+        count = qs.count()
+        cache.set(cache_key, count, KEYSET_COUNT_TIMEOUT)
+    return count
+
+
+@unless_deferred
+def invalidate_listing_counts(**kwargs):
+    """Handler de page_published / page_unpublished / post_page_move: totales nuevos en todos los workers."""
+    bump_version(LISTING_VERSION)
+
+
+class CountedPage(Page):
+    """Página de CachedCountPaginator: has_next sale de las filas, no del total."""
+
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator numerado con el total ya calculado (cached_count). El total puede
+    estar un poco atrasado: cada página trae per_page + 1 filas para saber si hay
+    siguiente, y el número de página no se valida contra el total.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._cached_count = count
+
+    @cached_property
+    def count(self):
+        return self._cached_count
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        return CountedPage(rows[:self.per_page], number, self, more=len(rows) > self.per_page)
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:  # el total quedó por encima de las filas: tampoco existe la "última"
+            return self.page(1)
+
+
+class KeysetPage:
+    """Página de cursor: lo que usan el template del listado y partials/_keyset_pagination.html."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, count):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def keyset_page(qs, per_page, after=None, before=None, count=None):
+    """Filas después de `after` (o antes de `before`) en orden (first_published_at, id) descendente."""
+    if before:
+        published_at, pk = before
+        rows = list(
+            qs.filter(Q(first_published_at__gt=published_at) | Q(first_published_at=published_at, pk__gt=pk))
+            .order_by("first_published_at", "id")[:per_page + 1]
+        )
+        more_before = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        previous_cursor = encode_cursor(rows[0]) if rows and more_before else None
+        next_cursor = encode_cursor(rows[-1]) if rows else None
+    else:
+        published_at, pk = after
+        rows = list(
+            qs.filter(Q(first_published_at__lt=published_at) | Q(first_published_at=published_at, pk__lt=pk))
+            [:per_page + 1]
+        )
+        more_after = len(rows) > per_page
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1]) if rows and more_after else None
+        previous_cursor = encode_cursor(rows[0]) if rows else None
+    return KeysetPage(rows, next_cursor, previous_cursor, count)
+
+
+def _page_number(value) -> int:
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+def paginate_listing(request, qs, per_page, count_key: str = None):
+    """
+    (page_obj, keyset) para un listado ordenado por publicación más reciente.
+    keyset=True: page_obj es una KeysetPage; si no, una página numerada de Paginator.
+    count_key identifica el listado para cachear el total (None = no cachear).
+    """
+    if not keyset_enabled():
+        return Paginator(qs, per_page).get_page(request.GET.get("page")), False
+
+    qs = qs.filter(first_published_at__isnull=False).order_by("-first_published_at", "-id")
+    count = cached_count(qs, count_key) if count_key else qs.count()
+
+    after = decode_cursor(request.GET.get("after"))
+    before = decode_cursor(request.GET.get("before"))
+    if after or before:
+        return keyset_page(qs, per_page, after=after, before=before, count=count), True
+
+    number = _page_number(request.GET.get("page"))
+    if number > settings.PAGES_KEYSET_NUMBERED_PAGES:
+        # más allá de las numeradas se navega con cursor: un OFFSET profundo no se sirve
+        raise Http404("Página fuera del listado numerado")
+
+    page_obj = CachedCountPaginator(qs, per_page, count).get_page(number)
+    # desde la última página numerada, "Siguiente" pasa al cursor
+    if page_obj.number >= settings.PAGES_KEYSET_NUMBERED_PAGES and page_obj.has_next():
+        page_obj.keyset_next = encode_cursor(page_obj.object_list[-1])
+    return page_obj, False
@@ -0,0 +1,91 @@
+# pages/pg_search.py
+"""
+Búsqueda nativa de Postgres para destinos y guías (PAGES_SEARCH_POSTGRES=1).
+
+Cada página publicada tiene una fila en PageSearchVector con un tsvector
+ponderado, armado en SQL a partir de los campos de texto plano
+(SearchDocumentMixin):
+
+    A: título
+    B: intro + seo_description + search_description, search_sections
+    C: search_text
+
+Se recalcula al publicar (signals) y se borra al despublicar. La consulta es un
+filtro @@ sobre el índice GIN + ts_rank, todo en un queryset normal: COUNT,
+LIMIT/OFFSET y facetas funcionan igual que con el backend de Wagtail.
+
+Con SQLite (o sin el setting) no se usa: pages/search.py sigue con el backend
+database de Wagtail, así el desarrollo local no cambia.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+from .deferral import unless_deferred
+from .models import ArticuloPage, DestinoPage, PageSearchVector
+
+VECTOR_MODELS = (DestinoPage, ArticuloPage)
+
+_VECTOR_SQL = """
+    setweight(to_tsvector(%(config)s::regconfig, coalesce(p.title, '')), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig,
+           concat_ws(' ', s.intro, s.seo_description, p.search_description)), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(s.search_sections, '')), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(s.search_text, '')), 'C')
+"""
+
+
+def search_config() -> str:
+    return settings.WAGTAILSEARCH_BACKENDS.get("default", {}).get("SEARCH_CONFIG") or "spanish"
+
+
+def postgres_search_enabled() -> bool:
+    return getattr(settings, "PAGES_SEARCH_POSTGRES", False) and connection.vendor == "postgresql"
+
+
+def refresh_search_vectors(page_ids=None) -> int:
+    """
+    Recalcula (INSERT ... ON CONFLICT) los vectores de las páginas live de
+    page_ids, o de todas si page_ids es None. Un statement por modelo.
+    """
+    if not postgres_search_enabled():
+        return 0
+
+    vector_table = PageSearchVector._meta.db_table
+    total = 0
+    with connection.cursor() as cursor:
+        for model in VECTOR_MODELS:
+            sql = f"""
+                INSERT INTO {vector_table} (page_id, vector, updated_at)
+                SELECT p.id, {_VECTOR_SQL}, now()
+                FROM wagtailcore_page p
+                JOIN {model._meta.db_table} s ON s.page_ptr_id = p.id
+                WHERE p.live {"AND p.id = ANY(%(ids)s)" if page_ids is not None else ""}
+                ON CONFLICT (page_id) DO UPDATE
+                    SET vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at
+            """
+            cursor.execute(sql, {"config": search_config(), "ids": list(page_ids or [])})
+            total += cursor.rowcount
+    return total
+
+
+@unless_deferred
+def update_search_vector_on_publish(sender, instance, **kwargs):
+    refresh_search_vectors([instance.pk])
+
+
+@unless_deferred
+def delete_search_vector_on_unpublish(sender, instance, **kwargs):
+    if postgres_search_enabled():
+        PageSearchVector.objects.filter(page_id=instance.pk).delete()
+
+
+def pg_search_queryset(qs, query: str):
+    """Filtra qs (Pages) por el tsvector guardado y ordena por ts_rank."""
+    search_query = SearchQuery(query, config=search_config(), search_type="websearch")
+    return (
+        qs.filter(search_vector__vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector__vector"), search_query))
+        .order_by("-rank", "-id")
+    )
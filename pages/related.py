@@ -0,0 +1,161 @@
+# pages/related.py
+"""
+Índice de destinos relacionados (tabla RelatedDestino).
+
+Mismo criterio que se calculaba en cada visita:
+1) destinos con más tags en común (desempate: más recientes primero)
+2) si no llegan a RELATED_DESTINOS, se completa con hermanos (mismo país) en orden del árbol
+
+El cálculo se hace en memoria con el mismo código para el rebuild completo
+(todos los destinos publicados + todos los tags) y para el recálculo al publicar,
+que carga sólo los destinos que puede tocar: así ambos dan exactamente lo mismo.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import DestinoPage, DestinoPageTag, RelatedDestino
+
+RELATED_DESTINOS = 6
+
+
+class RelatedIndex:
+    """
+    Sin page_ids: todos los destinos publicados. Con page_ids: esos destinos, los
+    que comparten algún tag con ellos y sus hermanos; alcanza para ranked() de
+    cualquiera de page_ids (no para el de los demás).
+    """
+
+    def __init__(self, page_ids=None):
+        destinos = DestinoPage.objects.live().public()
+        tag_rows = DestinoPageTag.objects.all()
+
+        if page_ids is not None:
+            page_ids = set(page_ids)
+            tag_rows = tag_rows.filter(
+                tag_id__in=DestinoPageTag.objects.filter(content_object_id__in=page_ids).values("tag_id")
+            )
+            scope = Q(id__in=page_ids) | Q(id__in=tag_rows.values("content_object_id"))
+            parents = {
+                path[:-DestinoPage.steplen]
+                for path in destinos.filter(id__in=page_ids).values_list("path", flat=True)
+            }
+            for parent in parents:
+                scope |= Q(path__startswith=parent, depth=len(parent) // DestinoPage.steplen + 1)
+            destinos = destinos.filter(scope)
+
+        rows = destinos.values_list("id", "path", "first_published_at")
+
+        self.paths = {}
+        self.published = {}
+        self.by_parent = defaultdict(list)
+        for page_id, path, first_published_at in rows:
+            self.paths[page_id] = path
+            self.published[page_id] = first_published_at.timestamp() if first_published_at else 0
+            self.by_parent[path[:-DestinoPage.steplen]].append(page_id)
+
+        for siblings in self.by_parent.values():
+            siblings.sort(key=lambda page_id: self.paths[page_id])
+
+        self.tags_by_page = defaultdict(set)
+        self.pages_by_tag = defaultdict(set)
+        for page_id, tag_id in tag_rows.values_list("content_object_id", "tag_id"):
+            if page_id in self.paths:
+                self.tags_by_page[page_id].add(tag_id)
+                self.pages_by_tag[tag_id].add(page_id)
+
+    def siblings(self, page_id):
+        return self.by_parent.get(self.paths[page_id][:-DestinoPage.steplen], [])
+
+    def sharing_tags(self, page_id):
+        out = set()
+        for tag_id in self.tags_by_page[page_id]:
+            out |= self.pages_by_tag[tag_id]
+        out.discard(page_id)
+        return out
+
+    def needs_siblings(self, page_id):
+        return len(self.sharing_tags(page_id)) < RELATED_DESTINOS
+
+    def ranked(self, page_id):
+        """[(target_id, score)] para un destino publicado."""
+        shared = Counter()
+        for tag_id in self.tags_by_page[page_id]:
+            for other in self.pages_by_tag[tag_id]:
+                if other != page_id:
+                    shared[other] += 1
+
+        ranked = sorted(shared, key=lambda other: (-shared[other], -self.published[other], other))
+        out = [(other, shared[other]) for other in ranked[:RELATED_DESTINOS]]
+
+        if len(out) < RELATED_DESTINOS:
+            existing = {other for other, _score in out}
+            for sibling in self.siblings(page_id):
+                if sibling == page_id or sibling in existing:
+                    continue
+                out.append((sibling, 0))
+                if len(out) >= RELATED_DESTINOS:
+                    break
+
+        return out
+
+
+def _write(index, source_ids, replace_all=False):
+    rows = [
+        RelatedDestino(source_id=source_id, target_id=target_id, score=score, position=position)
+        for source_id in source_ids
+        if source_id in index.paths
+        for position, (target_id, score) in enumerate(index.ranked(source_id))
+    ]
+
+    with transaction.atomic():
+        if replace_all:
+            RelatedDestino.objects.all().delete()
+        else:
+            RelatedDestino.objects.filter(source_id__in=source_ids).delete()
+        RelatedDestino.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
+
+
+def rebuild_related_destinos():
+    """Recalcula toda la tabla. Devuelve (destinos, filas)."""
+    index = RelatedIndex()
+    return len(index.paths), _write(index, list(index.paths), replace_all=True)
+
+
+def refresh_related_destinos(page):
+    """
+    Recalcula sólo los destinos afectados por un cambio en `page` (tags o estado de
+    publicación): la página misma, los que la tienen como relacionada, los que comparten
+    tags con ella y los hermanos que se completan con relleno.
+
+    Dos índices parciales en vez del completo: primero la página y sus hermanos
+    (para saber quiénes cambian), después sólo los afectados (para rankearlos).
+    """
+    siblings = DestinoPage.objects.live().public().filter(
+        path__startswith=page.path[:-DestinoPage.steplen], depth=page.depth
+    )
+    index = RelatedIndex({page.pk, *siblings.values_list("id", flat=True)})
+
+    affected = {page.pk}
+    affected |= set(RelatedDestino.objects.filter(target_id=page.pk).values_list("source_id", flat=True))
+    if page.pk in index.paths:
+        affected |= index.sharing_tags(page.pk)
+        affected |= {sibling for sibling in index.siblings(page.pk) if index.needs_siblings(sibling)}
+
+    return _write(RelatedIndex(affected), list(affected))
+
+
+def related_sources(page_ids):
+    """Destinos que tienen a alguno de page_ids entre sus relacionados."""
+    return set(RelatedDestino.objects.filter(target_id__in=page_ids).values_list("source_id", flat=True))
+
+
+def refresh_related_sources(source_ids):
+    """Recalcula estos destinos (ej: el CASCADE les borró un relacionado)."""
+    source_ids = list(source_ids)
+    if not source_ids:
+        return 0
+    return _write(RelatedIndex(source_ids), source_ids)
@@ -0,0 +1,367 @@
+# pages/rendering.py
+"""
+Render de bodies StreamField a (toc, body_html) + caché por revisión publicada.
+
+Hay dos niveles de caché:
+- por bloque: el HTML de cada bloque, indexado por id + hash de su valor y del
+  contexto de render (ej: hide_title). Editar 1 sección de 80 re-renderiza 1.
+  Va en su propio alias de caché (BLOCK_CACHE_ALIAS): una guía suma hasta ~80
+  entradas y, en la caché por defecto, el culling sacaría los bodies enteros.
+- por página: el par (toc, body_html) completo. Se calienta al publicar, así que
+  el render + indexado de headings (pages/headings.py) corre una vez por publish.
+
+Si la página no está en caché y PAGES_STREAM_BODY está activo, el body se manda
+por streaming (ver StreamingBodyMixin en models.py): primero head + hero + TOC
+(calculado del JSON crudo con extract_toc) y después bloque a bloque.
+
+La caché de página se indexa por página, revisión publicada, fecha de publicación y un
+hash del JSON crudo del body: si el contenido cambia (publish, preview, save
+desde el shell) la key cambia sola, así que nunca se sirve HTML viejo.
+Lo que el HTML toma de otros objetos por id (URLs de renditions, documentos y
+páginas linkeadas) no está en ese JSON: las keys de bloques y páginas que
+referencian algo suman la versión compartida RENDER_REFS_VERSION, que suben el
+save/delete de imágenes y documentos y los cambios de URL de páginas (signals).
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.html import format_html, strip_tags
+from django.utils.safestring import mark_safe
+from django.utils.text import slugify
+from wagtail.blocks import ChooserBlock
+
+from . import counters
+from .headings import index_headings
+from .versions import bump_version, get_version
+
+# Subir este número invalida todas las entradas (ej: si cambian los templates de bloques)
+BODY_CACHE_VERSION = 1
+BODY_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # 7 días; las keys viejas simplemente expiran
+BLOCK_CACHE_ALIAS = "blocks"
+
+RENDER_REFS_VERSION = "render-refs"
+# links internos / imágenes embebidas de rich_text, tal como quedan en el JSON crudo
+_RICH_TEXT_REFS = ("linktype=", 'embedtype="image"')
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Caché por bloque
+# ============================================================
+
+# Contadores compartidos entre workers (pages/counters.py; ver `manage.py render_cache_stats`)
+_STATS_KEYS = {"hits": "stats:block-cache:hits", "misses": "stats:block-cache:misses"}
+
+
+def block_cache_stats() -> dict:
+    totals = counters.read(*_STATS_KEYS.values())
+    hits = totals[_STATS_KEYS["hits"]]
+    misses = totals[_STATS_KEYS["misses"]]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "ratio": (hits / total) if total else 0.0}
+
+
+def reset_block_cache_stats():
+    counters.reset(*_STATS_KEYS.values())
+
+
+def _digest(data) -> str:
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _references(block_def, raw) -> bool:
+    """¿El valor crudo apunta por id a una imagen/página/documento (chooser con valor o link/embed en rich_text)?"""
+    if block_def is None:
+        return False
+    if isinstance(block_def, ChooserBlock):
+        return bool(raw)
+    if isinstance(raw, str):
+        return any(marker in raw for marker in _RICH_TEXT_REFS)
+    child_blocks = getattr(block_def, "child_blocks", None)
+    if child_blocks is not None and isinstance(raw, dict):  # StructBlock
+        return any(_references(child_blocks.get(name), value) for name, value in raw.items())
+    if child_blocks is not None and isinstance(raw, list):  # StreamBlock
+        return any(
+            _references(child_blocks.get(item.get("type")), item.get("value")) for item in raw if isinstance(item, dict)
+        )
+    child_block = getattr(block_def, "child_block", None)
+    if child_block is not None and isinstance(raw, list):  # ListBlock
+        return any(_references(child_block, item) for item in _raw_list_items(raw))
+    return False
+
+
+def _refs_suffix(references: bool) -> str:
+    """":r<versión>" si el HTML depende de objetos referenciados por id; si no, nada."""
+    return f":r{get_version(RENDER_REFS_VERSION)}" if references else ""
+
+
+def invalidate_rendered_references(*args, **kwargs):
+    """Handler: cambió una imagen/documento o la URL de una página; los bloques que los referencian se re-renderizan."""
+    bump_version(RENDER_REFS_VERSION)
+
+
+def block_cache_key(block, raw_value, context=None) -> str:
+    return "pages:block:v{}:{}:{}{}".format(
+        BODY_CACHE_VERSION,
+        block.id or "-",
+        _digest({"type": block.block_type, "value": raw_value, "context": context or {}}),
+        _refs_suffix(_references(block.block, raw_value)),
+    )
+
+
+def render_block(block, raw_value, context=None) -> str:
+    """block.render(context) memoizado por id + hash del valor crudo + contexto."""
+    block_cache = caches[BLOCK_CACHE_ALIAS]
+    key = block_cache_key(block, raw_value, context)
+    html = block_cache.get(key)
+    if html is not None:
+        counters.incr(_STATS_KEYS["hits"])
+        return mark_safe(html)
+
+    counters.incr(_STATS_KEYS["misses"])
+    html = block.render(context=context)
+    block_cache.set(key, str(html), BODY_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+def _unique_anchor(title: str, used: dict) -> str:
+    base = slugify(title) or "seccion"
+    used[base] = used.get(base, 0) + 1
+    return base if used[base] == 1 else f"{base}-{used[base]}"
+
+
+def _raw_list_items(raw_list):
+    """Items de un ListBlock crudo (formato nuevo {"type": "item", "value": ...} o lista plana)."""
+    for item in raw_list or []:
+        if isinstance(item, dict) and item.get("type") == "item" and "value" in item:
+            yield item["value"]
+        else:
+            yield item
+
+
+def extract_toc(raw_data):
+    """
+    TOC desde el JSON crudo del StreamField (body.raw_data), sin renderizar bloques.
+    Genera los mismos anchors que iter_body_html: títulos de section_title,
+    quick_section y quick_sections + los <h2>/<h3> que haya dentro de rich_text.
+    Es barato: sirve para las cards ("En esta guía") y para el streaming.
+    """
+    used = {}
+    toc = []
+
+    def add(title):
+        title = (title or "").strip()
+        if title:
+            toc.append({"title": title, "anchor": _unique_anchor(title, used), "level": 2})
+
+    def anchor_for(title, level):
+        return _unique_anchor(title, used)
+
+    for raw in raw_data or []:
+        btype = raw.get("type")
+        value = raw.get("value") or {}
+
+        if btype in ("section_title", "quick_section"):
+            add(value.get("title"))
+        elif btype == "rich_text" and isinstance(value, str):
+            _html, headings = index_headings(value, anchor_for, rewrite=False)
+            toc.extend(headings)
+        elif btype == "quick_sections":
+            for s in _raw_list_items(value.get("sections")):
+                add((s or {}).get("title"))
+
+    return toc
+
+
+def iter_body_html(stream, toc=None):
+    """
+    Genera el HTML del body bloque a bloque (lo usan el render normal y el streaming).
+    Si se pasa `toc`, le agrega las entradas a medida que aparecen los títulos.
+    """
+    used = {}
+    if toc is None:
+        toc = []
+
+    def heading_html(title: str, subtitle: str = ""):
+        anchor = _unique_anchor(title, used)
+        toc.append({"title": title, "anchor": anchor, "level": 2})
+
+        title = strip_tags(title)
+        subtitle = strip_tags(subtitle)
+
+        if subtitle:
+            return format_html(
+                '<section class="block block-title"><h2 id="{}">{}</h2><p class="muted">{}</p></section>',
+                anchor, title, subtitle
+            )
+        return format_html(
+            '<section class="block block-title"><h2 id="{}">{}</h2></section>',
+            anchor, title
+        )
+
+    if not stream:
+        return
+
+    raw_data = stream.raw_data
+    for i, block in enumerate(stream):
+        raw_value = raw_data[i].get("value")
+
+        if block.block_type == "section_title":
+            title = (block.value.get("title") or "").strip()
+            if not title:
+                continue
+            subtitle = (block.value.get("subtitle") or "").strip()
+            yield heading_html(title, subtitle)
+            continue
+
+        if block.block_type == "quick_section":
+            title = (block.value.get("title") or "").strip()
+            subtitle = (block.value.get("subtitle") or "").strip()
+
+            if title:
+                yield heading_html(title, subtitle)
+                yield format_html(
+                    '<div class="qs__rendered qs__rendered--no-title">{}</div>',
+                    render_block(block, raw_value, {"hide_title": True}),
+                )
+            else:
+                yield render_block(block, raw_value, {"hide_title": False})
+            continue
+
+        if block.block_type == "quick_sections":
+            sections = block.value.get("sections") or []
+            headings = []
+            for s in sections:
+                # dict-like
+                title = (getattr(s, "get", lambda *_: None)("title") or "").strip()
+                if not title:
+                    continue
+                subtitle = (getattr(s, "get", lambda *_: None)("subtitle") or "").strip()
+                headings.append(heading_html(title, subtitle))
+
+            # render contenedor una sola vez, ocultando títulos dentro
+            yield mark_safe("".join(headings) + render_block(block, raw_value, {"hide_title": True}))
+            continue
+
+        if block.block_type == "rich_text":
+            # los <h2>/<h3> del rich_text también van al TOC (con id inyectado)
+            html, headings = index_headings(
+                render_block(block, raw_value),
+                lambda title, level: _unique_anchor(title, used),
+            )
+            toc.extend(headings)
+            yield mark_safe(html)
+            continue
+
+        # otros bloques: render normal
+        yield render_block(block, raw_value)
+
+
+def build_toc_and_body_html(stream):
+    toc = []
+    body_html = "".join(iter_body_html(stream, toc))
+    return toc, mark_safe(body_html)
+
+
+# ============================================================
+# Caché por revisión publicada
+# ============================================================
+
+def _stream_digest(stream) -> str:
+    """Hash estable del JSON crudo del StreamField (no renderiza ni deserializa bloques)."""
+    if not stream:
+        return _digest([])
+    raw_data = list(stream.raw_data)
+    return _digest(raw_data) + _refs_suffix(_references(stream.stream_block, raw_data))
+
+
+def body_cache_key(page) -> str:
+    published = int(page.last_published_at.timestamp()) if page.last_published_at else 0
+    return "pages:body:v{}:{}:{}:{}:{}".format(
+        BODY_CACHE_VERSION,
+        page.pk,
+        page.live_revision_id or 0,
+        published,
+        _stream_digest(page.body),
+    )
+
+
+def lookup_body_cache(page, request=None):
+    """
+    (key, (toc, body_html) o None). La key hashea el JSON del body: se calcula
+    una sola vez por request (should_stream_body y get_toc_and_body_html la comparten).
+    """
+    memo = getattr(request, "_pages_body_cache", None) if request is not None else None
+    if memo is not None and memo[0] == page.pk:
+        return memo[1], memo[2]
+
+    key = body_cache_key(page)
+    cached = cache.get(key)
+    if request is not None:
+        request._pages_body_cache = (page.pk, key, cached)
+    return key, cached
+
+
+def warm_body_cache(page, key=None):
+    """Renderiza y guarda (toc, body_html). Se llama al publicar."""
+    toc, body_html = build_toc_and_body_html(page.body)
+    logger.debug("body cache warm page=%s", page.pk)
+    cache.set(key or body_cache_key(page), (toc, str(body_html)), BODY_CACHE_TIMEOUT)
+    return toc, body_html
+
+
+def get_toc_and_body_html(page, request=None):
+    """
+    (toc, body_html) de la página, servido desde caché si ya se renderizó esta revisión.
+    Las previews del admin no usan la caché de página (no la ensucian), pero sí la
+    de bloques: sólo se re-renderizan los bloques que el editor cambió.
+    """
+    if request is not None and getattr(request, "is_preview", False):
+        return build_toc_and_body_html(page.body)
+
+    key, cached = lookup_body_cache(page, request)
+    if cached is not None:
+        toc, body_html = cached
+        return toc, mark_safe(body_html)
+
+    return warm_body_cache(page, key)
+
+
+# ============================================================
+# Streaming (StreamingHttpResponse)
+# ============================================================
+
+# El template se renderiza con este marcador en lugar del body y se parte en dos
+BODY_STREAM_MARKER = "<!--dp:body-stream-->"
+
+
+def should_stream_body(page, request) -> bool:
+    if not getattr(settings, "PAGES_STREAM_BODY", False):
+        return False
+    if getattr(request, "is_preview", False):
+        return False
+    if len(page.body.raw_data) < getattr(settings, "PAGES_STREAM_MIN_BLOCKS", 40):
+        return False
+    # si ya está en caché, el render normal es instantáneo
+    return lookup_body_cache(page, request)[1] is None
+
+
+def stream_page_html(page, head: str, tail: str, key=None):
+    """Yield del head, después el body bloque a bloque y al final el resto del template."""
+    yield head
+
+    toc = []
+    parts = []
+    for part in iter_body_html(page.body, toc):
+        parts.append(part)
+        yield part
+
+    # la próxima visita ya sale de caché (y sin streaming)
+    cache.set(key or body_cache_key(page), (toc, "".join(parts)), BODY_CACHE_TIMEOUT)
+
+    yield tail
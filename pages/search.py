@@ -0,0 +1,308 @@
+# pages/search.py
+"""
+Búsqueda unificada de destinos + guías.
+
+Una sola búsqueda sobre Page (filtrada a DestinoPage/ArticuloPage) en vez de
+dos búsquedas concatenadas: un único ranking y paginación en la base. Cada
+página de resultados cuesta lo mismo: COUNT + la búsqueda con LIMIT/OFFSET
+(filas de wagtailcore_page, sin StreamField) + 1 query por tipo con sólo los
+campos de la card + las imágenes con sus renditions precargadas.
+
+El backend database ordena por relevancia en Postgres/MySQL; en SQLite no
+(el ranking BM25 no se aplica al queryset final), así que ahí se ordena por
+publicación más reciente para que la paginación sea estable. Con
+PAGES_SEARCH_POSTGRES en Postgres se usa el tsvector propio (pages/pg_search.py).
+
+Facetas (país, categoría, tag): se filtra el queryset antes de buscar y los
+conteos salen de un aggregate por faceta sobre los ids que matchearon (país y
+categoría comparten uno: son el padre directo de destinos y guías). Se cuentan
+como mucho FACET_MAX_IDS resultados; si hay más, los conteos se marcan "capped".
+
+Caché: la query se normaliza (minúsculas, sin tildes, espacios colapsados) y se
+cachean el total y los hits de cada página de resultados. Todas las keys llevan
+una "generación" que se incrementa al publicar/despublicar un destino o una guía
+(pages/signals.py), así que un publish invalida todo de una sin borrar keys. La
+generación es la versión compartida "search" (pages/versions.py): la caché es
+por proceso y así los otros workers dejan de usar sus keys viejas.
+"""
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Count, QuerySet
+from django.db.models.functions import Length, Substr
+from django.utils.http import urlencode
+from wagtail.images import get_image_model
+from wagtail.models import Page
+
+from . import counters
+from .deferral import unless_deferred
+from .models import ArticuloPage, CategoriaPage, DestinoPage, DestinoPageTag, PaisPage
+from .pg_search import pg_search_queryset, postgres_search_enabled
+from .versions import bump_version, get_version
+
+RESULTS_PER_PAGE = 12
+THUMB_SPEC = "fill-480x270"
+SEARCH_CACHE_TIMEOUT = 60 * 60 * 6
+
+SEARCH_VERSION = "search"
+# Contadores compartidos entre workers (pages/counters.py; ver `manage.py search_cache_stats`)
+_STATS_KEYS = {"hits": "stats:search-cache:hits", "misses": "stats:search-cache:misses"}
+_SPACES_RE = re.compile(r"\s+")
+
+FACETS = ("pais", "categoria", "tag")
+FACET_MAX_IDS = 5000  # tope de ids sobre los que se cuentan facetas (queries muy amplias)
+
+# modelo -> (etiqueta, campo de imagen)
+SEARCH_MODELS = {
+    DestinoPage: ("Destino", "hero_image"),
+    ArticuloPage: ("Guía", "cover_image"),
+}
+
+
+@dataclass
+class SearchHit:
+    id: int
+    title: str
+    url: str
+    intro: str
+    kind: str
+    image_id: int = None
+    thumb: dict = None  # {"url", "width", "height"} de la rendition THUMB_SPEC
+
+
+def normalize_query(query: str) -> str:
+    """'  Córdoba   CAPITAL ' -> 'cordoba capital' (misma key de caché para variantes triviales)."""
+    text = unicodedata.normalize("NFKD", (query or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+# ============================================================
+# Caché de resultados
+# ============================================================
+
+def search_generation() -> int:
+    return get_version(SEARCH_VERSION)
+
+
+@unless_deferred
+def invalidate_search_cache(**kwargs):
+    """Handler de page_published / page_unpublished: nueva generación de keys (en todos los workers)."""
+    bump_version(SEARCH_VERSION)
+
+
+def search_cache_stats() -> dict:
+    totals = counters.read(*_STATS_KEYS.values())
+    hits = totals[_STATS_KEYS["hits"]]
+    misses = totals[_STATS_KEYS["misses"]]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "ratio": (hits / total) if total else 0.0}
+
+
+def reset_search_cache_stats():
+    counters.reset(*_STATS_KEYS.values())
+
+
+def _cache_key(normalized: str, suffix: str, filters=None) -> str:
+    if filters:
+        normalized = f"{normalized}|{urlencode(sorted(filters.items()))}"
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=12).hexdigest()
+    return f"pages:search:g{search_generation()}:{digest}:{suffix}"
+
+
+def _cached(key: str, compute):
+    """(valor, hit) con contadores de hit/miss."""
+    value = cache.get(key)
+    if value is not None:
+        counters.incr(_STATS_KEYS["hits"])
+        return value, True
+    counters.incr(_STATS_KEYS["misses"])
+    value = compute()
+    cache.set(key, value, SEARCH_CACHE_TIMEOUT)
+    return value, False
+
+
+class _CountedResults:
+    """Lo mínimo que necesita Paginator: el total (cacheado) sin tocar el backend."""
+
+    def __init__(self, count: int):
+        self._count = count
+
+    def count(self):
+        return self._count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        return []
+
+
+def backend_ranks_results() -> bool:
+    return connection.vendor in ("postgresql", "mysql")
+
+
+def clean_filters(params) -> dict:
+    """{"pais": slug, ...} con las facetas presentes en params (request.GET)."""
+    return {name: params.get(name).strip() for name in FACETS if (params.get(name) or "").strip()}
+
+
+def apply_filters(qs, filters):
+    if not filters:
+        return qs
+
+    if "pais" in filters:
+        pais = PaisPage.objects.filter(slug=filters["pais"]).only("path", "depth").first()
+        qs = qs.descendant_of(pais) if pais else qs.none()
+    if "categoria" in filters:
+        categoria = CategoriaPage.objects.filter(slug=filters["categoria"]).only("path", "depth").first()
+        qs = qs.child_of(categoria) if categoria else qs.none()
+    if "tag" in filters:
+        qs = qs.filter(
+            id__in=DestinoPageTag.objects.filter(tag__slug=filters["tag"]).values("content_object_id")
+        )
+    return qs
+
+
+def search_queryset(query: str, filters=None, only=None):
+    """SearchResults (lazy) de destinos + guías live/públicas, en orden de ranking."""
+    qs = apply_filters(Page.objects.live().public().type(*SEARCH_MODELS), filters)
+    if only:
+        qs = qs.only(*only)
+    if postgres_search_enabled():
+        return pg_search_queryset(qs, query)
+    if backend_ranks_results():
+        return qs.order_by().search(query, order_by_relevance=True)
+    return qs.order_by("-first_published_at", "-id").search(query, order_by_relevance=False)
+
+
+def build_hits(pages, request=None):
+    """Pages base (ya paginadas) -> SearchHit, cargando sólo los campos de la card."""
+    ids = [p.pk for p in pages]
+    specific = {}
+    for model, (kind, image_field) in SEARCH_MODELS.items():
+        rows = model.objects.filter(pk__in=ids).only(
+            "id", "title", "url_path", "intro", "seo_description", "search_description", image_field
+        )
+        for page in rows:
+            specific[page.pk] = (page, kind, getattr(page, f"{image_field}_id"))
+
+    hits = []
+    for pk in ids:
+        if pk not in specific:
+            continue
+        page, kind, image_id = specific[pk]
+        hits.append(SearchHit(
+            id=pk,
+            title=page.title,
+            url=page.get_url(request=request),
+            intro=page.intro or page.seo_description or page.search_description or "",
+            kind=kind,
+            image_id=image_id,
+        ))
+
+    image_ids = {h.image_id for h in hits if h.image_id}
+    if image_ids:
+        images = get_image_model().objects.filter(id__in=image_ids).prefetch_renditions(THUMB_SPEC)
+        thumbs = {}
+        for img in images:
+            rendition = img.get_rendition(THUMB_SPEC)
+            thumbs[img.pk] = {"url": rendition.url, "width": rendition.width, "height": rendition.height}
+        for hit in hits:
+            hit.thumb = thumbs.get(hit.image_id)
+    return hits
+
+
+def search_pages(query: str, page_number=1, per_page: int = RESULTS_PER_PAGE, request=None, filters=None):
+    """
+    (page_obj, hits, cache_hit) para la página pedida de resultados.
+    Total y hits salen de caché si esta query normalizada (+ filtros) ya se buscó en esta generación.
+    """
+    normalized = normalize_query(query)
+
+    count, count_hit = _cached(
+        _cache_key(normalized, "count", filters),
+        lambda: search_queryset(normalized, filters).count(),
+    )
+    page_obj = Paginator(_CountedResults(count), per_page).get_page(page_number)
+
+    start = (page_obj.number - 1) * per_page
+    hits, hits_hit = _cached(
+        _cache_key(normalized, f"p{page_obj.number}x{per_page}", filters),
+        lambda: build_hits(search_queryset(normalized, filters)[start:start + per_page], request=request),
+    )
+    page_obj.object_list = hits
+    return page_obj, hits, count_hit and hits_hit
+
+
+# ============================================================
+# Facetas
+# ============================================================
+
+def compute_facets(ids) -> dict:
+    """
+    Conteos por país / categoría / tag sobre `ids`, con un aggregate por faceta:
+    - padre directo (path sin el último paso) -> PaisPage de los destinos, CategoriaPage de las guías
+    - DestinoPageTag agrupado por tag
+    """
+    facets = {name: [] for name in FACETS}
+    if not ids:
+        return facets
+
+    parent_counts = dict(
+        Page.objects.filter(id__in=ids)
+        .order_by()  # sin el order_by("path") default, que se metería en el GROUP BY
+        .annotate(parent_path=Substr("path", 1, Length("path") - Page.steplen))
+        .values("parent_path")
+        .annotate(n=Count("id"))
+        .values_list("parent_path", "n")
+    )
+    for name, model in (("pais", PaisPage), ("categoria", CategoriaPage)):
+        parents = model.objects.filter(path__in=list(parent_counts)).values_list("path", "slug", "title")
+        facets[name] = [
+            {"slug": slug, "title": title, "count": parent_counts[path]}
+            for path, slug, title in parents
+        ]
+
+    facets["tag"] = [
+        {"slug": slug, "title": name, "count": n}
+        for slug, name, n in (
+            DestinoPageTag.objects.filter(content_object_id__in=ids)
+            .values("tag__slug", "tag__name")
+            .annotate(n=Count("id"))
+            .values_list("tag__slug", "tag__name", "n")
+        )
+    ]
+
+    for options in facets.values():
+        options.sort(key=lambda o: (-o["count"], o["title"]))
+    return facets
+
+
+def search_facet_ids(normalized: str, filters=None, limit: int = FACET_MAX_IDS):
+    """Ids (sólo la columna id, sin armar Pages) de los primeros `limit` resultados."""
+    results = search_queryset(normalized, filters, only=("id",))
+    if isinstance(results, QuerySet):  # tsvector propio: queryset común
+        return list(results.values_list("pk", flat=True)[:limit])
+    return [page.pk for page in results[:limit]]
+
+
+def search_facets(query: str, filters=None):
+    """
+    (facets, capped, cache_hit) para la query (+ filtros activos), cacheado como
+    los resultados. capped=True: hay más de FACET_MAX_IDS resultados y los conteos
+    son sólo de los primeros.
+    """
+    normalized = normalize_query(query)
+
+    def compute():
+        ids = search_facet_ids(normalized, filters, limit=FACET_MAX_IDS + 1)
+        return compute_facets(ids[:FACET_MAX_IDS]), len(ids) > FACET_MAX_IDS
+
+    (facets, capped), hit = _cached(_cache_key(normalized, "facets", filters), compute)
+    return facets, capped, hit
@@ -0,0 +1,99 @@
+# pages/search_text.py
+"""
+Documento de búsqueda en texto plano a partir del JSON crudo de un StreamField.
+
+En vez de indexar el StreamField entero (HTML de quick_section.body, metadata de
+bloques, URLs, ids de imágenes), cada página guarda dos campos de texto que se
+indexan con distinto peso:
+- sections: títulos/subtítulos de secciones y los <h2>/<h3> del rich_text
+- text: el texto visible (sin tags ni entidades) de bodies, highlights, FAQ, etc.
+
+Se recalcula al guardar el body (ver SearchDocumentMixin en models.py), o sea
+al publicar: update_index ya no tiene que recorrer bloques.
+"""
+import re
+from html import unescape
+
+from .headings import index_headings
+
+SEARCH_TEXT_MAX_CHARS = 30_000  # guías larguísimas: el final aporta poco al ranking
+
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def html_to_text(html: str) -> str:
+    text = _TAG_RE.sub(" ", html or "")
+    if "&" in text:
+        text = unescape(text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def _items(raw_list):
+    """Items de un ListBlock crudo (formato nuevo {"type": "item", "value": ...} o lista plana)."""
+    for item in raw_list or []:
+        if isinstance(item, dict) and item.get("type") == "item" and "value" in item:
+            item = item["value"]
+        if isinstance(item, dict):
+            yield item
+
+
+def build_search_document(*raw_streams):
+    """(sections, text) de uno o más StreamFields crudos (body, faq, ...)."""
+    sections = []
+    text = []
+
+    def add_section(*values):
+        for value in values:
+            value = html_to_text(value)
+            if value and value not in sections:
+                sections.append(value)
+
+    def add_text(*values):
+        for value in values:
+            value = html_to_text(value)
+            if value:
+                text.append(value)
+
+    def quick_section(value):
+        add_section(value.get("title"), value.get("subtitle"))
+        add_text(value.get("body"), value.get("caption"))
+
+    for raw_data in raw_streams:
+        for block in raw_data or []:
+            btype = block.get("type")
+            value = block.get("value")
+
+            if btype == "rich_text" and isinstance(value, str):
+                _html, headings = index_headings(value, lambda title, level: "", rewrite=False)
+                add_section(*(h["title"] for h in headings))
+                add_text(value)
+                continue
+            if not isinstance(value, dict):
+                continue
+
+            if btype == "section_title":
+                add_section(value.get("title"), value.get("subtitle"))
+            elif btype == "quick_section":
+                quick_section(value)
+            elif btype == "quick_sections":
+                add_section(value.get("title"))
+                for section in _items(value.get("sections")):
+                    quick_section(section)
+            elif btype == "highlights":
+                add_section(value.get("title"))
+                for item in _items(value.get("items")):
+                    add_text(item.get("title"), item.get("text"))
+            elif btype == "info_grid":
+                add_section(value.get("title"))
+                for row in _items(value.get("rows")):
+                    add_text(f"{row.get('label') or ''}: {row.get('value') or ''}")
+            elif btype == "faq":
+                add_section(value.get("title"))
+                for item in _items(value.get("items")):
+                    add_text(item.get("question"), item.get("answer"))
+            elif btype in ("image", "gallery", "youtube", "map"):
+                add_text(value.get("caption"), value.get("title"))
+            # cta: texto de botón ("Ver opciones"), no aporta a la búsqueda
+
+    return "\n".join(sections), "\n".join(text)[:SEARCH_TEXT_MAX_CHARS]
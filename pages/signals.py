@@ -0,0 +1,108 @@
+# pages/signals.py
+from django.db.models.signals import post_delete, post_save, pre_delete
+from wagtail.documents import get_document_model
+from wagtail.images import get_image_model
+from wagtail.signals import page_published, page_slug_changed, page_unpublished, post_page_move
+
+from .ctas import invalidate_cta_index
+from .deferral import unless_deferred
+from .models import ArticuloPage, CTARule, DestinoPage, PaisPage
+from .pagination import invalidate_listing_counts
+from .pg_search import delete_search_vector_on_unpublish, update_search_vector_on_publish
+from .related import refresh_related_destinos, refresh_related_sources, related_sources
+from .rendering import invalidate_rendered_references, warm_body_cache
+from .search import invalidate_search_cache
+from .sitemap_images import delete_sitemap_images_on_unpublish, refresh_sitemap_images_on_publish
+from .sitemaps import write_sitemaps_on_move, write_sitemaps_on_publish
+from .typeahead import invalidate_typeahead_index
+
+
+@unless_deferred
+def warm_body_cache_on_publish(sender, instance, **kwargs):
+    # Render una sola vez por revisión publicada: las visitas leen de caché
+    warm_body_cache(instance)
+
+
+for model in (DestinoPage, ArticuloPage):
+    page_published.connect(warm_body_cache_on_publish, sender=model)
+
+
+# el HTML cacheado de bloques/bodies que usan imágenes, documentos o links internos
+# depende de esos objetos: si cambian (archivo, foco, URL) se re-renderizan
+for model in (get_image_model(), get_document_model()):
+    post_save.connect(invalidate_rendered_references, sender=model)
+    post_delete.connect(invalidate_rendered_references, sender=model)
+page_slug_changed.connect(invalidate_rendered_references)
+post_page_move.connect(invalidate_rendered_references)
+page_unpublished.connect(invalidate_rendered_references)  # también al borrar: el link deja de resolverse
+
+
+@unless_deferred
+def refresh_related_on_publish_change(sender, instance, **kwargs):
+    # tags / estado de publicación cambiaron: recalcular sólo los destinos afectados
+    refresh_related_destinos(instance)
+
+
+@unless_deferred
+def refresh_related_on_move(sender, instance, **kwargs):
+    # cambian los hermanos (el país de antes y el de ahora): path/depth nuevos desde la base
+    refresh_related_destinos(DestinoPage.objects.get(pk=instance.pk))
+
+
+@unless_deferred
+def remember_related_sources(sender, instance, **kwargs):
+    # el CASCADE va a borrar las filas que apuntan a este destino: quiénes las tenían
+    instance._related_sources = related_sources([instance.pk])
+
+
+@unless_deferred
+def refresh_related_after_delete(sender, instance, **kwargs):
+    # que no queden con menos de RELATED_DESTINOS relacionados
+    refresh_related_sources(getattr(instance, "_related_sources", ()))
+
+
+page_published.connect(refresh_related_on_publish_change, sender=DestinoPage)
+page_unpublished.connect(refresh_related_on_publish_change, sender=DestinoPage)
+post_page_move.connect(refresh_related_on_move, sender=DestinoPage)
+pre_delete.connect(remember_related_sources, sender=DestinoPage)
+post_delete.connect(refresh_related_after_delete, sender=DestinoPage)
+
+
+# resultados de búsqueda cacheados: un publish/unpublish los invalida todos
+# (un país también: cambia las URLs de sus destinos). El índice de autocompletado
+# se tira acá y los otros workers lo rearman al ver la nueva generación.
+for model in (DestinoPage, ArticuloPage, PaisPage):
+    page_published.connect(invalidate_search_cache, sender=model)
+    page_unpublished.connect(invalidate_search_cache, sender=model)
+    page_published.connect(invalidate_typeahead_index, sender=model)
+    page_unpublished.connect(invalidate_typeahead_index, sender=model)
+
+
+# totales cacheados del listado de guías (paginación keyset)
+page_published.connect(invalidate_listing_counts, sender=ArticuloPage)
+page_unpublished.connect(invalidate_listing_counts, sender=ArticuloPage)
+post_page_move.connect(invalidate_listing_counts, sender=ArticuloPage)
+
+
+# tsvector propio (sólo hace algo con PAGES_SEARCH_POSTGRES en Postgres)
+for model in (DestinoPage, ArticuloPage):
+    page_published.connect(update_search_vector_on_publish, sender=model)
+    page_unpublished.connect(delete_search_vector_on_unpublish, sender=model)
+
+
+# imágenes del sitemap (hero/cover + galerías): antes de escribir los archivos
+for model in (DestinoPage, ArticuloPage, PaisPage):
+    page_published.connect(refresh_sitemap_images_on_publish, sender=model)
+    page_unpublished.connect(delete_sitemap_images_on_unpublish, sender=model)
+
+
+# sitemaps: cualquier página publicada/despublicada/movida pasa a otra generación
+# (invalida el fallback cacheado) y al commitear se reescribe su archivo
+page_published.connect(write_sitemaps_on_publish)
+page_unpublished.connect(write_sitemaps_on_publish)
+post_page_move.connect(write_sitemaps_on_move)
+
+
+# reglas de CTA editadas: el índice en memoria se rearma en la próxima visita
+post_save.connect(invalidate_cta_index, sender=CTARule)
+post_delete.connect(invalidate_cta_index, sender=CTARule)
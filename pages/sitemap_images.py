@@ -0,0 +1,169 @@
+# pages/sitemap_images.py
+"""
+Imágenes del sitemap (tabla SitemapImage): página publicada -> URLs de imágenes.
+
+Por página: la imagen principal (hero/cover) y las de los bloques gallery del
+body, cada una con la rendition que ya usa su template. Sólo se buscan
+renditions existentes (nunca se genera una: ni al publicar ni en el rebuild);
+si todavía no existe (página nueva que nadie visitó) va la URL del original,
+y el próximo publish o rebuild la cambia por la rendition. Se recalcula al publicar
+(signals) y se borra al despublicar; la sección "imagenes" de pages/sitemaps.py
+sólo lee esta tabla, así que generarla es un número fijo de queries por
+archivo (filas + restricciones de acceso) sin importar cuántas páginas o
+imágenes haya.
+"""
+import logging
+
+from django.db import transaction
+from wagtail.images import get_image_model
+
+from .deferral import unless_deferred
+from .models import ArticuloPage, DestinoPage, PaisPage, SitemapImage
+
+logger = logging.getLogger(__name__)
+
+# modelo -> (campo de imagen principal, rendition del hero en su template)
+SITEMAP_IMAGE_FIELDS = {
+    DestinoPage: ("hero_image", "fill-1600x700"),
+    ArticuloPage: ("cover_image", "fill-1600x700"),
+    PaisPage: ("hero_image", "fill-800x450"),
+}
+GALLERY_SPEC = "fill-520x360"  # templates/blocks/gallery.html
+MAX_IMAGES_PER_PAGE = 1000  # tope del protocolo por <url>
+_IMAGE_CHUNK = 500
+
+
+def _gallery_image_ids(raw_body):
+    for block in raw_body or []:
+        value = block.get("value")
+        if block.get("type") != "gallery" or not isinstance(value, dict):
+            continue
+        for item in value.get("images") or []:
+            if isinstance(item, dict):  # formato nuevo de ListBlock
+                item = item.get("value")
+            if isinstance(item, int):
+                yield item
+
+
+def page_image_specs(page):
+    """[(image_id, spec)] de una página, en orden y sin repetir imágenes."""
+    field, spec = SITEMAP_IMAGE_FIELDS[type(page)]
+    out = []
+    seen = set()
+
+    main_id = getattr(page, f"{field}_id")
+    if main_id:
+        out.append((main_id, spec))
+        seen.add(main_id)
+
+    body = getattr(page, "body", None)
+    for image_id in _gallery_image_ids(body.raw_data if body is not None else []):
+        if image_id not in seen:
+            out.append((image_id, GALLERY_SPEC))
+            seen.add(image_id)
+    return out[:MAX_IMAGES_PER_PAGE]
+
+
+def _rendition_urls(pairs):
+    """
+    {(image_id, spec): url} de las renditions que ya existen, o del original si
+    falta (1-2 queries por tanda, sin generar nada).
+    """
+    Image = get_image_model()
+    Rendition = Image.get_rendition_model()
+    specs = sorted({spec for _image_id, spec in pairs})
+    image_ids = sorted({image_id for image_id, _spec in pairs})
+    urls = {}
+    for i in range(0, len(image_ids), _IMAGE_CHUNK):
+        # la más nueva primero: si cambió el punto focal, queda la del recorte actual
+        renditions = Rendition.objects.filter(
+            image_id__in=image_ids[i:i + _IMAGE_CHUNK], filter_spec__in=specs
+        ).order_by("-id")
+        for rendition in renditions:
+            key = (rendition.image_id, rendition.filter_spec)
+            if key in pairs and key not in urls:
+                urls[key] = rendition.url
+
+    missing = sorted({image_id for image_id, spec in pairs if (image_id, spec) not in urls})
+    if missing:
+        logger.debug("%s imágenes del sitemap sin rendition todavía: van con el original", len(missing))
+    originals = {}
+    for i in range(0, len(missing), _IMAGE_CHUNK):
+        for image in Image.objects.filter(id__in=missing[i:i + _IMAGE_CHUNK]).only("id", "file"):
+            originals[image.pk] = image.file.url
+    for image_id, spec in pairs:
+        if (image_id, spec) not in urls and image_id in originals:
+            urls[image_id, spec] = originals[image_id]
+    return urls
+
+
+def _write(specs_by_page, replace_all=False):
+    pairs = {pair for specs in specs_by_page.values() for pair in specs}
+    urls = _rendition_urls(pairs)
+
+    rows = []
+    for page_id, specs in specs_by_page.items():
+        position = 0
+        for pair in specs:
+            if pair in urls:
+                rows.append(SitemapImage(page_id=page_id, position=position, url=urls[pair]))
+                position += 1
+
+    with transaction.atomic():
+        if replace_all:
+            SitemapImage.objects.all().delete()
+        else:
+            SitemapImage.objects.filter(page_id__in=list(specs_by_page)).delete()
+        SitemapImage.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def refresh_sitemap_images(page):
+    """Recalcula las imágenes de una página (handler de page_published)."""
+    page = page.specific
+    if type(page) not in SITEMAP_IMAGE_FIELDS:
+        return 0
+    if not page.live:
+        return delete_sitemap_images(page)
+    return _write({page.pk: page_image_specs(page)})
+
+
+def delete_sitemap_images(page):
+    return SitemapImage.objects.filter(page_id=page.pk).delete()[0]
+
+
+@unless_deferred
+def refresh_sitemap_images_on_publish(sender, instance, **kwargs):
+    refresh_sitemap_images(instance)
+
+
+@unless_deferred
+def delete_sitemap_images_on_unpublish(sender, instance, **kwargs):
+    delete_sitemap_images(instance)
+
+
+def _specs_by_page(page_ids=None):
+    specs_by_page = {}
+    for model, (field, _spec) in SITEMAP_IMAGE_FIELDS.items():
+        fields = [field] + (["body"] if hasattr(model, "body") else [])
+        pages = model.objects.live().only(*fields)
+        if page_ids is not None:
+            pages = pages.filter(pk__in=page_ids)
+        for page in pages:
+            specs_by_page[page.pk] = page_image_specs(page)
+    return specs_by_page
+
+
+def refresh_sitemap_images_for(page_ids):
+    """Recalcula las imágenes de varias páginas de una vez (final de un import masivo)."""
+    page_ids = list(page_ids)
+    specs_by_page = _specs_by_page(page_ids)
+    # las que ya no están publicadas pierden sus filas
+    specs_by_page.update({page_id: [] for page_id in page_ids if page_id not in specs_by_page})
+    return _write(specs_by_page)
+
+
+def rebuild_sitemap_images():
+    """Recalcula toda la tabla. Devuelve (páginas, filas)."""
+    specs_by_page = _specs_by_page()
+    return len(specs_by_page), _write(specs_by_page, replace_all=True)
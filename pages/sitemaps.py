@@ -1,30 +1,459 @@
-from django.contrib.sitemaps import Sitemap
-from wagtail.models import Page
+# pages/sitemaps.py
+"""
+Sitemap index por tipo de página (/sitemap.xml -> /sitemap-<sección>-<n>.xml).
 
+- Una sección por tipo (destinos, guías, países, categorías) y "paginas" para
+  el resto (home, índices, páginas simples), partidas en archivos de
+  SITEMAP_LIMIT URLs como pide el protocolo.
+- Las URLs salen de url_path y la raíz del sitio por defecto, sin resolver el
+  sitio de cada página: una query de values_list por archivo (más la de
+  restricciones de acceso de public()), sin instanciar páginas. Lo que está
+  fuera de la raíz del sitio no entra (y así no hay "homes" duplicadas).
+- lastmod = last_published_at (el de la sección = el más reciente).
+- "imagenes": las páginas con hero/cover o galerías, con sus <image:image>
+  tomados de SitemapImage (pages/sitemap_images.py), también 1 query por
+  archivo (+ restricciones).
 
-class WagtailPagesSitemap(Sitemap):
-    changefreq = "weekly"
-    priority = 0.6
+Archivos en disco: write_sitemaps() escribe índice + archivos (con .gz y .br
+al lado) en PAGES_SITEMAP_ROOT, y las vistas los sirven con WhiteNoise (gzip/br
+según Accept-Encoding, Last-Modified/ETag y 304 a los crawlers). Un archivo
+sólo se reescribe si cambió su contenido, así el Last-Modified es real.
 
-    def items(self):
-        qs = Page.objects.live().public().distinct()
+Generación: cada publish/unpublish/move de cualquier página (pages/signals.py)
+suma 1 a la versión compartida "sitemaps" (pages/versions.py). El directorio
+guarda en .generation la generación que reflejan sus archivos, y sólo se
+sirven si coincide con la actual; si no (todavía no hay archivos, no se pueden
+escribir, o son de otra generación), se genera el XML en el request y se
+cachea por generación.
 
-        # ✅ sacar el root de Wagtail (depth=1)
-        qs = qs.exclude(depth=1)
+Al commitear el publish, el mismo proceso reescribe sólo el archivo que tiene
+a la página, más los siguientes mientras el corte entre archivos se haya corrido
+(la página entró o salió de la sección), con compresión rápida; mover una página
+reescribe todo. Eso sólo si los archivos estaban en la generación anterior: el
+disco es de cada instancia (en Render, efímero), así que en las otras instancias
+quedan desactualizados y se sirve el fallback dinámico hasta el próximo build.
+El build (write_sitemaps) y el final de un import masivo (BulkImporter.finish)
+escriben todo con la compresión máxima.
+"""
+import fcntl
+import gzip
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
 
-        # ✅ evitar home duplicada: quedate con una sola URL "/"
-        # Nos quedamos con la primera página más "profunda" que resuelva a "/"
-        # (normalmente tu HomePage), y excluimos el resto.
-        home_candidates = [p for p in qs if (p.url == "/" or p.url == "")]
-        if len(home_candidates) > 1:
-            # elegimos la que tenga mayor depth (más específica)
-            keep = sorted(home_candidates, key=lambda p: p.depth, reverse=True)[0]
-            qs = qs.exclude(pk__in=[p.pk for p in home_candidates if p.pk != keep.pk])
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef
+from wagtail.models import Page, Site
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
 
-        return qs
+from .deferral import unless_deferred
+from .models import ArticuloPage, CategoriaPage, DestinoPage, PaisPage, SitemapImage
+from .sitemap_images import SITEMAP_IMAGE_FIELDS
+from .versions import bump_version, get_version
 
-    def location(self, obj):
-        return obj.url or "/"
+try:
+    import brotli
+except ImportError:  # sin brotli se sirve sólo gzip
+    brotli = None
 
+SITEMAP_LIMIT = 50_000
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
 
-sitemaps = {"wagtail": WagtailPagesSitemap}
+# (gzip, brotli): máxima en el build; al publicar un archivo de 50k URLs con
+# brotli 11 tarda ~20s, con 5 menos de 1s y pesa apenas más
+COMPRESSION_MAX = (9, 11)
+COMPRESSION_FAST = (6, 5)
+
+SITEMAP_VERSION = "sitemaps"
+GENERATION_FILE = ".generation"  # en PAGES_SITEMAP_ROOT: generación de los archivos
+
+logger = logging.getLogger(__name__)
+
+# sección -> tipos de página (None = todo lo que no está en otra sección)
+SITEMAP_SECTIONS = {
+    "destinos": (DestinoPage,),
+    "guias": (ArticuloPage,),
+    "paises": (PaisPage,),
+    "categorias": (CategoriaPage,),
+    "paginas": None,
+}
+IMAGE_SECTION = "imagenes"
+ALL_SECTIONS = (*SITEMAP_SECTIONS, IMAGE_SECTION)
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+_XMLNS_IMAGE = 'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"'
+
+
+def sitemap_generation() -> int:
+    return get_version(SITEMAP_VERSION)
+
+
+def invalidate_sitemaps() -> int:
+    """Nueva generación: el fallback cacheado y los archivos en disco quedan viejos."""
+    return bump_version(SITEMAP_VERSION)
+
+
+def _root_path() -> str:
+    site = Site.objects.filter(is_default_site=True).select_related("root_page").first()
+    return site.root_page.url_path if site else "/"
+
+
+def _section_queryset(section: str, root_path: str):
+    qs = Page.objects.live().public().filter(url_path__startswith=root_path)
+    if section == IMAGE_SECTION:
+        return qs.filter(Exists(SitemapImage.objects.filter(page_id=OuterRef("pk"))))
+    models = SITEMAP_SECTIONS[section]
+    if models is None:
+        others = [m for ms in SITEMAP_SECTIONS.values() if ms for m in ms]
+        return qs.not_type(*others)
+    return qs.type(*models)
+
+
+def _w3c(value) -> str:
+    return value.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00") if value else ""
+
+
+def _lastmod(value) -> str:
+    return f"<lastmod>{_w3c(value)}</lastmod>" if value else ""
+
+
+def sitemap_sections(root_path: str):
+    """[(sección, número de archivo, lastmod)] para el índice: un aggregate por sección."""
+    files = []
+    for section in ALL_SECTIONS:
+        stats = _section_queryset(section, root_path).order_by().aggregate(
+            total=Count("id"), lastmod=Max("last_published_at")
+        )
+        pages = (stats["total"] + SITEMAP_LIMIT - 1) // SITEMAP_LIMIT
+        for number in range(1, pages + 1):
+            files.append((section, number, stats["lastmod"]))
+    return files
+
+
+def render_sitemap_index(base_url: str, files=None) -> str:
+    lines = [_XML_HEADER, f"<sitemapindex {_XMLNS}>\n"]
+    for section, number, lastmod in files if files is not None else sitemap_sections(_root_path()):
+        loc = escape(f"{base_url}/sitemap-{section}-{number}.xml")
+        lines.append(f"<sitemap><loc>{loc}</loc>{_lastmod(lastmod)}</sitemap>\n")
+    lines.append("</sitemapindex>\n")
+    return "".join(lines)
+
+
+def render_sitemap(base_url: str, section: str, number: int, root_path: str = None):
+    """XML de un archivo de la sección, o None si la sección/número no existe."""
+    if section not in ALL_SECTIONS or number < 1:
+        return None
+
+    root_path = root_path or _root_path()
+    offset = (number - 1) * SITEMAP_LIMIT
+    if section == IMAGE_SECTION:
+        return render_image_sitemap(base_url, root_path, offset)
+
+    rows = list(
+        _section_queryset(section, root_path)
+        .order_by("path")
+        .values_list("url_path", "last_published_at")[offset:offset + SITEMAP_LIMIT]
+    )
+    if not rows and number > 1:
+        return None
+
+    lines = [_XML_HEADER, f"<urlset {_XMLNS}>\n"]
+    for url_path, last_published_at in rows:
+        loc = escape(base_url + "/" + url_path[len(root_path):])
+        lines.append(f"<url><loc>{loc}</loc>{_lastmod(last_published_at)}</url>\n")
+    lines.append("</urlset>\n")
+    return "".join(lines)
+
+
+def _absolute(base_url: str, url: str) -> str:
+    # renditions en FileSystemStorage: "/media/..."; en Cloudinary ya vienen absolutas
+    return base_url + url if url.startswith("/") else url
+
+
+def render_image_sitemap(base_url: str, root_path: str, offset: int):
+    """<url> + <image:image> de las páginas [offset, offset + SITEMAP_LIMIT) con imágenes."""
+    pages = _section_queryset(IMAGE_SECTION, root_path).order_by("path").values("id")[offset:offset + SITEMAP_LIMIT]
+    rows = (
+        SitemapImage.objects.filter(page_id__in=pages)
+        .order_by("page__path", "position")
+        .values_list("page_id", "page__url_path", "page__last_published_at", "url")
+    )
+
+    lines = [_XML_HEADER, f"<urlset {_XMLNS} {_XMLNS_IMAGE}>\n"]
+    current = None
+    for page_id, url_path, last_published_at, url in rows.iterator(chunk_size=5000):
+        if page_id != current:
+            if current is not None:
+                lines.append("</url>\n")
+            current = page_id
+            loc = escape(base_url + "/" + url_path[len(root_path):])
+            lines.append(f"<url><loc>{loc}</loc>{_lastmod(last_published_at)}")
+        lines.append(f"<image:image><image:loc>{escape(_absolute(base_url, url))}</image:loc></image:image>")
+    if current is None and offset:
+        return None
+    if current is not None:
+        lines.append("</url>\n")
+    lines.append("</urlset>\n")
+    return "".join(lines)
+
+
+def cached_sitemap(base_url: str, section: str = None, number: int = 1):
+    """(xml, hit) del índice (section=None) o de un archivo, cacheado por generación."""
+    key = f"pages:sitemap:{sitemap_generation()}:{base_url}:{section or 'index'}:{number}"
+    xml = cache.get(key)
+    if xml is not None:
+        return xml, True
+
+    xml = render_sitemap_index(base_url) if section is None else render_sitemap(base_url, section, number)
+    if xml is not None:
+        cache.set(key, xml, SITEMAP_CACHE_TIMEOUT)
+    return xml, False
+
+
+# --- archivos pre-generados ---------------------------------------------------
+
+def sitemap_root() -> Path:
+    return Path(settings.PAGES_SITEMAP_ROOT)
+
+
+def sitemap_section_for(page) -> str:
+    for section, models in SITEMAP_SECTIONS.items():
+        if models and isinstance(page, models):
+            return section
+    return "paginas"
+
+
+def sitemap_sections_for(page):
+    """Secciones que cambian al publicar/despublicar page (la suya + imágenes si tiene)."""
+    sections = [sitemap_section_for(page)]
+    if type(page) in SITEMAP_IMAGE_FIELDS:
+        sections.append(IMAGE_SECTION)
+    return sections
+
+
+def _write_atomic(path: Path, data: bytes, mtime: float):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.utime(tmp, (mtime, mtime))
+    os.replace(tmp, path)
+
+
+def _last_url(xml):
+    """<loc> de la última <url> del archivo (el corte con el archivo siguiente)."""
+    if not xml:
+        return None
+    start = xml.rfind("<url><loc>")
+    return xml[start:xml.find("</loc>", start)] if start != -1 else ""
+
+
+def _read_file(path: Path):
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def _file_number(section: str, path: str, root_path: str) -> int:
+    """Archivo de la sección donde está (o estaría) la página con este path."""
+    before = _section_queryset(section, root_path).filter(path__lt=path).count()
+    return before // SITEMAP_LIMIT + 1
+
+
+def _write_file(root: Path, name: str, xml: str, compression=COMPRESSION_MAX) -> bool:
+    """Escribe name (+ .gz/.br) si el contenido cambió. Devuelve True si escribió."""
+    path = root / name
+    data = xml.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+
+    # Last-Modified/ETag salen del mtime (en segundos): siempre avanza al menos 1s
+    mtime = time.time()
+    if path.exists():
+        mtime = max(mtime, path.stat().st_mtime + 1)
+    # primero las variantes comprimidas y al final el original, todos con el mismo mtime
+    gzip_level, brotli_quality = compression
+    _write_atomic(root / f"{name}.gz", gzip.compress(data, compresslevel=gzip_level, mtime=0), mtime)
+    if brotli is not None:
+        _write_atomic(root / f"{name}.br", brotli.compress(data, quality=brotli_quality), mtime)
+    _write_atomic(path, data, mtime)
+    return True
+
+
+def _remove_file(root: Path, name: str):
+    for suffix in ("", ".gz", ".br"):
+        try:
+            (root / f"{name}{suffix}").unlink()
+        except FileNotFoundError:
+            pass
+
+
+def files_generation(root: Path = None):
+    """Generación que reflejan los archivos en disco (None si nunca se escribieron)."""
+    try:
+        return int(((root or sitemap_root()) / GENERATION_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@contextmanager
+def _locked(root: Path):
+    """Un solo escritor por directorio (los workers de una instancia comparten el disco)."""
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _write_files(root: Path, base_url: str, sections=(), changed_files=None, compression=COMPRESSION_MAX) -> dict:
+    """
+    Escribe el índice y los archivos de sections; borra los que sobran de esas secciones.
+
+    changed_files = {sección: {números}}: de esas secciones se reescriben sólo esos
+    archivos, y el siguiente mientras cambie la última URL del anterior (si una
+    página entró o salió, las de después se corren un lugar).
+    """
+    root_path = _root_path()
+    files = sitemap_sections(root_path)
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+    changed_files = changed_files or {}
+    wanted = set(sections) & set(ALL_SECTIONS)
+    touched = wanted | (set(changed_files) & set(ALL_SECTIONS))
+
+    def write(section, number):
+        name = f"sitemap-{section}-{number}.xml"
+        xml = render_sitemap(base_url, section, number, root_path=root_path)
+        stats["written" if _write_file(root, name, xml, compression) else "unchanged"] += 1
+        return xml
+
+    shifted = {}  # sección -> ¿se corrió el corte al final del último archivo escrito?
+    keep = {f"sitemap-{section}-{number}.xml" for section, number, _lastmod in files}
+    for section, number, _lastmod in files:
+        if section in wanted:
+            write(section, number)
+        elif number in changed_files.get(section, ()) or shifted.get(section):
+            previous = _last_url(_read_file(root / f"sitemap-{section}-{number}.xml"))
+            shifted[section] = _last_url(write(section, number)) != previous
+
+    for section in touched:
+        for path in root.glob(f"sitemap-{section}-*.xml"):
+            if path.name not in keep:
+                _remove_file(root, path.name)
+                stats["removed"] += 1
+
+    index = render_sitemap_index(base_url, files)
+    stats["written" if _write_file(root, "sitemap.xml", index, compression) else "unchanged"] += 1
+    return stats
+
+
+def write_sitemaps(sections=None, base_url: str = None) -> dict:
+    """
+    Genera en disco el índice y los archivos de las secciones indicadas (todas si
+    sections es None). Sólo el build completo marca los archivos con la generación actual.
+    """
+    base_url = (base_url or settings.PAGES_SITEMAP_BASE_URL).rstrip("/")
+    root = sitemap_root()
+    with _locked(root):
+        # antes de leer la base: un publish que commitee mientras tanto deja la marca vieja
+        generation = sitemap_generation()
+        stats = _write_files(root, base_url, sections or ALL_SECTIONS)
+        if sections is None:
+            _write_atomic(root / GENERATION_FILE, str(generation).encode(), time.time())
+    return stats
+
+
+def write_changed_sitemaps(changes, generation: int, base_url: str = None):
+    """
+    Reescribe sólo los archivos afectados por changes = [(sección, path)] (path
+    vacío = toda la sección), que llevan los archivos de generation - 1 a
+    generation. Si en disco hay otra generación no hace nada (queda el fallback
+    dinámico). Devuelve las stats, o None si no escribió.
+    """
+    base_url = (base_url or settings.PAGES_SITEMAP_BASE_URL).rstrip("/")
+    root = sitemap_root()
+    with _locked(root):
+        if files_generation(root) != generation - 1:
+            return None
+
+        root_path = _root_path()
+        whole = {section for section, path in changes if not path}
+        changed_files = {}
+        for section, path in changes:
+            if section not in whole:
+                changed_files.setdefault(section, set()).add(_file_number(section, path, root_path))
+
+        stats = _write_files(root, base_url, whole, changed_files, compression=COMPRESSION_FAST)
+        _write_atomic(root / GENERATION_FILE, str(generation).encode(), time.time())
+    return stats
+
+
+def safe_write_sitemaps(sections=None):
+    # un disco de sólo lectura no tiene que romper un import: queda el fallback dinámico
+    try:
+        return write_sitemaps(sections)
+    except OSError:
+        logger.exception("No se pudieron escribir los sitemaps en %s", sitemap_root())
+
+
+def _write_on_commit(changes):
+    generation = invalidate_sitemaps()
+
+    def write():
+        try:
+            write_changed_sitemaps(changes, generation)
+        except OSError:
+            logger.exception("No se pudieron escribir los sitemaps en %s", sitemap_root())
+
+    transaction.on_commit(write)
+
+
+@unless_deferred
+def write_sitemaps_on_publish(sender, instance, **kwargs):
+    """Handler de page_published / page_unpublished: nueva generación y, al commitear, el archivo de la página."""
+    _write_on_commit([(section, instance.path) for section in sitemap_sections_for(instance)])
+
+
+@unless_deferred
+def write_sitemaps_on_move(sender, instance, **kwargs):
+    # cambian las url_path de toda la rama (y puede ser de varios tipos): todas las secciones
+    _write_on_commit([(section, "") for section in ALL_SECTIONS])
+
+
+class _SitemapFiles(WhiteNoise):
+    """WhiteNoise sólo para PAGES_SITEMAP_ROOT, leyendo el disco en cada request (autorefresh):
+    los archivos cambian en caliente y el WhiteNoise del middleware toma una foto al arrancar."""
+
+    def __init__(self):
+        super().__init__(application=None, autorefresh=True, max_age=3600, charset="utf-8")
+        self.add_files(str(sitemap_root()))
+
+
+_files = None
+
+
+def serve_sitemap_file(request, name: str):
+    """Respuesta de WhiteNoise para el archivo pre-generado, o None si no existe o está desactualizado."""
+    global _files
+    if files_generation() != sitemap_generation():
+        return None
+    if _files is None:
+        _files = _SitemapFiles()
+    static_file = _files.find_file("/" + name)
+    if static_file is None:
+        return None
+    return WhiteNoiseMiddleware.serve(static_file, request)
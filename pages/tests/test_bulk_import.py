@@ -0,0 +1,65 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase
+
+from pages.bulk_import import BulkImporter, read_mapping
+from pages.models import ArticuloPage
+
+from .utils import CleanCacheMixin, build_guias
+
+MAPPING = """archivo,tipo,padre,slug,titulo,intro,tags
+uno.html,articulo,c1,uno,,,
+dos.html,articulo,c1,dos,,,
+tres.html,articulo,c1,tres,,,
+"""
+
+
+class BulkImportTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1, articulos_por_categoria=0)
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base_dir = Path(tmp.name)
+        (self.base_dir / "mapping.csv").write_text(MAPPING, encoding="utf-8")
+        for name in ("uno", "dos"):
+            (self.base_dir / f"{name}.html").write_text(f"<h1>{name.title()}</h1><p>Texto.</p>", encoding="utf-8")
+
+    def run_import(self):
+        rows = read_mapping(self.base_dir / "mapping.csv")
+        return BulkImporter(self.base_dir, rows, publish=True, workers=1).run()
+
+    def imported_slugs(self):
+        return sorted(ArticuloPage.objects.child_of(self.cats[0]).values_list("slug", flat=True))
+
+    def test_second_run_resumes_where_the_first_stopped(self):
+        with self.assertLogs("pages.bulk_import", "WARNING"):
+            stats = self.run_import()  # tres.html todavía no existe
+        self.assertEqual((stats.created, stats.skipped, len(stats.failed)), (2, 0, 1))
+        self.assertEqual(self.imported_slugs(), ["dos", "uno"])
+
+        (self.base_dir / "tres.html").write_text("<h1>Tres</h1><p>Texto.</p>", encoding="utf-8")
+        stats = self.run_import()
+        self.assertEqual((stats.created, stats.skipped, stats.failed), (1, 2, []))
+        self.assertEqual(self.imported_slugs(), ["dos", "tres", "uno"])
+        self.assertEqual(ArticuloPage.objects.get(slug="tres").title, "Tres")
+
+    def test_failed_page_does_not_break_the_rest_of_the_batch(self):
+        real_save_revision = ArticuloPage.save_revision
+
+        def save_revision(page, *args, **kwargs):
+            if page.slug == "uno":  # falla después de add_child: el padre ya sumó el hijo en memoria
+                raise RuntimeError("revisión rota")
+            return real_save_revision(page, *args, **kwargs)
+
+        with mock.patch.object(ArticuloPage, "save_revision", save_revision), self.assertLogs("pages.bulk_import"):
+            stats = self.run_import()
+        self.assertEqual((stats.created, sorted(line for line, *_ in stats.failed)), (1, [2, 4]))
+        self.assertEqual(self.imported_slugs(), ["dos"])
+        self.cats[0].refresh_from_db()
+        self.assertEqual(self.cats[0].numchild, 1)
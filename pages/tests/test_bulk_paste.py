@@ -0,0 +1,113 @@
+import base64
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from PIL import Image as PILImage
+from wagtail.images import get_image_model
+from wagtail.models import Page
+
+from pages import models as pages_models
+from pages.models import ArticuloPage
+
+from .utils import CleanCacheMixin, build_guias
+
+PASTED = "<p>Intro</p><h2>Cómo llegar</h2><p>En bus.</p><h2>Dónde dormir</h2><p>Hostel.</p>"
+
+
+def png_data_uri(color):
+    buffer = io.BytesIO()
+    PILImage.new("RGB", (8, 6), color).save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+class BulkPasteParseTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1)
+
+    def test_publish_reuses_the_preview_parse(self):
+        articulo = ArticuloPage.objects.get()
+        articulo.bulk_paste = PASTED
+        parse = mock.patch.object(
+            pages_models, "parse_html_with_images", wraps=pages_models.parse_html_with_images
+        )
+        with parse as parse_mock:
+            articulo.full_clean()  # preview / validación del formulario
+            revision = articulo.save_revision()
+            revision.publish()  # instancia nueva, armada desde la revisión
+
+        self.assertEqual(parse_mock.call_count, 1)
+        articulo = ArticuloPage.objects.get()
+        self.assertEqual([b["type"] for b in articulo.body.raw_data], ["rich_text", "quick_section", "quick_section"])
+        self.assertEqual(articulo.bulk_paste, "")
+
+
+class BulkPasteImagesTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1)
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(MEDIA_ROOT=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def media_files(self):
+        return [p for p in Path(settings.MEDIA_ROOT).rglob("*") if p.is_file()]
+
+    def test_clean_converts_without_uploading_and_save_uploads(self):
+        articulo = ArticuloPage.objects.get()
+        articulo.bulk_paste = (
+            "<p>Intro</p><h2>Cómo llegar</h2><p>En bus.</p>"
+            f'<p><img src="{png_data_uri("red")}" alt="Rojo"></p>'
+        )
+        Image = get_image_model()
+
+        articulo.full_clean()
+        self.assertEqual(Image.objects.count(), 0)
+        self.assertEqual([b["type"] for b in articulo.body.raw_data], ["rich_text", "quick_section"])
+        self.assertIsNone(articulo.body.raw_data[1]["value"]["image"])
+
+        articulo.save()
+        image = Image.objects.get()
+        self.assertEqual((image.title, image.width, image.height), ("Rojo", 8, 6))
+        self.assertEqual(articulo.body.raw_data[1]["value"]["image"], image.pk)
+        self.assertEqual(articulo.bulk_paste, "")
+
+    def test_failed_upload_leaves_no_files(self):
+        articulo = ArticuloPage.objects.get()
+        articulo.bulk_paste = f'<h2>Fotos</h2><img src="{png_data_uri("red")}"><img src="{png_data_uri("blue")}">'
+        real_save = FileSystemStorage.save
+        calls = []
+
+        def flaky_save(storage, name, content, max_length=None):
+            calls.append(name)
+            if len(calls) == 2:
+                raise OSError("disco lleno")
+            return real_save(storage, name, content, max_length=max_length)
+
+        with mock.patch.object(FileSystemStorage, "save", flaky_save), self.assertLogs("pages.image_ingest", "ERROR"):
+            with self.assertRaises(ValidationError):
+                articulo.save()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(get_image_model().objects.count(), 0)
+        self.assertEqual(self.media_files(), [])
+
+    def test_failed_page_save_removes_uploaded_images(self):
+        articulo = ArticuloPage.objects.get()
+        articulo.bulk_paste = f'<h2>Fotos</h2><img src="{png_data_uri("red")}">'
+
+        with mock.patch.object(Page, "save", side_effect=RuntimeError("falla la base")):
+            with self.assertRaises(RuntimeError):
+                articulo.save()
+        self.assertEqual(get_image_model().objects.count(), 0)
+        self.assertEqual(self.media_files(), [])
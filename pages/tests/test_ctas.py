@@ -0,0 +1,30 @@
+from django.test import TestCase
+
+from pages.ctas import get_cta_index, resolve_ctas
+from pages.models import CTARule
+
+from .utils import CleanCacheMixin
+
+
+class CTAIndexTests(CleanCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        CTARule.objects.all().delete()  # las reglas de ejemplo de la migración
+
+    def test_rule_save_rebuilds_index(self):
+        index = get_cta_index()
+        CTARule.objects.create(tag="Playa", title="Carpas", url="https://x.test/carpas")
+        self.assertIsNot(get_cta_index(), index)
+        self.assertEqual([cta["title"] for cta in get_cta_index().by_tag["playa"]], ["Carpas"])
+
+        CTARule.objects.filter(tag="Playa").get().delete()
+        self.assertNotIn("playa", get_cta_index().by_tag)
+
+    def test_resolve_by_priority_without_duplicates_and_defaults(self):
+        CTARule.objects.create(tag="", title="Genérico", url="https://x.test/")
+        CTARule.objects.create(tag="playa", title="Snorkel", url="https://x.test/snorkel", priority=20)
+        CTARule.objects.create(tag="mar", title="Snorkel (mar)", url="https://x.test/snorkel", priority=30)
+        CTARule.objects.create(tag="Mar", title="Barco", url="https://x.test/barco", priority=10)
+
+        self.assertEqual([cta["title"] for cta in resolve_ctas(["Playa", "mar "])], ["Barco", "Snorkel"])
+        self.assertEqual([cta["title"] for cta in resolve_ctas(["montaña"])], ["Genérico"])
@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase
+
+from pages.importer import html_to_stream_data
+
+PASTED = """
+<p>Intro</p>
+<h2>Cómo llegar</h2>
+<div><table><tr><td><p>Bus</p></td><td><ul><li><p>Ida</p></li></ul></td></tr></table></div>
+<ul><li><p>Tren</p><ol><li>Directo</li></ol></li></ul>
+<blockquote><p>Cita</p></blockquote>
+<p>Final</p>
+"""
+
+
+class ImporterTests(SimpleTestCase):
+    def test_tables_and_lists_are_emitted_once(self):
+        for parser in ("html.parser", "lxml"):
+            with self.subTest(parser=parser):
+                blocks = html_to_stream_data(PASTED, parser=parser)
+                self.assertEqual([b["type"] for b in blocks], ["rich_text", "quick_section"])
+                self.assertEqual(blocks[0]["value"], "<p>Intro</p>")
+
+                body = blocks[1]["value"]["body"]
+                for text in ("Bus", "Ida", "Tren", "Directo", "Cita", "Final"):
+                    self.assertEqual(body.count(text), 1, text)
+                self.assertLess(body.index("</table>"), body.index("Tren"))
+                self.assertTrue(body.endswith("<p>Final</p>"))
+
+    def test_images_and_embeds_become_blocks(self):
+        html = (
+            '<h2>Fotos</h2><p>Texto<img src="a.png" alt="A"><img src="b.png"></p>'
+            '<iframe src="https://www.youtube.com/embed/x"></iframe>'
+        )
+        refs = []
+        blocks = html_to_stream_data(html, image_refs=refs)
+
+        self.assertEqual([b["type"] for b in blocks], ["quick_section", "image", "youtube"])
+        self.assertEqual(blocks[0]["value"]["body"], "<p>Texto</p>")
+        self.assertEqual([(r["src"], r["alt"]) for r in refs], [("a.png", "A"), ("b.png", "")])
+        self.assertIs(refs[0]["target"], blocks[0]["value"])
@@ -0,0 +1,39 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from pages.jobs import MAX_ATTEMPTS, STALE_AFTER, claim_next_job, enqueue_import_job, run_import_job
+from pages.models import ArticuloPage, ImportJob
+
+from .utils import CleanCacheMixin, build_guias
+
+
+class ImportJobTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1)
+        cls.articulo = ArticuloPage.objects.get()
+
+    def test_job_converts_and_publishes(self):
+        self.articulo.bulk_paste = "<h2>Cómo llegar</h2><p>En bus.</p>"
+        enqueue_import_job(self.articulo, publish=True)
+
+        job = run_import_job(claim_next_job())
+        self.assertEqual((job.status, job.blocks, job.html, job.attempts), (ImportJob.DONE, 1, "", 1))
+        articulo = ArticuloPage.objects.get()
+        self.assertEqual(articulo.body.raw_data[0]["value"]["title"], "Cómo llegar")
+        self.assertIsNone(claim_next_job())
+
+    def test_stale_running_jobs_are_retried_then_failed(self):
+        stale = timezone.now() - STALE_AFTER * 2
+        retry = ImportJob.objects.create(
+            page=self.articulo, html="<p>x</p>", status=ImportJob.RUNNING, attempts=1, started_at=stale
+        )
+        dead = ImportJob.objects.create(
+            page=self.articulo, html="<p>x</p>", status=ImportJob.RUNNING, attempts=MAX_ATTEMPTS, started_at=stale
+        )
+
+        self.assertEqual(claim_next_job().pk, retry.pk)
+        dead.refresh_from_db()
+        self.assertEqual(dead.status, ImportJob.FAILED)
+        self.assertIsNotNone(dead.finished_at)
+        self.assertIsNone(claim_next_job())  # el reintento ya está "running" y no es viejo
@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from wagtail.models import Page
+
+from pages.models import ArticuloPage, CategoriaPage, tree_range_q
+from pages.pagination import LISTING_VERSION, encode_cursor
+from pages.versions import get_version
+
+from .utils import CleanCacheMixin, build_guias
+
+
+class TreeRangeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # 10 categorías: la 9ª termina en "9" y la 10ª en "A"
+        cls.guias, cls.cats = build_guias(categorias=10)
+
+    def test_upper_bound_uses_treebeard_alphabet(self):
+        cat9 = self.cats[8]
+        self.assertTrue(cat9.path.endswith("9"))
+        self.assertIn(("path__lt", cat9.path[:-1] + "A"), tree_range_q(cat9).children)
+
+    def test_upper_bound_carries(self):
+        self.assertIn(("path__lt", "00010100"), tree_range_q(CategoriaPage(path="000100ZZ")).children)
+        self.assertEqual(tree_range_q(CategoriaPage(path="ZZZZ")).children, [("path__gt", "ZZZZ")])
+
+    def test_range_matches_descendants(self):
+        for cat in self.cats:
+            self.assertEqual(
+                set(Page.objects.filter(tree_range_q(cat)).values_list("pk", flat=True)),
+                set(cat.get_descendants().values_list("pk", flat=True)),
+            )
+
+    def test_category_filter_on_path_ending_in_9(self):
+        request = RequestFactory().get("/guias/", {"cat": "c9"})
+        context = self.guias.get_context(request)
+        self.assertEqual([p.slug for p in context["page_obj"]], ["guia-9-0"])
+
+
+def guias_context(guias, **params):
+    return guias.get_context(RequestFactory().get("/guias/", params))
+
+
+@override_settings(PAGES_KEYSET_PAGINATION=True, PAGES_KEYSET_NUMBERED_PAGES=1)
+class KeysetPaginationTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1, articulos_por_categoria=30)
+        # empates de first_published_at justo en los cortes entre páginas (12 por página)
+        base = ArticuloPage.objects.order_by("-first_published_at", "-id")
+        ids = list(base.values_list("id", flat=True))
+        tied_at = ArticuloPage.objects.get(pk=ids[10]).first_published_at
+        Page.objects.filter(pk__in=ids[9:15] + ids[22:26]).update(first_published_at=tied_at)
+        cls.expected = list(
+            ArticuloPage.objects.order_by("-first_published_at", "-id").values_list("slug", flat=True)
+        )
+
+    def walk_forward(self):
+        context = guias_context(self.guias)
+        self.assertFalse(context["keyset"])
+        pages = [[p.slug for p in context["page_obj"]]]
+        cursor = context["page_obj"].keyset_next
+        last = None
+        while cursor:
+            context = guias_context(self.guias, after=cursor)
+            self.assertTrue(context["keyset"])
+            last = context["page_obj"]
+            pages.append([p.slug for p in last])
+            cursor = last.next_cursor
+        return pages, last
+
+    def test_forward_walk_covers_listing_once(self):
+        pages, _last = self.walk_forward()
+        self.assertEqual([slug for page in pages for slug in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [12, 12, 6])
+
+    def test_backward_walk_returns_same_pages(self):
+        pages, last = self.walk_forward()
+        back = []
+        cursor = last.previous_cursor
+        while cursor:
+            page = guias_context(self.guias, before=cursor)["page_obj"]
+            back.insert(0, [p.slug for p in page])
+            cursor = page.previous_cursor
+        # hacia atrás se llega hasta el primer elemento, con los mismos cortes
+        self.assertEqual(back, pages[:-1])
+
+    def test_numbered_page_beyond_limit_is_404(self):
+        with self.assertRaises(Http404):
+            guias_context(self.guias, page=2)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        context = guias_context(self.guias, after="basura")
+        self.assertFalse(context["keyset"])
+        self.assertEqual(context["page_obj"].number, 1)
+
+    def test_count_cached_per_resolved_category(self):
+        cat = self.cats[0]
+        guias_context(self.guias, cat=cat.slug)
+        self.assertEqual(cache.get(f"pages:listing-count:{get_version(LISTING_VERSION)}:guias:{cat.pk}"), 30)
+
+        context = guias_context(self.guias, cat="no-existe")
+        self.assertEqual(list(context["page_obj"]), [])
+        self.assertFalse([key for key in cache._cache if "no-existe" in key])
+
+    def test_category_filter_in_keyset_mode(self):
+        cat = self.cats[0]
+        first = ArticuloPage.objects.order_by("-first_published_at", "-id")[11]
+        context = guias_context(self.guias, cat=cat.slug, after=encode_cursor(first))
+        self.assertEqual([p.slug for p in context["page_obj"]], self.expected[12:24])
+
+    def test_stale_count_does_not_hide_next_page(self):
+        with override_settings(PAGES_KEYSET_NUMBERED_PAGES=3):
+            extra = [ArticuloPage.objects.get(slug=f"guia-1-{i}") for i in range(7)]
+            Page.objects.filter(pk__in=[p.pk for p in extra]).update(first_published_at=None)
+            guias_context(self.guias)  # total cacheado con 23: 2 páginas
+            # vuelven 7 sin pasar por un publish: el total queda atrasado (hay 30, 3 páginas)
+            Page.objects.filter(pk__in=[p.pk for p in extra]).update(first_published_at=extra[0].last_published_at)
+
+            page_obj = guias_context(self.guias, page=2)["page_obj"]
+            self.assertEqual(page_obj.paginator.count, 23)
+            self.assertTrue(page_obj.has_next())
+            page_obj = guias_context(self.guias, page=3)["page_obj"]
+            self.assertEqual((page_obj.number, len(page_obj), page_obj.has_next()), (3, 6, False))
+
+    def test_publish_refreshes_cached_count(self):
+        guias_context(self.guias)
+        nueva = ArticuloPage(title="Nueva", slug="nueva", intro="intro", body=[])
+        self.cats[0].add_child(instance=nueva)
+        nueva.save_revision().publish()
+        self.assertEqual(guias_context(self.guias)["page_obj"].paginator.count, 31)
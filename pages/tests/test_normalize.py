@@ -0,0 +1,35 @@
+import re
+
+from bs4 import BeautifulSoup
+from django.test import SimpleTestCase
+
+from pages.normalize import normalize_html
+
+WORD = (
+    '<!--[if gte mso 9]><xml>x</xml><![endif]-->'
+    '<p class="MsoNormal" style="mso-margin-top-alt:auto;color:red" dir="ltr">'
+    '<span>Cómo</span>   <b> </b><span lang="es">llegar</span><o:p></o:p></p>'
+    '<p id="docs-internal-guid-1"><font>En   bus</font> desde <i></i>Salta.</p>'
+)
+
+
+def visible_text(html):
+    return re.sub(r"\s+", " ", BeautifulSoup(html, "html.parser").get_text()).strip()
+
+
+class NormalizeHtmlTests(SimpleTestCase):
+    def test_output_is_smaller_and_looks_the_same(self):
+        out = normalize_html(WORD)
+
+        self.assertEqual(
+            out, '<p style="color:red">Cómo  <span lang="es">llegar</span></p><p>En bus desde Salta.</p>'
+        )
+        self.assertEqual(visible_text(out), visible_text(WORD))
+
+    def test_pre_wrap_whitespace_is_kept(self):
+        html = '<p><span style="mso-bidi-font-weight:700;white-space:pre-wrap">Hora    Lugar\n  Bus</span>  <span>fin</span></p>'
+        out = normalize_html(html)
+
+        self.assertEqual(out, '<p><span style="white-space:pre-wrap">Hora    Lugar\n  Bus</span> fin</p>')
+        untouched = '<pre>a    b</pre><p style="white-space: pre">c   d</p>'
+        self.assertEqual(normalize_html(untouched), untouched)
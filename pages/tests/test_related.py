@@ -0,0 +1,56 @@
+from django.test import RequestFactory, TestCase
+from wagtail.models import Page, PageViewRestriction, Site
+
+from pages.models import DestinoPage, DestinosIndexPage, HomePage, PaisPage, RelatedDestino
+from pages.related import rebuild_related_destinos
+
+from .utils import CleanCacheMixin
+
+
+def related_slugs(destino):
+    return list(
+        RelatedDestino.objects.filter(source=destino).order_by("position").values_list("target__slug", flat=True)
+    )
+
+
+class RelatedDestinosTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        home = HomePage(title="Home", slug="home-test")
+        Page.get_first_root_node().add_child(instance=home)
+        Site.objects.update_or_create(is_default_site=True, defaults={"root_page": home, "hostname": "localhost"})
+        index = DestinosIndexPage(title="Destinos", slug="destinos")
+        home.add_child(instance=index)
+
+        cls.paises = {}
+        cls.destinos = {}
+        for pais_slug, count in (("a", 8), ("b", 1)):
+            pais = PaisPage(title=pais_slug.upper(), slug=pais_slug)
+            index.add_child(instance=pais)
+            pais.save_revision().publish()
+            cls.paises[pais_slug] = pais
+            for n in range(count):
+                destino = DestinoPage(title=f"{pais_slug}{n}", slug=f"{pais_slug}{n}", intro="intro", body=[])
+                pais.add_child(instance=destino)
+                destino.save_revision().publish()
+                cls.destinos[destino.slug] = destino
+        rebuild_related_destinos()
+
+    def test_siblings_fill_related(self):
+        self.assertEqual(related_slugs(self.destinos["a0"]), ["a1", "a2", "a3", "a4", "a5", "a6"])
+
+    def test_deleted_target_is_replaced(self):
+        self.destinos["a3"].delete()
+        self.assertEqual(related_slugs(self.destinos["a0"]), ["a1", "a2", "a4", "a5", "a6", "a7"])
+
+    def test_move_refreshes_new_siblings(self):
+        a7 = self.destinos["a7"]
+        a7.move(self.paises["b"], pos="last-child")
+
+        self.assertEqual(related_slugs(self.destinos["b0"]), ["a7"])
+        self.assertEqual(related_slugs(DestinoPage.objects.get(pk=a7.pk)), ["b0"])
+
+    def test_private_destinos_are_not_shown(self):
+        PageViewRestriction.objects.create(page=self.destinos["a1"], restriction_type="login")
+        context = self.destinos["a0"].get_context(RequestFactory().get("/"))
+        self.assertEqual([d.slug for d in context["related_destinos"]], ["a2", "a3", "a4", "a5", "a6"])
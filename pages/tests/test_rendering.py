@@ -0,0 +1,146 @@
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from wagtail.images import get_image_model
+
+from pages.headings import index_headings
+from pages.models import ArticuloPage
+from pages.rendering import (
+    BLOCK_CACHE_ALIAS, block_cache_key, block_cache_stats, body_cache_key, build_toc_and_body_html, extract_toc,
+    iter_body_html, reset_block_cache_stats,
+)
+
+from .utils import TEST_STORAGES, CleanCacheMixin, build_guias
+
+
+def block_keys(page):
+    return [block_cache_key(block, page.body.raw_data[i]["value"]) for i, block in enumerate(page.body)]
+
+
+class RenderReferencesTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1)
+        cls.linked = ArticuloPage.objects.get()
+        cls.image = get_image_model().objects.create(
+            title="Foto", width=8, height=6, file="original_images/foto.png"
+        )
+
+    def articulo(self, *blocks):
+        return ArticuloPage(pk=999, title="Body", slug="body", body=list(blocks))
+
+    def test_plain_blocks_ignore_references(self):
+        page = self.articulo(
+            {"type": "rich_text", "value": "<p>Sin links</p>", "id": "a"},
+            {"type": "quick_section", "value": {"title": "Cómo llegar", "body": "<p>En bus</p>", "image": None}, "id": "b"},
+        )
+        keys = block_keys(page), body_cache_key(page)
+
+        self.image.save()
+        self.assertEqual((block_keys(page), body_cache_key(page)), keys)
+
+    def test_image_save_changes_keys_of_blocks_using_it(self):
+        page = self.articulo(
+            {"type": "rich_text", "value": "<p>Texto</p>", "id": "a"},
+            {"type": "quick_section", "value": {"title": "Foto", "image": self.image.pk}, "id": "b"},
+        )
+        plain, with_image = block_keys(page)
+        page_key = body_cache_key(page)
+
+        self.image.save()  # archivo reemplazado / punto focal: cambia la URL de la rendition
+        self.assertEqual(block_keys(page)[0], plain)
+        self.assertNotEqual(block_keys(page)[1], with_image)
+        self.assertNotEqual(body_cache_key(page), page_key)
+
+    def test_linked_page_slug_change_changes_keys(self):
+        page = self.articulo(
+            {"type": "rich_text", "value": f'<p><a linktype="page" id="{self.linked.pk}">Guía</a></p>', "id": "a"},
+        )
+        html = "".join(iter_body_html(page.body))
+        self.assertIn(self.linked.url, html)
+        keys = block_keys(page), body_cache_key(page)
+
+        self.linked.slug = "guia-renombrada"
+        with self.captureOnCommitCallbacks(execute=True):  # page_slug_changed sale en on_commit
+            self.linked.save_revision().publish()
+        self.assertNotEqual(block_keys(page)[0], keys[0][0])
+        self.assertNotEqual(body_cache_key(page), keys[1])
+
+
+class BlockCacheTests(CleanCacheMixin, TestCase):
+    def test_blocks_use_their_own_cache_and_shared_counters(self):
+        page = ArticuloPage(pk=999, title="Body", slug="body", body=[
+            {"type": "rich_text", "value": "<p>Uno</p>", "id": "a"},
+            {"type": "rich_text", "value": "<p>Dos</p>", "id": "b"},
+        ])
+        reset_block_cache_stats()
+        "".join(iter_body_html(page.body))
+        "".join(iter_body_html(page.body))
+
+        for key in block_keys(page):
+            self.assertIsNotNone(caches[BLOCK_CACHE_ALIAS].get(key))
+            self.assertIsNone(cache.get(key))
+        # se leen de la base: lo que vuelca cada worker
+        self.assertEqual(block_cache_stats(), {"hits": 2, "misses": 2, "ratio": 0.5})
+        reset_block_cache_stats()
+        self.assertEqual(block_cache_stats()["hits"], 0)
+
+
+@override_settings(PAGES_STREAM_BODY=True, PAGES_STREAM_MIN_BLOCKS=3, STORAGES=TEST_STORAGES)
+class StreamingBodyTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1)
+        cls.articulo = ArticuloPage.objects.get()
+        cls.articulo.body = [
+            {"type": "rich_text", "value": f"<h2>Parte {n}</h2><p>Texto {n}</p>", "id": f"b{n}"} for n in range(4)
+        ]
+        cls.articulo.save_revision().publish()
+
+    def test_uncached_body_streams_once_then_serves_from_cache(self):
+        cache.clear()  # el publish la calentó
+        response = self.client.get(self.articulo.url, secure=True)
+        self.assertTrue(response.streaming)
+        html = b"".join(response.streaming_content).decode()
+        for n in range(4):
+            self.assertIn(f'<h2 id="parte-{n}">Parte {n}</h2>', html)
+        self.assertIn("</html>", html)
+
+        response = self.client.get(self.articulo.url, secure=True)
+        self.assertFalse(response.streaming)
+        self.assertContains(response, '<h2 id="parte-3">Parte 3</h2>')
+
+
+class ExtractTocTests(TestCase):
+    def test_raw_toc_matches_rendered_toc(self):
+        page = ArticuloPage(title="Body", slug="body", body=[
+            {"type": "section_title", "value": {"title": "Cómo llegar", "subtitle": "En bus"}, "id": "a"},
+            {"type": "rich_text", "value": "<h2>Cómo llegar</h2><p>x</p><h3>Desde <b>Salta</b></h3>", "id": "b"},
+            {"type": "quick_section", "value": {"title": "Dónde dormir", "body": "<p>Hostel</p>"}, "id": "c"},
+            {"type": "quick_section", "value": {"title": "", "body": "<p>Sin título</p>"}, "id": "d"},
+            {"type": "quick_sections", "value": {"title": "Más", "sections": [
+                {"type": "item", "value": {"title": "Qué comer", "body": ""}, "id": "e1"},
+                {"type": "item", "value": {"title": "Dónde dormir", "body": ""}, "id": "e2"},
+            ]}, "id": "e"},
+            {"type": "section_title", "value": {"title": "  "}, "id": "f"},
+        ])
+        toc, _html = build_toc_and_body_html(page.body)
+
+        self.assertEqual(extract_toc(page.body.raw_data), toc)
+        self.assertEqual(
+            [entry["anchor"] for entry in toc],
+            ["como-llegar", "como-llegar-2", "desde-salta", "donde-dormir", "que-comer", "donde-dormir-2"],
+        )
+
+
+class IndexHeadingsTests(TestCase):
+    def test_single_pass_keeps_markup_and_replaces_ids(self):
+        html = '<h2 class="x" id="viejo">Cómo <b>llegar</b></h2><p>a</p><H3>Salta &amp; Jujuy</H3><h2> </h2><h4>No</h4>'
+        out, headings = index_headings(html, lambda title, level: f"{level}-{len(title)}")
+
+        self.assertEqual(
+            out,
+            '<h2 id="2-11" class="x">Cómo <b>llegar</b></h2><p>a</p><H3 id="3-13">Salta &amp; Jujuy</H3><h2> </h2><h4>No</h4>',
+        )
+        self.assertEqual(
+            [(h["title"], h["level"]) for h in headings], [("Cómo llegar", 2), ("Salta & Jujuy", 3)]
+        )
@@ -0,0 +1,29 @@
+from django.test import TestCase
+
+from pages.models import ArticuloPage
+from pages.search import reset_search_cache_stats, search_cache_stats, search_pages
+
+from .utils import CleanCacheMixin, build_guias
+
+
+class SearchCacheTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1, articulos_por_categoria=2)
+
+    def test_publish_invalidates_search_cache(self):
+        search_pages("guia")
+        self.assertTrue(search_pages("guia")[2])
+
+        ArticuloPage.objects.first().save_revision().publish()
+        self.assertFalse(search_pages("guia")[2])
+
+    def test_stats_are_shared_counters(self):
+        reset_search_cache_stats()
+        search_pages("guia")
+        search_pages("guia")
+
+        # se leen de la base: lo que vuelca cada worker
+        self.assertEqual(search_cache_stats(), {"hits": 2, "misses": 2, "ratio": 0.5})
+        reset_search_cache_stats()
+        self.assertEqual(search_cache_stats()["misses"], 0)
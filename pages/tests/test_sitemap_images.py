@@ -0,0 +1,27 @@
+from django.test import TestCase
+from wagtail.images import get_image_model
+
+from pages.models import ArticuloPage, SitemapImage
+
+from .utils import CleanCacheMixin, build_guias
+
+
+class SitemapImagesTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1)
+        Image = get_image_model()
+        cls.cover = Image.objects.create(title="Tapa", width=1600, height=700, file="original_images/tapa.jpg")
+        cls.gallery = Image.objects.create(title="Foto", width=800, height=600, file="original_images/foto.jpg")
+        cls.gallery.renditions.create(filter_spec="fill-520x360", file="images/foto.fill-520x360.jpg", width=520, height=360)
+
+    def test_new_page_lists_originals_until_renditions_exist(self):
+        articulo = ArticuloPage.objects.get()
+        articulo.cover_image = self.cover
+        articulo.body = [{"type": "gallery", "value": {"images": [self.gallery.pk]}, "id": "g"}]
+        articulo.save_revision().publish()  # la tapa nunca se renderizó
+
+        self.assertEqual(
+            list(SitemapImage.objects.filter(page=articulo).values_list("url", flat=True)),
+            ["/media/original_images/tapa.jpg", "/media/images/foto.fill-520x360.jpg"],
+        )
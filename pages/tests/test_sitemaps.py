@@ -0,0 +1,78 @@
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from pages.models import ArticuloPage, SitemapImage
+from pages.sitemaps import files_generation, render_sitemap, sitemap_generation, sitemap_root, write_sitemaps
+
+from .utils import CleanCacheMixin, build_guias
+
+
+class SitemapRenderTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=3, articulos_por_categoria=2)
+        cls.root_path = cls.guias.get_parent().url_path
+        for position, articulo in enumerate(ArticuloPage.objects.all()[:2]):
+            SitemapImage.objects.create(page=articulo, position=0, url=f"/media/images/{position}.jpg")
+
+    # 2 queries fijas por archivo: las restricciones de acceso (public()) + las filas
+
+    def test_section_file_queries(self):
+        with self.assertNumQueries(2):
+            xml = render_sitemap("https://x.test", "guias", 1, root_path=self.root_path)
+        self.assertEqual(xml.count("<url>"), 6)
+
+    def test_image_file_queries(self):
+        with self.assertNumQueries(2):
+            xml = render_sitemap("https://x.test", "imagenes", 1, root_path=self.root_path)
+        self.assertEqual(xml.count("<image:image>"), 2)
+        self.assertIn("https://x.test/media/images/0.jpg", xml)
+
+
+class SitemapFilesTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=3, articulos_por_categoria=2)
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(PAGES_SITEMAP_ROOT=Path(tmp.name), PAGES_SITEMAP_BASE_URL="https://x.test")
+        override.enable()
+        self.addCleanup(override.disable)
+        write_sitemaps()
+
+    def files(self):
+        return {p.name: p.read_bytes() for p in sitemap_root().glob("*.xml")}
+
+    def publish_nueva(self):
+        nueva = ArticuloPage(title="Nueva", slug="nueva", intro="intro", body=[])
+        self.cats[1].add_child(instance=nueva)
+        nueva.save_revision().publish()
+
+    def test_publish_rewrites_files_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ArticuloPage.objects.order_by("path").first().unpublish()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.publish_nueva()
+        self.assertEqual(files_generation(), sitemap_generation())
+        self.assertIn(b"https://x.test/guias/c2/nueva/", self.files()["sitemap-guias-1.xml"])
+
+        written = self.files()
+        write_sitemaps()
+        self.assertEqual(self.files(), written)
+
+    def test_stale_files_are_not_served(self):
+        response = self.client.get("/sitemap-guias-1.xml", secure=True)
+        self.assertNotIn("X-Sitemap-Cache", response)  # archivo de WhiteNoise
+
+        # publish cuyo on_commit corrió en otra instancia: este disco quedó viejo
+        self.publish_nueva()
+        self.assertNotEqual(files_generation(), sitemap_generation())
+        self.assertNotIn(b"/nueva/", self.files()["sitemap-guias-1.xml"])
+        response = self.client.get("/sitemap-guias-1.xml", secure=True)
+        self.assertEqual(response["X-Sitemap-Cache"], "miss")
+        self.assertContains(response, "/guias/c2/nueva/")
@@ -0,0 +1,19 @@
+from django.test import TestCase
+
+from pages.models import ArticuloPage
+from pages.typeahead import suggest
+
+from .utils import CleanCacheMixin, build_guias
+
+
+class TypeaheadTests(CleanCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.guias, cls.cats = build_guias(categorias=1)
+
+    def test_publish_invalidates_typeahead(self):
+        self.assertEqual(suggest("mendoza"), [])
+        articulo = ArticuloPage(title="Mendoza en otoño", slug="mendoza", intro="intro", body=[])
+        self.cats[0].add_child(instance=articulo)
+        articulo.save_revision().publish()
+        self.assertEqual([s["t"] for s in suggest("mendoza")], ["Mendoza en otoño"])
@@ -0,0 +1,45 @@
+"""Helpers compartidos por los tests de pages."""
+from django.conf import settings
+from django.core.cache import caches
+from wagtail.models import Page, Site
+
+from pages import counters, versions
+from pages.models import ArticuloPage, CategoriaPage, GuiasIndexPage, HomePage
+
+# sin el manifest de collectstatic: para los tests que renderizan templates
+TEST_STORAGES = {
+    **settings.STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def build_guias(categorias=2, articulos_por_categoria=1):
+    """Home -> Guías -> categorías c1..cN, cada una con sus artículos publicados."""
+    home = HomePage(title="Home", slug="home-test")
+    Page.get_first_root_node().add_child(instance=home)
+    guias = GuiasIndexPage(title="Guías", slug="guias")
+    home.add_child(instance=guias)
+    Site.objects.update_or_create(is_default_site=True, defaults={"root_page": home, "hostname": "localhost"})
+
+    cats = []
+    for n in range(1, categorias + 1):
+        cat = CategoriaPage(title=f"Categoría {n:02d}", slug=f"c{n}")
+        guias.add_child(instance=cat)
+        cat.save_revision().publish()
+        for i in range(articulos_por_categoria):
+            articulo = ArticuloPage(title=f"Guía {n}-{i}", slug=f"guia-{n}-{i}", intro="intro", body=[])
+            cat.add_child(instance=articulo)
+            articulo.save_revision().publish()
+        cats.append(cat)
+    return guias, cats
+
+
+class CleanCacheMixin:
+    """La caché (LocMem) y las versiones memoizadas sobreviven al rollback de cada test."""
+
+    def setUp(self):
+        super().setUp()
+        for cache in caches.all():
+            cache.clear()
+        versions._memo.clear()
+        counters._pending.clear()
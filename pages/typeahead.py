@@ -0,0 +1,121 @@
+# pages/typeahead.py
+"""
+Autocompletado del buscador del header (/buscar/sugerencias/?q=...).
+
+Índice de prefijos en memoria sobre los títulos de destinos, países y guías
+publicados, armado con una sola query:
+- cada título se normaliza igual que las búsquedas (sin tildes, minúsculas)
+  y se indexa desde el comienzo de cada palabra: "san carlos de bariloche"
+  aparece con "san", "car", "bar", ...
+- las keys van en una lista ordenada: un prefijo es un bisect + un recorrido
+  corto, sin tocar la base.
+
+Como el índice de CTAs (pages/ctas.py), hay una copia por proceso: se tira al
+publicar/despublicar (signals) y se rearma cuando cambia la generación de
+búsqueda (pages/search.py), que está en la base (pages/versions.py): los otros
+workers se enteran en unos segundos.
+"""
+from bisect import bisect_left
+
+from wagtail.models import Page, Site
+
+from .deferral import unless_deferred
+from .models import ArticuloPage, DestinoPage, PaisPage
+from .search import normalize_query, search_generation
+
+TYPEAHEAD_LIMIT = 8
+TYPEAHEAD_MIN_CHARS = 2
+_MAX_SCAN = 200  # keys a recorrer como máximo por consulta (prefijos muy cortos)
+
+# modelo -> (etiqueta, orden entre tipos)
+TYPEAHEAD_MODELS = {
+    DestinoPage: ("Destino", 0),
+    PaisPage: ("País", 1),
+    ArticuloPage: ("Guía", 2),
+}
+
+_index = None
+
+
+class TypeaheadIndex:
+    def __init__(self, rows, root_path: str = "/", generation: int = 0):
+        self.generation = generation
+        self.entries = []  # (title, url, kind, orden)
+
+        keys = []
+        for title, url_path, kind, order in rows:
+            if not url_path.startswith(root_path):
+                continue
+            entry_id = len(self.entries)
+            self.entries.append((title, "/" + url_path[len(root_path):], kind, order))
+
+            normalized = normalize_query(title)
+            start = 0
+            for word in normalized.split(" "):
+                # (sufijo desde esta palabra, ¿es el comienzo del título?, entrada)
+                keys.append((normalized[start:], start > 0, entry_id))
+                start += len(word) + 1
+
+        keys.sort()
+        self.keys = [k[0] for k in keys]
+        self.refs = [(k[1], k[2]) for k in keys]
+
+    def lookup(self, query: str, limit: int = TYPEAHEAD_LIMIT):
+        prefix = normalize_query(query)
+        if len(prefix) < TYPEAHEAD_MIN_CHARS:
+            return []
+
+        found = {}
+        i = bisect_left(self.keys, prefix)
+        end = min(len(self.keys), i + _MAX_SCAN)
+        while i < end and self.keys[i].startswith(prefix):
+            mid_title, entry_id = self.refs[i]
+            found[entry_id] = min(found.get(entry_id, True), mid_title)
+            i += 1
+
+        # primero los que empiezan con el prefijo, después destinos > países > guías, títulos cortos
+        ranked = sorted(
+            found.items(),
+            key=lambda item: (item[1], self.entries[item[0]][3], len(self.entries[item[0]][0])),
+        )
+        return [
+            {"t": self.entries[entry_id][0], "u": self.entries[entry_id][1], "k": self.entries[entry_id][2]}
+            for entry_id, _mid in ranked[:limit]
+        ]
+
+
+def build_typeahead_index():
+    kinds = {}
+    for model, (kind, order) in TYPEAHEAD_MODELS.items():
+        kinds[model._meta.label_lower] = (kind, order)
+
+    site = Site.objects.filter(is_default_site=True).select_related("root_page").first()
+    root_path = site.root_page.url_path if site else "/"
+
+    rows = []
+    qs = (
+        Page.objects.live().public().type(*TYPEAHEAD_MODELS)
+        .values_list("title", "url_path", "content_type__app_label", "content_type__model")
+    )
+    for title, url_path, app_label, model_name in qs:
+        kind, order = kinds.get(f"{app_label}.{model_name}", ("Página", 9))
+        rows.append((title, url_path, kind, order))
+
+    return TypeaheadIndex(rows, root_path=root_path, generation=search_generation())
+
+
+def get_typeahead_index():
+    global _index
+    if _index is None or _index.generation != search_generation():
+        _index = build_typeahead_index()
+    return _index
+
+
+@unless_deferred
+def invalidate_typeahead_index(*args, **kwargs):
+    global _index
+    _index = None
+
+
+def suggest(query: str, limit: int = TYPEAHEAD_LIMIT):
+    return get_typeahead_index().lookup(query, limit=limit)
@@ -0,0 +1,46 @@
+# pages/versions.py
+"""
+Versiones de caché compartidas entre workers (tabla CacheVersion).
+
+La caché de Django es LocMem (una por proceso) y los índices en memoria
+(typeahead, CTAs) también: invalidar sólo en el proceso que atendió el publish
+deja a los demás sirviendo datos viejos. Las keys se versionan con un contador
+en la DB; cada proceso lo relee como mucho cada VERSION_CHECK_TTL segundos, así
+que un cambio se ve en todos los workers en ese tiempo (en el propio, enseguida).
+"""
+import time
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+VERSION_CHECK_TTL = 2
+
+_memo = {}  # name -> (version, leída en monotonic)
+
+
+def get_version(name: str) -> int:
+    memo = _memo.get(name)
+    if memo is not None and time.monotonic() - memo[1] < VERSION_CHECK_TTL:
+        return memo[0]
+
+    CacheVersion = apps.get_model("pages", "CacheVersion")
+    version = CacheVersion.objects.filter(name=name).values_list("version", flat=True).first() or 1
+    _memo[name] = (version, time.monotonic())
+    return version
+
+
+def bump_version(name: str) -> int:
+    """Invalida `name` en todos los workers. Devuelve la versión nueva."""
+    CacheVersion = apps.get_model("pages", "CacheVersion")
+    with transaction.atomic():
+        if not CacheVersion.objects.filter(name=name).update(version=F("version") + 1):
+            try:
+                with transaction.atomic():
+                    CacheVersion.objects.create(name=name, version=2)
+            except IntegrityError:  # otro proceso la creó recién
+                CacheVersion.objects.filter(name=name).update(version=F("version") + 1)
+        version = CacheVersion.objects.values_list("version", flat=True).get(name=name)
+
+    _memo[name] = (version, time.monotonic())
+    return version
@@ -1,27 +1,96 @@
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render
-from pages.models import ArticuloPage, DestinoPage
+from django.views.decorators.cache import cache_control
+from pages.search import FACETS, clean_filters, search_facets, search_pages
+from pages.sitemaps import cached_sitemap, serve_sitemap_file
+from pages.typeahead import suggest
+
+
+FACET_LABELS = ("País", "Categoría", "Tag")
+
+
+def _facet_links(params, facets, filters):
+    """Agrega a cada opción la URL que la activa/desactiva (conservando q y las otras facetas)."""
+    for name, options in facets.items():
+        for option in options:
+            option_params = params.copy()
+            option["active"] = filters.get(name) == option["slug"]
+            if option["active"]:
+                option_params.pop(name, None)
+            else:
+                option_params[name] = option["slug"]
+            option["querystring"] = option_params.urlencode()
+    return facets
 
 
 def search(request):
     q = (request.GET.get("q") or "").strip()
+    filters = clean_filters(request.GET)
 
-    articulos = ArticuloPage.objects.none()
-    destinos = DestinoPage.objects.none()
+    page_obj = None
     results = []
+    facets = {}
+    facets_capped = False
+    cache_hit = False
 
-    if q:
-        destinos = DestinoPage.objects.live().public().search(q)
-        articulos = ArticuloPage.objects.live().public().search(q)
+    params = request.GET.copy()
+    params.pop("page", None)
 
-        # Primero destinos, después guías (o invertí si preferís)
-        results = list(destinos) + list(articulos)
+    if q:
+        # destinos + guías en un solo ranking, paginado y cacheado (ver pages/search.py)
+        page_obj, results, cache_hit = search_pages(q, request.GET.get("page"), request=request, filters=filters)
+        facets, facets_capped, facets_hit = search_facets(q, filters)
+        facets = _facet_links(params, facets, filters)
+        cache_hit = cache_hit and facets_hit
 
-    return render(request, "pages/search_results.html", {
+    response = render(request, "pages/search_results.html", {
         "query": q,
         "results": results,
-        "destinos": destinos,
-        "articulos": articulos,
+        "page_obj": page_obj,
+        "total": page_obj.paginator.count if page_obj else 0,
+        "querystring": params.urlencode(),
+        "facet_groups": [
+            {"name": name, "label": label, "options": facets[name]}
+            for name, label in zip(FACETS, FACET_LABELS)
+            if facets.get(name)
+        ],
+        "facets_capped": facets_capped,
+        "filters": filters,
     })
+    if q:
+        response["X-Search-Cache"] = "hit" if cache_hit else "miss"
+    return response
+
+
+@cache_control(public=True, max_age=60)
+def search_typeahead(request):
+    # índice en memoria (pages/typeahead.py): no toca la base en cada tecla
+    q = (request.GET.get("q") or "")[:60]
+    return JsonResponse({"results": suggest(q)}, json_dumps_params={"ensure_ascii": False, "separators": (",", ":")})
+
+
+def _sitemap_response(request, section=None, number=1):
+    # archivo pre-generado servido por WhiteNoise (gzip/br, 304); si no hay, XML cacheado por generación
+    name = f"sitemap-{section}-{number}.xml" if section else "sitemap.xml"
+    response = serve_sitemap_file(request, name)
+    if response is not None:
+        return response
+
+    xml, hit = cached_sitemap(f"{request.scheme}://{request.get_host()}", section, number)
+    if xml is None:
+        raise Http404
+    response = HttpResponse(xml, content_type="application/xml; charset=utf-8")
+    response["X-Sitemap-Cache"] = "hit" if hit else "miss"
+    response["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
+def sitemap_index(request):
+    return _sitemap_response(request)
+
+
+def sitemap_section(request, section, number):
+    return _sitemap_response(request, section, number)
 
 
 def sobre_nosotros(request):
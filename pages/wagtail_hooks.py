@@ -0,0 +1,41 @@
+from django.contrib import messages
+from wagtail import hooks
+
+from .jobs import enqueue_import_job, latest_import_job
+from .models import BulkPasteMixin, ImportJob
+
+
+def _enqueue_bulk_paste(request, page):
+    if not isinstance(page, BulkPasteMixin) or not page.should_import_in_background():
+        return
+    enqueue_import_job(page, user=request.user, publish="action-publish" in request.POST)
+    messages.info(
+        request,
+        "El contenido pegado es grande: se está convirtiendo en segundo plano. "
+        "Cuando termine vas a ver una nueva revisión.",
+    )
+
+
+@hooks.register("after_create_page")
+def enqueue_bulk_paste_after_create(request, page):
+    _enqueue_bulk_paste(request, page)
+
+
+@hooks.register("after_edit_page")
+def enqueue_bulk_paste_after_edit(request, page):
+    _enqueue_bulk_paste(request, page)
+
+
+@hooks.register("before_edit_page")
+def show_import_job_status(request, page):
+    if request.method != "GET" or not isinstance(page.specific, BulkPasteMixin):
+        return
+
+    job = latest_import_job(page)
+    if job is None:
+        return
+    if job.status in (ImportJob.PENDING, ImportJob.RUNNING):
+        messages.info(request, f"Importación en curso ({job.get_status_display().lower()}).")
+    elif job.status == ImportJob.FAILED:
+        last_line = job.error.strip().splitlines()[-1] if job.error.strip() else ""
+        messages.error(request, f"La última importación falló: {last_line}")